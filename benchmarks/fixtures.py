@@ -0,0 +1,144 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""
+Outputs of `nvidia-smi` and `rocm-smi` and procfs snapshots for any number of devices.
+
+These follow the format of real outputs (as queried by `monitor.contrib`)
+with deterministic values so that results are comparable between runs.
+"""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Tuple
+
+# standard libs
+import os
+import json
+import struct
+
+# public interface
+__all__ = ['GPU_COUNTS', 'CORE_COUNTS', 'FLEET_SIZES', 'ALERT_RULES', 'nvidia_output', 'rocm_output',
+           'proc_stat', 'net_dev', 'diskstats', 'write_procfs', 'pushed_records', ]
+
+
+GPU_COUNTS = [1, 8, 64]
+CORE_COUNTS = [8, 64, 512]
+FLEET_SIZES = [(100, 8), (5000, 8)]  # NOTE: hosts and GPUs per host
+
+# NOTE: typical rules for GPUs (one of each kind, see `monitor.core.alert`)
+ALERT_RULES = ['gpu-hot gpu_temp > 85 for 3', 'gpu-full gpu_memory >= 95',
+               'gpu-rising gpu_temp rate > 2', 'gpu-odd gpu_power ewma 0.05 > 4']
+
+
+def nvidia_output(metric: str, count: int) -> str:
+    """Output of `nvidia-smi --format=csv,noheader,nounits --query-gpu=...` for `count` GPUs."""
+    lines = []
+    for i in range(count):
+        if metric == 'percent':
+            lines.append(f'{i}, {(7 * i) % 101}')
+        elif metric == 'memory':
+            lines.append(f'{i}, {1024 * (i % 40)}, 40960')
+        elif metric == 'power':
+            lines.append(f'{i}, {60 + i % 300}.{i % 100:02d}')
+        elif metric == 'temp':
+            lines.append(f'{i}, {30 + i % 60}')
+        elif metric == 'all':
+            lines.append(f'{i}, {(7 * i) % 101}, {1024 * (i % 40)}, 40960, '
+                         f'{60 + i % 300}.{i % 100:02d}, {30 + i % 60}')
+        elif metric == 'procs':  # NOTE: two processes per GPU
+            for pid in (1000 + 2 * i, 1001 + 2 * i):
+                lines.append(f'00000000:{i:02X}:00.0, {pid}, {256 * (1 + pid % 8)}')
+        else:
+            raise ValueError(f'Unknown metric ({metric})')
+    return '\n'.join(lines) + '\n'
+
+
+ROCM_HEADERS = {
+    'percent': 'device,GPU use (%)',
+    'memory': 'device,GPU memory use (%)',
+    'power': 'device,Average Graphics Package Power (W)',
+    'temp': ('device,Temperature (Sensor edge) (C),Temperature (Sensor junction) (C),'
+             'Temperature (Sensor memory) (C)'),
+    'all': ('device,Temperature (Sensor edge) (C),Temperature (Sensor junction) (C),'
+            'Temperature (Sensor memory) (C),Average Graphics Package Power (W),'
+            'GPU use (%),GPU memory use (%)'),
+}
+
+
+def rocm_output(metric: str, count: int) -> str:
+    """Output of `rocm-smi --show... --csv` for `count` GPUs."""
+    lines = [ROCM_HEADERS[metric]]
+    for i in range(count):
+        percent, memory, power = (7 * i) % 101, i % 100, f'{60 + i % 300}.0'
+        temps = f'{30 + i % 60}.0,{35 + i % 60}.0,{40 + i % 60}.0'
+        values = {'percent': percent, 'memory': memory, 'power': power, 'temp': temps,
+                  'all': f'{temps},{power},{percent},{memory}'}
+        lines.append(f'card{i},{values[metric]}')
+    return '\n'.join(lines) + '\n'
+
+
+def proc_stat(cores: int, tick: int = 0) -> str:
+    """Contents of /proc/stat for `cores` (counters advance with `tick`)."""
+    def row(label: str, scale: int) -> str:
+        user, system, idle = (100 + 3 * tick) * scale, (20 + tick) * scale, (1000 + 6 * tick) * scale
+        return f'{label} {user} 0 {system} {idle} {5 * scale} 0 {scale} 0 0 0'
+    lines = [row('cpu', cores)] + [row(f'cpu{i}', 1) for i in range(cores)]
+    lines += ['intr 0', 'ctxt 0', 'btime 0', 'processes 1', 'procs_running 1', 'procs_blocked 0']
+    return '\n'.join(lines) + '\n'
+
+
+def net_dev(devices: int, tick: int = 0) -> str:
+    """Contents of /proc/net/dev for `devices` interfaces (and loopback)."""
+    lines = ['Inter-|   Receive                                                |  Transmit',
+             ' face |bytes    packets errs drop fifo frame compressed multicast|'
+             'bytes    packets errs drop fifo colls carrier compressed']
+    for name in ['lo'] + [f'eth{i}' for i in range(devices)]:
+        rx, tx = 1_000_000 * (tick + 1), 500_000 * (tick + 1)
+        lines.append(f'{name:>6}: {rx} {rx // 1000} 0 0 0 0 0 0 {tx} {tx // 1000} 0 0 0 0 0 0')
+    return '\n'.join(lines) + '\n'
+
+
+def diskstats(devices: int, tick: int = 0) -> str:
+    """Contents of /proc/diskstats for `devices` disks (and a loop device)."""
+    lines = []
+    for i, name in enumerate(['loop0'] + [f'sd{chr(97 + i % 26)}{i // 26 or ""}' for i in range(devices)]):
+        reads, sectors = 100 * (tick + 1), 8000 * (tick + 1)
+        lines.append(f'   8 {16 * i} {name} {reads} 0 {sectors} 10 {reads} 0 {sectors} 10 0 {10 * tick} 20')
+    return '\n'.join(lines) + '\n'
+
+
+def write_procfs(root: str, cores: int, devices: int = 4, tick: int = 0) -> List[str]:
+    """Write synthetic procfs files under `root` (e.g., for MONITOR_PROCFS) and return their paths."""
+    os.makedirs(os.path.join(root, 'net'), exist_ok=True)
+    paths = []
+    for name, content in [('stat', proc_stat(cores, tick)),
+                          (os.path.join('net', 'dev'), net_dev(devices, tick)),
+                          ('diskstats', diskstats(devices, tick))]:
+        path = os.path.join(root, name)
+        with open(path, mode='w') as stream:
+            stream.write(content)
+        paths.append(path)
+    return paths
+
+
+def pushed_records(hosts: int, gpus: int, tick: int = 0) -> List[Tuple[bytes, bytes]]:
+    """Header and records payloads as sent by "monitor gpu all --push" from each of `hosts`."""
+    record = struct.Struct('<qHffff')
+    columns = ['gpu_id', 'gpu_percent', 'gpu_memory', 'gpu_power', 'gpu_temp']
+    frames = []
+    for host in range(hosts):
+        header = json.dumps({'hostname': f'r{host // 40:03d}n{host % 40:02d}', 'resource': 'gpu.all',
+                             'columns': columns, 'format': record.format}).encode()
+        payload = b''.join(record.pack(1_600_000_000_000 + 1000 * tick, i, (7 * i + host) % 101, 0.5,
+                                       100 + (i + tick) % 200, 40 + (3 * i + host) % 50) for i in range(gpus))
+        frames.append((header, payload))
+    return frames
@@ -0,0 +1,73 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""
+Measure import time for each command (less interpreter startup) and
+exit with non-zero status if any exceeds the budget.
+
+    python benchmarks/startup.py [--budget SECONDS] [--repeat COUNT]
+"""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List
+
+# standard libs
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+
+# NOTE: modules imported to run each command (see `monitor.cli.DEVICES`)
+COMMANDS = {
+    'monitor': 'monitor.cli',
+    'monitor cpu percent': 'monitor.cli.cpu.percent',
+    'monitor cpu memory': 'monitor.cli.cpu.memory',
+    'monitor gpu percent': 'monitor.cli.gpu.percent',
+    'monitor net io': 'monitor.cli.net.io',
+    'monitor all': 'monitor.cli.all',
+}
+
+BUDGET = 0.25  # seconds
+REPEAT = 10
+
+
+def run(code: str, repeat: int) -> List[float]:
+    """Wall time of `repeat` runs of a new interpreter executing `code`."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def main() -> int:
+    """Print median import time for each command, non-zero exit status if over budget."""
+    parser = argparse.ArgumentParser(description='Measure import time for each command.')
+    parser.add_argument('--budget', type=float, default=BUDGET, help=f'seconds (default: {BUDGET})')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help=f'runs (default: {REPEAT})')
+    args = parser.parse_args()
+
+    baseline = statistics.median(run('pass', args.repeat))
+    status = 0
+    for command, module in COMMANDS.items():
+        elapsed = statistics.median(run(f'import {module}', args.repeat)) - baseline
+        result = 'ok' if elapsed <= args.budget else 'OVER BUDGET'
+        print(f'{command:<24} {elapsed:.3f}s  {result}')
+        status = status or int(elapsed > args.budget)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,197 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""
+Measure time per call for parsers, formatters, the sampling loop,
+end-to-end samples per second (written to a null sink), and merging
+records from many hosts (as with "monitor aggregate").
+
+    python benchmarks/suite.py [-k PATTERN] [--save [PATH]] [--compare PATH]
+
+Results are saved as JSON (default: benchmarks/results/<version>.json)
+and can be compared against a previous run (e.g., from another version).
+"""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Dict, Callable, Iterator, Tuple
+
+# standard libs
+import os
+import sys
+import json
+import timeit
+import argparse
+import platform
+import tempfile
+import itertools
+from datetime import datetime
+
+# internal libs (NOTE: run from a source checkout without installing)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from monitor import __version__
+from monitor.core.logging import Message, CSVHandler, LEVELS, get_hostname
+from monitor.core.output import CSVWriter
+from monitor.core.schedule import Scheduler
+from monitor.core.fleet import Fleet, Grouping
+from monitor.core.alert import AlertWriter, parse_rule, ALERT_COLUMNS
+from monitor.contrib.nvidia import NvidiaPercent, NvidiaSnapshot, NvidiaProcs
+from monitor.contrib.rocm import RocmPercent, RocmTemperature, RocmSnapshot
+from monitor.contrib.procfs import CPUStat, NetDev, DiskStats
+from monitor.cli.cpu.memory import format_size
+from fixtures import (GPU_COUNTS, CORE_COUNTS, FLEET_SIZES, ALERT_RULES, nvidia_output, rocm_output,
+                      write_procfs, pushed_records)
+
+
+RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+REPEAT = 5
+
+# NOTE: each benchmark is a name and a function to call repeatedly
+Benchmark = Tuple[str, Callable[[], None]]
+
+
+def null_writer(columns) -> CSVWriter:
+    """CSV writer to a null sink (rows are still formatted and encoded)."""
+    return CSVWriter('bench', columns, stream=open(os.devnull, mode='wb'), hostname='bench')
+
+
+def parsers() -> Iterator[Benchmark]:
+    """Parse recorded outputs for each number of GPUs."""
+    for count in GPU_COUNTS:
+        for metric, cls in [('percent', NvidiaPercent), ('all', NvidiaSnapshot), ('procs', NvidiaProcs)]:
+            yield f'parse.nvidia.{metric}[{count}]', _bind(cls.parse_text, nvidia_output(metric, count))
+        for metric, cls in [('percent', RocmPercent), ('temp', RocmTemperature), ('all', RocmSnapshot)]:
+            yield f'parse.rocm.{metric}[{count}]', _bind(cls.parse_text, rocm_output(metric, count))
+
+
+def formatters() -> Iterator[Benchmark]:
+    """Format values and messages."""
+    yield 'format_size', lambda: format_size(123456789.0, True)
+    handler = CSVHandler()
+    message = Message(level=LEVELS[0], content='[12] 42.5', timestamp=datetime.now(),
+                      source='monitor.cpu.percent')
+    yield 'CSVHandler.format', lambda: handler.format(message)
+    writer = null_writer(['cpu_id', 'cpu_percent'])
+    yield 'CSVWriter.write', lambda: writer.write(12, 42.5)
+
+
+def loop() -> Iterator[Benchmark]:
+    """Overhead of the sampling loop itself (no waiting)."""
+    ticks = iter(Scheduler(1e-9, on_overrun=None))
+    yield 'schedule.tick', lambda: next(ticks)
+
+
+def procfs(root: str) -> Iterator[Benchmark]:
+    """Read and parse synthetic procfs snapshots (see `fixtures.write_procfs`)."""
+    for cores in CORE_COUNTS:
+        path = os.path.join(root, str(cores))
+        write_procfs(path, cores)
+        stat = CPUStat(os.path.join(path, 'stat'))
+        yield f'procfs.cpu_percent[{cores}]', stat.percent
+        yield f'procfs.cpu_times_percent[{cores}]', stat.times_percent
+    net = NetDev(path=os.path.join(root, str(CORE_COUNTS[-1]), 'net', 'dev'))
+    disk = DiskStats(path=os.path.join(root, str(CORE_COUNTS[-1]), 'diskstats'))
+    yield 'procfs.net_dev', net.update
+    yield 'procfs.diskstats', disk.update
+
+
+def end_to_end(root: str) -> Iterator[Benchmark]:
+    """A full sample (collect, format, write, and commit) to a null sink."""
+    for cores in CORE_COUNTS:
+        stat = CPUStat(os.path.join(root, str(cores), 'stat'))
+        writer = null_writer(['cpu_id', 'cpu_percent'])
+        yield f'sample.cpu_percent_all_cores[{cores}]', _bind(_sample_cpu, stat, writer)
+    for count in GPU_COUNTS:
+        writer = null_writer(['gpu_id', 'gpu_percent', 'gpu_memory', 'gpu_power', 'gpu_temp'])
+        yield f'sample.gpu_all[{count}]', _bind(_sample_gpu, nvidia_output('all', count), writer)
+        writer = AlertWriter(null_writer(writer.columns), [parse_rule(line) for line in ALERT_RULES],
+                             null_writer(ALERT_COLUMNS))
+        yield f'sample.gpu_all_alerts[{count}]', _bind(_sample_gpu, nvidia_output('all', count), writer)
+
+
+def fleet() -> Iterator[Benchmark]:
+    """One second of records from every host (one payload each) and a rollup over all of them."""
+    for hosts, gpus in FLEET_SIZES:
+        fleet = Fleet(grouping=Grouping(pattern=r'^(r\d+)'), thresholds={'gpu_temp': 85})
+        frames = [(fleet.source(header), payload) for header, payload in pushed_records(hosts, gpus)]
+        for source, payload in frames:
+            fleet.ingest(source, payload)
+        yield f'fleet.ingest[{hosts}x{gpus}]', _bind(_ingest, fleet, frames)
+        yield f'fleet.rollup[{hosts}x{gpus}]', fleet.rollup
+
+
+def _ingest(fleet: Fleet, frames) -> None:
+    for source, payload in frames:
+        fleet.ingest(source, payload)
+
+
+def _sample_cpu(stat: CPUStat, writer: CSVWriter) -> None:
+    for cpu_id, percent in enumerate(stat.percent()[1:]):
+        writer.write(cpu_id, percent)
+    writer.commit()
+
+
+def _sample_gpu(block: str, writer: CSVWriter) -> None:
+    data = NvidiaSnapshot.parse_text(block)
+    for gpu_id in data['percent']:
+        writer.write(gpu_id, *(data[metric][gpu_id] for metric in ('percent', 'memory', 'power', 'temp')))
+    writer.commit()
+
+
+def _bind(function: Callable, *args) -> Callable[[], None]:
+    return lambda: function(*args)
+
+
+def measure(function: Callable[[], None], repeat: int) -> float:
+    """Best time per call in seconds (over `repeat` runs of at least 0.2 seconds each)."""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> int:
+    """Run benchmarks, print results, and optionally save or compare them."""
+    parser = argparse.ArgumentParser(description='Benchmark parsers, formatters, and the sampling loop.')
+    parser.add_argument('-k', dest='pattern', default='', help='only names containing PATTERN')
+    parser.add_argument('--repeat', type=int, default=REPEAT, help=f'runs (default: {REPEAT})')
+    parser.add_argument('--save', nargs='?', const=os.path.join(RESULTS, f'{__version__}.json'),
+                        help='save results as JSON (default: results/<version>.json)')
+    parser.add_argument('--compare', default=None, help='previous results to compare with')
+    args = parser.parse_args()
+
+    previous: Dict[str, float] = {}
+    if args.compare:
+        with open(args.compare, mode='r') as stream:
+            previous = json.load(stream)['results']
+
+    results: Dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as root:
+        for name, function in itertools.chain(parsers(), formatters(), loop(), procfs(root), end_to_end(root),
+                                          fleet()):
+            if args.pattern not in name:
+                continue
+            results[name] = elapsed = measure(function, args.repeat)
+            line = f'{name:<40} {elapsed * 1e6:12.2f} us  {1 / elapsed:12.0f} /s'
+            if name in previous:
+                line += f'  {elapsed / previous[name]:6.2f}x'
+            print(line)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, mode='w') as stream:
+            json.dump({'version': __version__, 'python': platform.python_version(),
+                       'hostname': get_hostname(), 'date': datetime.now().isoformat(timespec='seconds'),
+                       'results': results}, stream, indent=4)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,16 +12,18 @@
 
 
 # standard libs
+import os
 import sys
-import platform
 
 # ignore broken pipes
-if platform.system() == 'Windows':
+if os.name == 'nt':
     # FIXME: how do we ignore broken pipes on windows?
     pass
 else:
-    from signal import signal, SIGPIPE, SIG_DFL
+    from signal import signal, SIGPIPE, SIGTERM, SIG_DFL
     signal(SIGPIPE, SIG_DFL)
+    # exit normally on SIGTERM so buffered output is written (e.g., Parquet footer)
+    signal(SIGTERM, lambda signum, frame: sys.exit(0))
 
 # external libs
 from cmdkit.app import Application
@@ -30,26 +32,36 @@ from cmdkit.cli import Interface, ArgumentError
 # internal libs
 from ..core.logging import Logger
 from ..core.exceptions import CompletedCommand
+from ..core.loader import load
 from .. import (__appname__, __version__, __description__,
                 __copyright__, __license__, __website__)
 
-# resource commands
-from .cpu import CPUDevice
-from .gpu import GPUDevice
-
 # public interface
 __all__ = ['ResourceMonitor', 'main', ]
 
 
+# NOTE: only the selected device or command is imported
 DEVICES = {
-    'cpu': CPUDevice,
-    'gpu': GPUDevice,
+    'cpu': f'{__name__}.cpu:CPUDevice',
+    'gpu': f'{__name__}.gpu:GPUDevice',
+    'net': f'{__name__}.net:NetworkDevice',
+    'disk': f'{__name__}.disk:DiskDevice',
+}
+
+COMMANDS = {
+    'all': f'{__name__}.all:MonitorAll',
+    'convert': f'{__name__}.convert:Convert',
+    'serve': f'{__name__}.serve:Serve',
+    'receive': f'{__name__}.receive:Receive',
+    'aggregate': f'{__name__}.aggregate:Aggregate',
+    'query': f'{__name__}.query:Query',
 }
 
 PROGRAM = __appname__
 
 USAGE = f"""\
 usage: {PROGRAM} [-h] [-v] <device> <resource> [<args>...]
+       {PROGRAM} [-h] [-v] <command> [<args>...]
 {__description__}\
 """
 
@@ -65,15 +77,25 @@ HELP = f"""\
 {USAGE}
 
 devices:
-cpu                {CPUDevice.__doc__}
-gpu                {GPUDevice.__doc__}
+cpu                Monitor CPU resources.
+gpu                Monitor GPU resources.
+net                Monitor network resources.
+disk               Monitor disk resources.
+
+commands:
+all                Monitor many resources at once.
+convert            Convert binary records to CSV.
+serve              Serve current values for scraping by Prometheus.
+receive            Receive records sent with --push and print them as CSV.
+aggregate          Merge records from many monitors and report rollups.
+query              Read samples kept with the --store option.
 
 options:
 -h, --help         Show this message and exit.
 -v, --version      Show the version and exit.
 
-Use the -h/--help flag with the above resource groups to
-learn more about their usage.
+Use the -h/--help flag with the above resource groups and
+commands to learn more about their usage.
 
 {EPILOG}\
 """
@@ -98,10 +120,13 @@ class ResourceMonitor(Application):
     def run(self) -> None:
         """Show usage/help/version or defer to group."""
         if self.device in DEVICES:
-            status = DEVICES[self.device].main(sys.argv[2:3])
+            status = load(DEVICES[self.device]).main(sys.argv[2:3])
+            raise CompletedCommand(status)
+        elif self.device in COMMANDS:
+            status = load(COMMANDS[self.device]).main(sys.argv[2:])
             raise CompletedCommand(status)
         else:
-            raise ArgumentError(f'"{self.device}" is not a device.')
+            raise ArgumentError(f'"{self.device}" is not a device or command.')
 
 
 def main() -> int:
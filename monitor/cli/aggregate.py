@@ -0,0 +1,187 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Merge records from many monitors and report rollups by group of hosts."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Dict
+
+# standard libs
+import asyncio
+import functools
+
+# external libs
+from cmdkit.app import Application, exit_status
+from cmdkit.cli import Interface, ArgumentError
+
+# internal libs
+from .. import __appname__
+from ..core.exceptions import log_and_exit
+from ..core.schedule import Scheduler
+from ..core.output import RecordWriter, get_writer
+from ..core.selfstats import get_self_stats
+from ..core.fleet import Fleet, Grouping, listen, ROLLUP_COLUMNS
+from ..core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+
+# public interface
+__all__ = ['Aggregate', 'parse_thresholds', ]
+
+
+DEFAULT_HOT = 'gpu_temp=85'
+
+
+PROGRAM = f'{__appname__} aggregate'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] ADDRESS [-i SECONDS] [-w COUNT] [--expire SECONDS]
+       {PADDING} [--groups FILE | --group-pattern REGEX] [--hot NAME=VALUE,...] [--align]
+       {PADDING} [--csv [--no-header]] [--self-stats PATH]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+Listen for records sent by any number of monitors with the --push option
+and keep a window of the latest samples for every host and device. At each
+interval, write the number of hosts and devices, the mean and maximum over
+these windows, and the number of hot devices (latest value above its
+threshold) for each metric (e.g., gpu_temp) in each group of hosts.
+Every host is also included in the group "all".
+
+arguments:
+ADDRESS                        Listen on tcp://HOST:PORT, udp://HOST:PORT, or unix://PATH.
+
+options:
+-i, --interval     SECONDS     Time between rollups (default: 10).
+-w, --window       COUNT       Number of samples kept for each device (default: 10).
+    --expire       SECONDS     Leave out devices not updated in this time (default: 60).
+    --groups       FILE        Assign hosts to groups by glob pattern (PATTERN GROUP per line).
+    --group-pattern REGEX      Assign hosts to groups by first group of match (e.g., '^(r\\d+)').
+    --hot          NAME=VALUE  Thresholds for hot devices (default: {DEFAULT_HOT}).
+    --align                    Align rollups with the clock (e.g., on the second).
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --no-header                Suppress printing header in CSV mode.
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('aggregate')
+
+
+def parse_thresholds(value: str) -> Dict[str, float]:
+    """Thresholds by metric from 'NAME=VALUE,...' (empty for none)."""
+    thresholds = {}
+    for item in filter(None, value.split(',')):
+        name, sep, threshold = item.partition('=')
+        try:
+            thresholds[name.strip()] = float(threshold)
+        except ValueError:
+            sep = None
+        if not sep or not name.strip():
+            raise ArgumentError(f'Expected NAME=VALUE for --hot (given "{item}").')
+    return thresholds
+
+
+class Aggregate(Application):
+    """Merge records from many monitors and report rollups by group of hosts."""
+
+    interface = Interface(PROGRAM, USAGE, HELP)
+
+    address: str = None
+    interface.add_argument('address')
+
+    interval: float = 10
+    interface.add_argument('-i', '--interval', type=float, default=interval)
+
+    window: int = 10
+    interface.add_argument('-w', '--window', type=int, default=window)
+
+    expire: float = 60
+    interface.add_argument('--expire', type=float, default=expire)
+
+    groups_path: str = None
+    group_pattern: str = None
+    group_interface = interface.add_mutually_exclusive_group()
+    group_interface.add_argument('--groups', default=None, dest='groups_path')
+    group_interface.add_argument('--group-pattern', default=None)
+
+    hot: str = DEFAULT_HOT
+    interface.add_argument('--hot', default=hot)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    # NOTE: group names are not numeric (no --binary or --parquet)
+    format_plain: bool = True
+    format_csv: bool = False
+    format_interface = interface.add_mutually_exclusive_group()
+    format_interface.add_argument('--plain', action='store_true', dest='format_plain')
+    format_interface.add_argument('--csv', action='store_true', dest='format_csv')
+
+    no_header: bool = False
+    interface.add_argument('--no-header', action='store_true')
+
+    self_stats: str = None
+    interface.add_argument('--self-stats', default=self_stats)
+
+    exceptions = {
+        RuntimeError: functools.partial(log_and_exit, logger=log.critical,
+                                        status=exit_status.runtime_error),
+        OSError: functools.partial(log_and_exit, logger=log.critical,
+                                   status=exit_status.runtime_error),
+    }
+
+    def run(self) -> None:
+        """Receive records and write rollups until interrupted."""
+
+        if not self.format_csv and self.no_header:
+            raise ArgumentError('--no-header only applies to --csv mode.')
+        if self.window < 1:
+            raise ArgumentError(f'--window must be at least 1 (given {self.window}).')
+
+        if self.groups_path is not None:
+            try:
+                grouping = Grouping.from_file(self.groups_path)
+            except FileNotFoundError as error:
+                raise RuntimeError(f'File not found: {self.groups_path}') from error
+        else:
+            grouping = Grouping(pattern=self.group_pattern)
+
+        stats = get_self_stats(self.self_stats, ['ingest', 'rollup', 'write'])
+        fleet = Fleet(window=self.window, expire=self.expire, grouping=grouping,
+                      thresholds=parse_thresholds(self.hot), stats=stats)
+        scheduler = Scheduler(self.interval, align=self.align, name=PROGRAM, stats=stats)
+
+        log.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            log.handlers[0] = CSV_HANDLER
+        writer = get_writer('aggregate', ROLLUP_COLUMNS, log, fmt='csv' if self.format_csv else 'plain',
+                            no_header=self.no_header, stats=stats)
+        try:
+            asyncio.run(self.run_async(fleet, scheduler, writer))
+        finally:
+            writer.close()
+
+    async def run_async(self, fleet: Fleet, scheduler: Scheduler, writer: RecordWriter) -> None:
+        """Start listening and write rollups on every tick."""
+        server = await listen(fleet, self.address)
+        try:
+            async for _ in scheduler:
+                for row in fleet.rollup():
+                    writer.write(*row)
+                writer.commit()
+        finally:
+            server.close()
@@ -0,0 +1,243 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Monitor many resources at once (single record per sample)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Optional
+
+# standard libs
+import asyncio
+import functools
+from datetime import datetime
+
+# external libs
+import psutil
+from cmdkit.app import Application
+from cmdkit.cli import Interface, ArgumentError
+
+# internal libs
+from .. import __appname__
+from .options import OutputOptions, get_exceptions
+from ..contrib import SMIData, PROVIDERS
+from ..contrib.procfs import CPUStat, CounterTable, NetDev, DiskStats, get_cpustat
+from ..core.schedule import Scheduler
+from ..core.engine import Engine, Provider
+from ..core.output import RecordWriter
+from ..core.selfstats import get_self_stats, STAGES
+from ..core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+
+# public interface
+__all__ = ['MonitorAll', 'Collector', 'RESOURCES', ]
+
+
+# NOTE: order determines order of columns in output
+RESOURCES = ['cpu.percent', 'cpu.times', 'cpu.memory', 'gpu.percent', 'gpu.memory', 'gpu.power', 'gpu.temp',
+             'net.io', 'disk.io']
+DEFAULT_RESOURCES = 'cpu.percent,cpu.memory'
+
+
+PROGRAM = f'{__appname__} all'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] [-r NAME,...] [-s SECONDS] [--report-interval SECONDS] [-t SECONDS]
+       {PADDING} [--align] [--stream] [--provider NAME]
+       {PADDING} [--csv [--no-header] | --binary | --parquet PATH | --push ADDRESS]
+       {PADDING} [--flush SECONDS] [--self-stats PATH] [--store [DIR]] [--alerts FILE]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+All selected resources are sampled together by a single process and
+reported as one record per sample (one column per resource, and per
+GPU for "gpu" resources). Resources are collected concurrently; values
+not collected within the timeout are left empty and counted.
+
+resources:
+{', '.join(RESOURCES)}
+
+options:
+-r, --resources    NAME,...    Resources to sample (default: {DEFAULT_RESOURCES}).
+-s, --sample-rate  SECONDS     Time between samples (default: 1).
+    --report-interval SECONDS  Write statistics over this period instead.
+-t, --timeout      SECONDS     Time allowed for each resource (default: sample rate).
+    --align                    Align samples with the clock (e.g., on the second).
+    --stream                   Keep a single nvidia-smi process running.
+    --provider     NAME        Select GPU provider (default: detected).
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --binary                   Write compact binary records (see "monitor convert").
+    --parquet      PATH        Write Parquet files (requires pyarrow).
+    --push         ADDRESS     Send binary records to ADDRESS (see "monitor receive").
+    --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+    --store        [DIR]       Also keep samples in DIR for "monitor query" (see manual).
+    --alerts       FILE        Evaluate alert rules in FILE on every sample (see manual).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('all')
+
+
+class Collector:
+    """Asynchronous providers for a set of `resources` (values by column name)."""
+
+    resources: List[str]
+    gpu_metrics: List[str]
+    smi: Optional[SMIData] = None
+    stat: Optional[CPUStat] = None
+    counters: Dict[str, CounterTable]
+
+    def __init__(self, resources: List[str], smi: SMIData = None) -> None:
+        """Initialize with names of `resources` (see `RESOURCES`)."""
+        for name in resources:
+            if name not in RESOURCES:
+                raise ArgumentError(f'"{name}" is not a resource (expected: {", ".join(RESOURCES)})')
+        self.resources = [name for name in RESOURCES if name in resources]
+        self.gpu_metrics = [name.split('.', 1)[1] for name in self.resources if name.startswith('gpu.')]
+        if self.gpu_metrics:
+            self.smi = smi or SMIData()
+        if 'cpu.percent' in self.resources or 'cpu.times' in self.resources:
+            self.stat = get_cpustat()
+        self.counters = {name: table() for name, table in [('net.io', NetDev), ('disk.io', DiskStats)]
+                         if name in self.resources}
+
+    @property
+    def providers(self) -> Dict[str, Provider]:
+        """Providers by name (GPU metrics are collected together by a single provider)."""
+        providers = {}
+        if 'cpu.percent' in self.resources or 'cpu.times' in self.resources:
+            providers['cpu'] = self.sample_cpu
+        if 'cpu.memory' in self.resources:
+            providers['cpu.memory'] = self.sample_cpu_memory
+        if self.gpu_metrics:
+            providers['gpu'] = self.sample_gpu
+        for name in self.counters:
+            providers[name] = functools.partial(self.sample_counters, name)
+        return providers
+
+    async def sample_cpu(self) -> Dict[str, float]:
+        """Collect total CPU percent utilization and/or time by state."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.read_cpu)
+
+    def read_cpu(self) -> Dict[str, float]:
+        """Read CPU counters once for both percent and times (psutil if no /proc/stat)."""
+        record = {}
+        if self.stat is None:
+            if 'cpu.percent' in self.resources:
+                record['cpu_percent'] = psutil.cpu_percent()
+            if 'cpu.times' in self.resources:
+                times = psutil.cpu_times_percent()
+                record.update(zip((f'cpu_{name}' for name in times._fields), times))
+            return record
+        delta = self.stat.update()
+        if 'cpu.percent' in self.resources:
+            record['cpu_percent'] = self.stat.percent(delta)[0]
+        if 'cpu.times' in self.resources:
+            record.update(zip((f'cpu_{name}' for name in self.stat.fields), self.stat.times_percent(delta)[0]))
+        return record
+
+    @staticmethod
+    async def sample_cpu_memory() -> Dict[str, float]:
+        """Collect CPU memory percent utilization."""
+        loop = asyncio.get_running_loop()
+        return {'memory_percent': (await loop.run_in_executor(None, psutil.virtual_memory)).percent}
+
+    async def sample_counters(self, name: str) -> Dict[str, float]:
+        """Collect rates for each device (e.g., 'net_eth0_rx_bytes')."""
+        device, table = name.split('.', 1)[0], self.counters[name]
+        return {f'{device}_{key}_{field}': value
+                for key, values in sorted(table.update().items())
+                for field, value in zip(table.fields, values)}
+
+    async def sample_gpu(self) -> Dict[str, float]:
+        """Collect selected GPU metrics (a single query if more than one)."""
+        if len(self.gpu_metrics) > 1:
+            data = await self.smi.snapshot_async()
+        else:
+            metric, = self.gpu_metrics
+            data = {metric: await self.smi.get_telemetry_async(metric)}
+        record = {}
+        for gpu_id in sorted(data[self.gpu_metrics[0]]):
+            for metric in self.gpu_metrics:
+                record[f'gpu_{gpu_id}_{metric}'] = data[metric][gpu_id]
+        return record
+
+
+class MonitorAll(OutputOptions, Application):
+    """Monitor many resources at once."""
+
+    ALLOW_NOARGS = True
+    interface = Interface(PROGRAM, USAGE, HELP)
+    exceptions = get_exceptions(log)
+
+    resources: str = DEFAULT_RESOURCES
+    interface.add_argument('-r', '--resources', default=resources)
+
+    sample_rate: float = 1
+    interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
+
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    timeout: float = None
+    interface.add_argument('-t', '--timeout', type=float, default=timeout)
+
+    stream: bool = False
+    interface.add_argument('--stream', action='store_true')
+
+    provider: str = None
+    interface.add_argument('--provider', choices=list(PROVIDERS), default=provider)
+
+    writer: RecordWriter = None
+
+    def run(self) -> None:
+        """Run monitor."""
+
+        self.check_output_options()
+
+        smi = SMIData(self.provider, stream_interval=self.sample_rate if self.stream else None)
+        collector = Collector(self.resources.split(','), smi=smi)
+        providers = collector.providers
+        stats = get_self_stats(self.self_stats, STAGES + list(providers))
+        engine = Engine(providers, timeout=self.timeout or self.sample_rate, name=PROGRAM, stats=stats)
+        scheduler = Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats)
+
+        log.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            log.handlers[0] = CSV_HANDLER
+        try:
+            asyncio.run(self.run_async(engine, scheduler))
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+    async def run_async(self, engine: Engine, scheduler: Scheduler) -> None:
+        """Collect an initial record to establish columns, then run engine."""
+        columns = list(await engine.prime())
+        self.writer = self.get_writer('all', columns, log, stats=engine.stats)
+        await engine.run(scheduler, self.write)
+
+    def write(self, timestamp: datetime, record: Dict[str, float]) -> None:
+        """Write `record` for a single tick (missing values are left empty)."""
+        missing = self.writer.missing
+        self.writer.write_at(timestamp, *(record.get(name, missing) for name in self.writer.columns))
+        self.writer.commit()
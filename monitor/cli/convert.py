@@ -0,0 +1,99 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Convert binary records to CSV."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import BinaryIO
+
+# standard libs
+import sys
+import functools
+
+# external libs
+from cmdkit.app import Application, exit_status
+from cmdkit.cli import Interface
+
+# internal libs
+from .. import __appname__
+from ..core.exceptions import log_and_exit
+from ..core.logging import Logger
+from ..core.output import BinaryReader, CSVWriter, format_float32
+
+# public interface
+__all__ = ['Convert', ]
+
+
+PROGRAM = f'{__appname__} convert'
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] FILE [--no-header]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+Read records written with the --binary option and print them in
+the same CSV format as the --csv option.
+
+arguments:
+FILE                           Path to binary file ("-" for <stdin>).
+
+options:
+    --no-header                Suppress printing header.
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('convert')
+
+
+class Convert(Application):
+    """Convert binary records to CSV."""
+
+    interface = Interface(PROGRAM, USAGE, HELP)
+
+    source: str = None
+    interface.add_argument('source')
+
+    no_header: bool = False
+    interface.add_argument('--no-header', action='store_true')
+
+    exceptions = {
+        RuntimeError: functools.partial(log_and_exit, logger=log.critical,
+                                        status=exit_status.runtime_error),
+    }
+
+    def run(self) -> None:
+        """Convert file."""
+        if self.source == '-':
+            self.convert(sys.stdin.buffer)
+        else:
+            try:
+                with open(self.source, mode='rb') as stream:
+                    self.convert(stream)
+            except FileNotFoundError as error:
+                raise RuntimeError(f'File not found: {self.source}') from error
+
+    def convert(self, stream: BinaryIO) -> None:
+        """Read binary records from `stream` and write CSV to <stdout>."""
+        reader = BinaryReader(stream)
+        writer = CSVWriter(reader.resource, reader.columns, hostname=reader.hostname,
+                           buffer_size=1024 * 1024, flush_interval=float('inf'))
+        if not self.no_header:
+            writer.write_header()
+        formatters = [format_float32 if dtype == 'f' else str for dtype in reader.dtypes]
+        for timestamp, *values in reader:
+            writer.write_ns(timestamp * 1_000_000, *(fmt(value) for fmt, value in zip(formatters, values)))
+            writer.commit()
+        writer.close()
@@ -22,18 +22,19 @@ from cmdkit.cli import Interface, ArgumentError
 from ... import __appname__
 from ...core.logging import Logger
 from ...core.exceptions import CompletedCommand
-
-# resource commands
-from .percent import CPUPercent
-from .memory import CPUMemory
+from ...core.loader import load
 
 # public interface
 __all__ = ['CPUDevice', ]
 
 
+# NOTE: only the selected resource is imported
 RESOURCES = {
-    'percent': CPUPercent,
-    'memory': CPUMemory,
+    'percent': f'{__name__}.percent:CPUPercent',
+    'memory': f'{__name__}.memory:CPUMemory',
+    'times': f'{__name__}.times:CPUTimes',
+    'procs': f'{__name__}.procs:CPUProcs',
+    'cgroup': f'{__name__}.cgroup:CPUCGroup',
 }
 
 
@@ -48,8 +49,11 @@ HELP = f"""\
 {USAGE}
 
 resources:
-percent            {CPUPercent.__doc__}
-memory             {CPUMemory.__doc__}
+percent            Monitor CPU percent utilization.
+memory             Monitor CPU memory utilization.
+times              Monitor CPU time by state (user, system, iowait, steal, ...).
+procs              Monitor CPU and memory usage of the top processes.
+cgroup             Monitor CPU and memory usage by control group (cgroup v2).
 
 options:
 -h, --help         Show this message and exit.
@@ -77,7 +81,7 @@ class CPUDevice(Application):
     def run(self) -> None:
         """Show usage/help/version or defer to group."""
         if self.resource in RESOURCES:
-            status = RESOURCES[self.resource].main(sys.argv[3:])
+            status = load(RESOURCES[self.resource]).main(sys.argv[3:])
             raise CompletedCommand(status)
         else:
             raise ArgumentError(f'"{self.resource}" is not a CPU resource.')
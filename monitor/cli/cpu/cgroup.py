@@ -0,0 +1,105 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Monitor CPU and memory usage by control group (cgroup v2)."""
+
+
+# type annotations
+from __future__ import annotations
+
+# external libs
+from cmdkit.app import Application
+from cmdkit.cli import Interface
+
+# internal libs
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
+from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+from ...contrib.cgroup import CGroupTable
+from ... import __appname__
+from ..options import OutputOptions, get_exceptions
+
+# public interface
+__all__ = ['CPUCGroup', ]
+
+
+PROGRAM = f'{__appname__} cpu cgroup'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] [-p PATTERN] [-s SECONDS] [--report-interval SECONDS] [--align]
+       {PADDING} [--csv [--no-header]] [--flush SECONDS] [--self-stats PATH] [--store [DIR]]
+       {PADDING} [--alerts FILE]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+options:
+-p, --pattern      PATTERN     Groups to show, relative to the root (default: *).
+-s, --sample-rate  SECONDS     Time between samples (default: 1).
+    --report-interval SECONDS  Write statistics over this period instead.
+    --align                    Align samples with the clock (e.g., on the second).
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+    --store        [DIR]       Also keep samples in DIR for "monitor query" (see manual).
+    --alerts       FILE        Evaluate alert rules in FILE on every sample (see manual).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('cpu.cgroup')
+
+
+class CPUCGroup(OutputOptions, Application):
+    """Monitor CPU and memory usage by control group (cgroup v2)."""
+
+    ALLOW_NOARGS = True
+    interface = Interface(PROGRAM, USAGE, HELP)
+    formats = ['plain', 'csv']  # NOTE: group names are not numeric
+    exceptions = get_exceptions(log)
+
+    sample_rate: float = 1
+    interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
+
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    pattern: str = '*'
+    interface.add_argument('-p', '--pattern', default=pattern)
+
+    def run(self) -> None:
+        """Run monitor."""
+
+        self.check_output_options()
+
+        log.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            log.handlers[0] = CSV_HANDLER
+
+        table = CGroupTable(self.pattern)
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('cpu.cgroup', ['cgroup_id', 'cgroup_percent', 'cgroup_memory'], log,
+                                 stats=stats)
+
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                for name, percent, memory in table.sample():
+                    writer.write(name, percent, memory if memory is not None else writer.missing)
+                writer.commit()
+        finally:
+            writer.close()
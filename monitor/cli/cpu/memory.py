@@ -14,28 +14,30 @@
 # type annotations
 from __future__ import annotations
 
-# standard libs
-import time
-import functools
-
 # external libs
 import psutil
-from cmdkit.app import Application, exit_status
+from cmdkit.app import Application
 from cmdkit.cli import Interface, ArgumentError
 
 # internal libs
-from ...core.exceptions import log_and_exit
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
 from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
 from ... import __appname__
+from ..options import OutputOptions, get_exceptions
 
 # public interface
 __all__ = ['CPUMemory', ]
 
 
 PROGRAM = f'{__appname__} cpu memory'
+PADDING = ' ' * len(PROGRAM)
 
 USAGE = f"""\
-usage: {PROGRAM} [-h] [-s SECONDS] [--actual [--human-readable]] [--csv [--no-header]]
+usage: {PROGRAM} [-h] [-s SECONDS] [--report-interval SECONDS] [--align]
+       {PADDING} [--actual [--human-readable]]
+       {PADDING} [--csv [--no-header] | --binary | --parquet PATH | --push ADDRESS]
+       {PADDING} [--flush SECONDS] [--self-stats PATH] [--store [DIR]] [--alerts FILE]
 {__doc__}\
 """
 
@@ -46,10 +48,19 @@ options:
     --percent                   Report value as a percentage (default).
     --actual                    Report value as total bytes.
 -s, --sample-rate     SECONDS   Time between samples (default: 1).
+    --report-interval SECONDS   Write statistics over this period instead.
+    --align                     Align samples with the clock (e.g., on the second).
 -H, --human-readable            Human readable values (e.g., "8.2G").
     --plain                     Print messages in syslog format (default).
     --csv                       Print messages in CSV format.
+    --binary                    Write compact binary records (see "monitor convert").
+    --parquet         PATH      Write Parquet files (requires pyarrow).
+    --push            ADDRESS   Send binary records to ADDRESS (see "monitor receive").
     --no-header                 Suppress printing header in CSV mode.
+    --flush           SECONDS   Time between writes (default: 0, not in plain mode).
+    --self-stats      PATH      Write overhead of the monitor itself as CSV ('-' for stderr).
+    --store           [DIR]     Also keep samples in DIR for "monitor query" (see manual).
+    --alerts          FILE      Evaluate alert rules in FILE on every sample (see manual).
 -h, --help                      Show this message and exit.\
 """
 
@@ -68,15 +79,22 @@ def format_size(num: float, scale_units: bool = False, divisor: int = 1024) -> s
         num /= divisor
 
 
-class CPUMemory(Application):
+class CPUMemory(OutputOptions, Application):
     """Monitor CPU memory utilization."""
 
     ALLOW_NOARGS = True  # no usage behavior
     interface = Interface(PROGRAM, USAGE, HELP)
+    exceptions = get_exceptions(log)
 
     sample_rate: float = 1
     interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
 
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
     human_readable: bool = False
     interface.add_argument('-H', '--human-readable', action='store_true')
 
@@ -86,38 +104,35 @@ class CPUMemory(Application):
     memory_interface.add_argument('--actual', action='store_true', dest='memory_actual')
     memory_interface.add_argument('--percent', action='store_true', dest='memory_percent')
 
-    format_csv: bool = False
-    format_plain: bool = True
-    format_interface = interface.add_mutually_exclusive_group()
-    format_interface.add_argument('--csv', action='store_true', dest='format_csv')
-    format_interface.add_argument('--plain', action='store_true', dest='format_plain')
-
-    no_header: bool = False
-    interface.add_argument('--no-header', action='store_true')
-
-    exceptions = {
-        RuntimeError: functools.partial(log_and_exit, logger=log.critical,
-                                        status=exit_status.runtime_error),
-    }
-
     def run(self) -> None:
         """Run monitor."""
 
-        if not self.format_csv and self.no_header:
-            raise ArgumentError('--no-header only applies to --csv mode.')
+        self.check_output_options()
 
         mem_attr = 'used' if self.memory_actual else 'percent'
         if not self.memory_actual and self.human_readable:
             raise ArgumentError('"--human-readable" only applies to "--actual" values.')
+        if self.output_format in ('binary', 'parquet', 'push') and self.human_readable:
+            raise ArgumentError(f'"--human-readable" does not apply to "--{self.output_format}" mode.')
+        if self.report_interval is not None and self.human_readable:
+            raise ArgumentError('"--human-readable" does not apply with "--report-interval".')
+        if self.store_path is not None and self.human_readable:
+            raise ArgumentError('"--human-readable" does not apply with "--store".')
+        if self.alerts_path is not None and self.human_readable:
+            raise ArgumentError('"--human-readable" does not apply with "--alerts".')
 
         log.handlers[0] = PLAIN_HANDLER
         if self.format_csv:
             log.handlers[0] = CSV_HANDLER
-            if not self.no_header:
-                print(f'timestamp,hostname,resource,memory_{mem_attr}')
-
-        formatter = functools.partial(format_size, scale_units=self.human_readable)
-        while True:
-            time.sleep(self.sample_rate)
-            value = getattr(psutil.virtual_memory(), mem_attr)
-            log.debug(formatter(value))
+
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('cpu.memory', [f'memory_{mem_attr}'], log,
+                                 dtypes=['Q' if self.memory_actual else 'f'], stats=stats)
+
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                value = getattr(psutil.virtual_memory(), mem_attr)
+                writer.write(value if not self.human_readable else format_size(value, scale_units=True))
+                writer.commit()
+        finally:
+            writer.close()
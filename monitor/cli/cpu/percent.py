@@ -13,20 +13,23 @@
 
 # type annotations
 from __future__ import annotations
+from typing import Callable
 
 # standard libs
-import time
 import functools
 
 # external libs
 import psutil
-from cmdkit.app import Application, exit_status
+from cmdkit.app import Application
 from cmdkit.cli import Interface, ArgumentError
 
 # internal libs
-from ...core.exceptions import log_and_exit
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
 from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+from ...contrib.procfs import CPUStat, get_cpustat
 from ... import __appname__
+from ..options import OutputOptions, get_exceptions
 
 # public interface
 __all__ = ['CPUPercent', ]
@@ -36,7 +39,9 @@ PROGRAM = f'{__appname__} cpu percent'
 PADDING = ' ' * len(PROGRAM)
 
 USAGE = f"""\
-usage: {PROGRAM} [-h] [--all-cores] [-s SECONDS] [--csv [--no-header]]
+usage: {PROGRAM} [-h] [--all-cores [--wide]] [-s SECONDS] [--report-interval SECONDS] [--align]
+       {PADDING} [--csv [--no-header] | --binary | --parquet PATH | --push ADDRESS]
+       {PADDING} [--flush SECONDS] [--self-stats PATH] [--store [DIR]] [--alerts FILE]
 {__doc__}\
 """
 
@@ -46,10 +51,20 @@ HELP = f"""\
 options:
 -t, --total                    Show values for total cpu usage (default).
 -a, --all-cores                Show values for individual cores.
+-w, --wide                     Show all cores in a single row (e.g., cpu_0, cpu_1, ...).
 -s, --sample-rate  SECONDS     Time between samples (default: 1).
+    --report-interval SECONDS  Write statistics over this period instead.
+    --align                    Align samples with the clock (e.g., on the second).
     --plain                    Print messages in syslog format (default).
     --csv                      Print messages in CSV format.
+    --binary                   Write compact binary records (see "monitor convert").
+    --parquet      PATH        Write Parquet files (requires pyarrow).
+    --push         ADDRESS     Send binary records to ADDRESS (see "monitor receive").
     --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+    --store        [DIR]       Also keep samples in DIR for "monitor query" (see manual).
+    --alerts       FILE        Evaluate alert rules in FILE on every sample (see manual).
 -h, --help                     Show this message and exit.\
 """
 
@@ -57,67 +72,78 @@ options:
 log = Logger.with_name('cpu.percent')
 
 
-def cpu_total(callback, template: str = '{value}') -> None:
+def cpu_total(callback: Callable[..., None], stat: CPUStat = None) -> None:
     """Log the total CPU utilization."""
-    value = psutil.cpu_percent()
-    callback(template.format(value=value))
+    callback(psutil.cpu_percent() if stat is None else stat.percent()[0])
 
 
-def cpu_per_core(callback, template: str = '[{i}] {value}') -> None:
+def cpu_per_core(callback: Callable[..., None], stat: CPUStat = None) -> None:
     """Log the CPU utilization per core."""
-    for i, value in enumerate(psutil.cpu_percent(percpu=True)):  # noqa: type iterable
-        callback(template.format(i=i, value=value))
+    values = psutil.cpu_percent(percpu=True) if stat is None else stat.percent()[1:]
+    for i, value in enumerate(values):  # noqa: type iterable
+        callback(i, value)
 
 
-class CPUPercent(Application):
+def cpu_wide(callback: Callable[..., None], stat: CPUStat = None) -> None:
+    """Log the CPU utilization for all cores as a single row."""
+    callback(*(psutil.cpu_percent(percpu=True) if stat is None else stat.percent()[1:]))
+
+
+class CPUPercent(OutputOptions, Application):
     """Monitor CPU percent utilization."""
 
     ALLOW_NOARGS = True
     interface = Interface(PROGRAM, USAGE, HELP)
+    exceptions = get_exceptions(log)
 
     sample_rate: float = 1
     interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
 
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
     total: bool = False
     all_cores: bool = False
     core_interface = interface.add_mutually_exclusive_group()
     core_interface.add_argument('-t', '--total', action='store_true')
     core_interface.add_argument('-a', '--all-cores', action='store_true')
 
-    format_plain: bool = True
-    format_csv: bool = False
-    format_interface = interface.add_mutually_exclusive_group()
-    format_interface.add_argument('--plain', action='store_true', dest='format_plain')
-    format_interface.add_argument('--csv', action='store_true', dest='format_csv')
-
-    no_header: bool = False
-    interface.add_argument('--no-header', action='store_true')
-
-    exceptions = {
-        RuntimeError: functools.partial(log_and_exit, logger=log.critical,
-                                        status=exit_status.runtime_error),
-    }
+    wide: bool = False
+    interface.add_argument('-w', '--wide', action='store_true')
 
     def run(self) -> None:
         """Run monitor."""
 
-        if not self.format_csv and self.no_header:
-            raise ArgumentError('--no-header only applies to --csv mode.')
+        self.check_output_options()
+        if self.wide and not self.all_cores:
+            raise ArgumentError('--wide only applies to --all-cores.')
 
         log.handlers[0] = PLAIN_HANDLER
         if self.format_csv:
             log.handlers[0] = CSV_HANDLER
-            if not self.no_header:
-                if not self.all_cores:
-                    print('timestamp,hostname,resource,cpu_percent')
-                else:
-                    print('timestamp,hostname,resource,cpu_id,cpu_percent')
-
-        if not self.all_cores:
-            log_usage = functools.partial(cpu_total, log.debug)
-        else:
-            log_usage = functools.partial(cpu_per_core, log.debug)
 
-        while True:
-            time.sleep(self.sample_rate)
-            log_usage()
+        # NOTE: read /proc/stat directly if possible (otherwise psutil)
+        stat = get_cpustat()
+        if self.wide:
+            cores = stat.cores if stat is not None else psutil.cpu_count()
+            columns = [f'cpu_{i}' for i in range(cores)]
+            log_usage = functools.partial(cpu_wide, stat=stat)
+        elif self.all_cores:
+            columns = ['cpu_id', 'cpu_percent']
+            log_usage = functools.partial(cpu_per_core, stat=stat)
+        else:
+            columns = ['cpu_percent']
+            log_usage = functools.partial(cpu_total, stat=stat)
+
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('cpu.percent', columns, log, stats=stats)
+
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                log_usage(writer.write)
+                writer.commit()
+        finally:
+            writer.close()
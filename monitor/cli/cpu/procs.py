@@ -0,0 +1,113 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Monitor CPU and memory usage of the top processes."""
+
+
+# type annotations
+from __future__ import annotations
+
+# external libs
+from cmdkit.app import Application
+from cmdkit.cli import Interface, ArgumentError
+
+# internal libs
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
+from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+from ...contrib.process import ProcessTable
+from ... import __appname__
+from ..options import OutputOptions, get_exceptions
+
+# public interface
+__all__ = ['CPUProcs', ]
+
+
+PROGRAM = f'{__appname__} cpu procs'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] [-n COUNT] [--max-scan COUNT] [-s SECONDS] [--report-interval SECONDS]
+       {PADDING} [--align] [--csv [--no-header] | --binary | --parquet PATH | --push ADDRESS]
+       {PADDING} [--flush SECONDS] [--self-stats PATH]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+options:
+-n, --top          COUNT       Number of processes to show (default: 10).
+    --max-scan     COUNT       Processes to visit each sample (default: all).
+-s, --sample-rate  SECONDS     Time between samples (default: 1).
+    --report-interval SECONDS  Write statistics over this period instead.
+    --align                    Align samples with the clock (e.g., on the second).
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --binary                   Write compact binary records (see "monitor convert").
+    --parquet      PATH        Write Parquet files (requires pyarrow).
+    --push         ADDRESS     Send binary records to ADDRESS (see "monitor receive").
+    --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('cpu.procs')
+
+
+class CPUProcs(OutputOptions, Application):
+    """Monitor CPU and memory usage of the top processes."""
+
+    ALLOW_NOARGS = True
+    interface = Interface(PROGRAM, USAGE, HELP)
+    keep_samples = False
+    exceptions = get_exceptions(log, alerts=False)
+
+    sample_rate: float = 1
+    interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
+
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    top: int = 10
+    interface.add_argument('-n', '--top', type=int, default=top)
+
+    max_scan: int = 0
+    interface.add_argument('--max-scan', type=int, default=max_scan)
+
+    def run(self) -> None:
+        """Run monitor."""
+
+        self.check_output_options()
+        if self.top < 1 or self.max_scan < 0:
+            raise ArgumentError('--top must be positive and --max-scan must not be negative.')
+
+        log.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            log.handlers[0] = CSV_HANDLER
+
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('cpu.procs', ['proc_id', 'proc_percent', 'proc_memory'], log,
+                                 dtypes=['I', 'f', 'Q'], stats=stats)
+
+        table = ProcessTable(max_scan=self.max_scan)
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                table.update()
+                for row in table.top(self.top):
+                    writer.write(*row)
+                writer.commit()
+        finally:
+            writer.close()
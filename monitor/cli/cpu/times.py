@@ -0,0 +1,139 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Monitor CPU time by state (user, system, iowait, steal, ...)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Callable
+
+# standard libs
+import functools
+
+# external libs
+import psutil
+from cmdkit.app import Application
+from cmdkit.cli import Interface
+
+# internal libs
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
+from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+from ...contrib.procfs import CPUStat, get_cpustat
+from ... import __appname__
+from ..options import OutputOptions, get_exceptions
+
+# public interface
+__all__ = ['CPUTimes', ]
+
+
+PROGRAM = f'{__appname__} cpu times'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] [--all-cores] [-s SECONDS] [--report-interval SECONDS] [--align]
+       {PADDING} [--csv [--no-header] | --binary | --parquet PATH | --push ADDRESS]
+       {PADDING} [--flush SECONDS] [--self-stats PATH] [--store [DIR]] [--alerts FILE]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+options:
+-t, --total                    Show values for total cpu usage (default).
+-a, --all-cores                Show values for individual cores.
+-s, --sample-rate  SECONDS     Time between samples (default: 1).
+    --report-interval SECONDS  Write statistics over this period instead.
+    --align                    Align samples with the clock (e.g., on the second).
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --binary                   Write compact binary records (see "monitor convert").
+    --parquet      PATH        Write Parquet files (requires pyarrow).
+    --push         ADDRESS     Send binary records to ADDRESS (see "monitor receive").
+    --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+    --store        [DIR]       Also keep samples in DIR for "monitor query" (see manual).
+    --alerts       FILE        Evaluate alert rules in FILE on every sample (see manual).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('cpu.times')
+
+
+def cpu_fields(stat: CPUStat = None) -> List[str]:
+    """Names of available CPU states."""
+    return list(psutil.cpu_times_percent()._fields) if stat is None else stat.fields
+
+
+def cpu_times_total(callback: Callable[..., None], stat: CPUStat = None) -> None:
+    """Log the percent time in each state for all CPUs."""
+    callback(*(psutil.cpu_times_percent() if stat is None else stat.times_percent()[0]))
+
+
+def cpu_times_per_core(callback: Callable[..., None], stat: CPUStat = None) -> None:
+    """Log the percent time in each state per core."""
+    rows = psutil.cpu_times_percent(percpu=True) if stat is None else stat.times_percent()[1:]
+    for i, values in enumerate(rows):  # noqa: type iterable
+        callback(i, *values)
+
+
+class CPUTimes(OutputOptions, Application):
+    """Monitor CPU time by state (user, system, iowait, steal, ...)."""
+
+    ALLOW_NOARGS = True
+    interface = Interface(PROGRAM, USAGE, HELP)
+    exceptions = get_exceptions(log)
+
+    sample_rate: float = 1
+    interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
+
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    total: bool = False
+    all_cores: bool = False
+    core_interface = interface.add_mutually_exclusive_group()
+    core_interface.add_argument('-t', '--total', action='store_true')
+    core_interface.add_argument('-a', '--all-cores', action='store_true')
+
+    def run(self) -> None:
+        """Run monitor."""
+
+        self.check_output_options()
+
+        log.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            log.handlers[0] = CSV_HANDLER
+
+        # NOTE: read /proc/stat directly if possible (otherwise psutil)
+        stat = get_cpustat()
+        columns = [f'cpu_{name}' for name in cpu_fields(stat)]
+        if self.all_cores:
+            columns.insert(0, 'cpu_id')
+            log_usage = functools.partial(cpu_times_per_core, stat=stat)
+        else:
+            log_usage = functools.partial(cpu_times_total, stat=stat)
+
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('cpu.times', columns, log, stats=stats)
+
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                log_usage(writer.write)
+                writer.commit()
+        finally:
+            writer.close()
@@ -0,0 +1,115 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Monitor disk throughput, operations per second, and percent busy."""
+
+
+# type annotations
+from __future__ import annotations
+
+# external libs
+from cmdkit.app import Application
+from cmdkit.cli import Interface
+
+# internal libs
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
+from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+from ...contrib.procfs import DiskStats
+from ... import __appname__
+from ..options import OutputOptions, get_exceptions
+
+# public interface
+__all__ = ['DiskIO', ]
+
+
+PROGRAM = f'{__appname__} disk io'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] [-i PATTERN,...] [-x PATTERN,...] [-s SECONDS] [--report-interval SECONDS]
+       {PADDING} [--align] [--csv [--no-header]] [--flush SECONDS] [--self-stats PATH]
+       {PADDING} [--store [DIR]] [--alerts FILE]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+options:
+-i, --include      PATTERN,... Devices to include (default: *).
+-x, --exclude      PATTERN,... Devices to exclude (default: loop*,ram*).
+-s, --sample-rate  SECONDS     Time between samples (default: 1).
+    --report-interval SECONDS  Write statistics over this period instead.
+    --align                    Align samples with the clock (e.g., on the second).
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+    --store        [DIR]       Also keep samples in DIR for "monitor query" (see manual).
+    --alerts       FILE        Evaluate alert rules in FILE on every sample (see manual).
+-h, --help                     Show this message and exit.
+
+Use "monitor all -r disk.io" for --binary or --parquet output.\
+"""
+
+
+log = Logger.with_name('disk.io')
+
+
+class DiskIO(OutputOptions, Application):
+    """Monitor disk throughput, operations per second, and percent busy."""
+
+    ALLOW_NOARGS = True
+    interface = Interface(PROGRAM, USAGE, HELP)
+    formats = ['plain', 'csv']  # NOTE: device names are not numeric
+    exceptions = get_exceptions(log)
+
+    sample_rate: float = 1
+    interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
+
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    include: str = '*'
+    interface.add_argument('-i', '--include', default=include)
+
+    exclude: str = 'loop*,ram*'
+    interface.add_argument('-x', '--exclude', default=exclude)
+
+    def run(self) -> None:
+        """Run monitor."""
+
+        self.check_output_options()
+
+        log.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            log.handlers[0] = CSV_HANDLER
+
+        try:
+            table = DiskStats(include=self.include.split(','), exclude=self.exclude.split(','))
+        except FileNotFoundError as error:
+            raise RuntimeError(f'Not available: {error.filename}') from error
+
+        columns = ['disk_id'] + [f'disk_{name}' for name in table.fields]
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('disk.io', columns, log, stats=stats)
+
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                for device, rates in sorted(table.update().items()):
+                    writer.write(device, *rates)
+                writer.commit()
+        finally:
+            writer.close()
@@ -22,22 +22,20 @@ from cmdkit.cli import Interface, ArgumentError
 from ... import __appname__
 from ...core.logging import Logger
 from ...core.exceptions import CompletedCommand
-
-# resource commands
-from .percent import GPUPercent
-from .memory import GPUMemory
-from .power import GPUPower
-from .temp import GPUTemp
+from ...core.loader import load
 
 # public interface
 __all__ = ['GPUDevice', ]
 
 
+# NOTE: only the selected resource is imported
 RESOURCES = {
-    'percent': GPUPercent,
-    'memory': GPUMemory,
-    'power': GPUPower,
-    'temp': GPUTemp,
+    'percent': f'{__name__}.percent:GPUPercent',
+    'memory': f'{__name__}.memory:GPUMemory',
+    'power': f'{__name__}.power:GPUPower',
+    'temp': f'{__name__}.temp:GPUTemp',
+    'all': f'{__name__}.all:GPUAll',
+    'procs': f'{__name__}.procs:GPUProcs',
 }
 
 
@@ -52,10 +50,12 @@ HELP = f"""\
 {USAGE}
 
 resources:
-percent            {GPUPercent.__doc__}
-memory             {GPUMemory.__doc__}
-power              {GPUPower.__doc__}
-temp               {GPUTemp.__doc__}
+percent            Monitor GPU percent utilization.
+memory             Monitor GPU memory utilization.
+power              Monitor GPU power consumption (percent maximum).
+temp               Monitor GPU temperature (Celsius).
+all                Monitor all GPU metrics (percent, memory, power, temp) at once.
+procs              Monitor GPU memory and utilization by process.
 
 options:
 -h, --help         Show this message and exit.
@@ -83,7 +83,7 @@ class GPUDevice(Application):
     def run(self) -> None:
         """Show usage/help/version or defer to group."""
         if self.resource in RESOURCES:
-            status = RESOURCES[self.resource].main(sys.argv[3:])
+            status = load(RESOURCES[self.resource]).main(sys.argv[3:])
             raise CompletedCommand(status)
         else:
             raise ArgumentError(f'"{self.resource}" is not a GPU resource.')
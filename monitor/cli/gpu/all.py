@@ -0,0 +1,117 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Monitor all GPU metrics (percent, memory, power, temp) at once."""
+
+
+# type annotations
+from __future__ import annotations
+
+# external libs
+from cmdkit.app import Application
+from cmdkit.cli import Interface
+
+# internal libs
+from ... import __appname__
+from ..options import OutputOptions, get_exceptions
+from ...contrib import SMIData, PROVIDERS
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
+from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+
+# public interface
+__all__ = ['GPUAll', ]
+
+
+PROGRAM = f'{__appname__} gpu all'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] [-s SECONDS] [--report-interval SECONDS] [--align] [--stream]
+       {PADDING} [--provider NAME]
+       {PADDING} [--csv [--no-header] | --binary | --parquet PATH | --push ADDRESS]
+       {PADDING} [--flush SECONDS] [--self-stats PATH] [--store [DIR]] [--alerts FILE]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+options:
+-s, --sample-rate  SECONDS     Time between samples (default: 1).
+    --report-interval SECONDS  Write statistics over this period instead.
+    --align                    Align samples with the clock (e.g., on the second).
+    --stream                   Keep a single nvidia-smi process running.
+    --provider     NAME        Select GPU provider (default: detected).
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --binary                   Write compact binary records (see "monitor convert").
+    --parquet      PATH        Write Parquet files (requires pyarrow).
+    --push         ADDRESS     Send binary records to ADDRESS (see "monitor receive").
+    --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+    --store        [DIR]       Also keep samples in DIR for "monitor query" (see manual).
+    --alerts       FILE        Evaluate alert rules in FILE on every sample (see manual).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('gpu.all')
+
+
+# NOTE: order of columns in output
+METRICS = ['percent', 'memory', 'power', 'temp']
+
+
+class GPUAll(OutputOptions, Application):
+    """Monitor all GPU metrics (percent, memory, power, temp) at once."""
+
+    ALLOW_NOARGS = True
+    interface = Interface(PROGRAM, USAGE, HELP)
+    exceptions = get_exceptions(log)
+
+    sample_rate: float = 1
+    interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
+
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    stream: bool = False
+    interface.add_argument('--stream', action='store_true')
+
+    provider: str = None
+    interface.add_argument('--provider', choices=list(PROVIDERS), default=provider)
+
+    def run(self) -> None:
+        """Run monitor."""
+
+        self.check_output_options()
+
+        log.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            log.handlers[0] = CSV_HANDLER
+
+        columns = ['gpu_id'] + [f'gpu_{metric}' for metric in METRICS]
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('gpu.all', columns, log, stats=stats)
+
+        smi = SMIData(self.provider, stream_interval=self.sample_rate if self.stream else None)
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                data = smi.snapshot
+                for gpu_id in data['percent']:
+                    writer.write(gpu_id, *(data[metric][gpu_id] for metric in METRICS))
+                writer.commit()
+        finally:
+            writer.close()
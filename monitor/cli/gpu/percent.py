@@ -14,18 +14,16 @@
 # type annotations
 from __future__ import annotations
 
-# standard libs
-import time
-import functools
-
 # external libs
-from cmdkit.app import Application, exit_status
-from cmdkit.cli import Interface, ArgumentError
+from cmdkit.app import Application
+from cmdkit.cli import Interface
 
 # internal libs
 from ... import __appname__
-from ...contrib import SMIData
-from ...core.exceptions import log_and_exit
+from ..options import OutputOptions, get_exceptions
+from ...contrib import SMIData, PROVIDERS
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
 from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
 
 # public interface
@@ -33,9 +31,13 @@ __all__ = ['GPUPercent', ]
 
 
 PROGRAM = f'{__appname__} gpu percent'
+PADDING = ' ' * len(PROGRAM)
 
 USAGE = f"""\
-usage: {PROGRAM} [-h] [-s SECONDS] [--csv [--no-header]]
+usage: {PROGRAM} [-h] [-s SECONDS] [--report-interval SECONDS] [--align] [--stream]
+       {PADDING} [--provider NAME]
+       {PADDING} [--csv [--no-header] | --binary | --parquet PATH | --push ADDRESS]
+       {PADDING} [--flush SECONDS] [--self-stats PATH] [--store [DIR]] [--alerts FILE]
 {__doc__}\
 """
 
@@ -44,9 +46,20 @@ HELP = f"""\
 
 options:
 -s, --sample-rate  SECONDS     Time between samples (default: 1).
+    --report-interval SECONDS  Write statistics over this period instead.
+    --align                    Align samples with the clock (e.g., on the second).
+    --stream                   Keep a single nvidia-smi process running.
+    --provider     NAME        Select GPU provider (default: detected).
     --plain                    Print messages in syslog format (default).
     --csv                      Print messages in CSV format.
+    --binary                   Write compact binary records (see "monitor convert").
+    --parquet      PATH        Write Parquet files (requires pyarrow).
+    --push         ADDRESS     Send binary records to ADDRESS (see "monitor receive").
     --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+    --store        [DIR]       Also keep samples in DIR for "monitor query" (see manual).
+    --alerts       FILE        Evaluate alert rules in FILE on every sample (see manual).
 -h, --help                     Show this message and exit.\
 """
 
@@ -54,43 +67,45 @@ options:
 log = Logger.with_name('gpu.percent')
 
 
-class GPUPercent(Application):
+class GPUPercent(OutputOptions, Application):
     """Monitor GPU percent utilization."""
 
     ALLOW_NOARGS = True
     interface = Interface(PROGRAM, USAGE, HELP)
+    exceptions = get_exceptions(log)
 
     sample_rate: float = 1
     interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
 
-    format_plain: bool = True
-    format_csv: bool = False
-    format_interface = interface.add_mutually_exclusive_group()
-    format_interface.add_argument('--plain', action='store_true', dest='format_plain')
-    format_interface.add_argument('--csv', action='store_true', dest='format_csv')
+    report_interval: float = None
+    interface.add_argument('--report-interval', type=float, default=report_interval)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
 
-    no_header: bool = False
-    interface.add_argument('--no-header', action='store_true')
+    stream: bool = False
+    interface.add_argument('--stream', action='store_true')
 
-    exceptions = {
-        RuntimeError: functools.partial(log_and_exit, logger=log.critical,
-                                        status=exit_status.runtime_error),
-    }
+    provider: str = None
+    interface.add_argument('--provider', choices=list(PROVIDERS), default=provider)
 
     def run(self) -> None:
         """Run monitor."""
 
-        if not self.format_csv and self.no_header:
-            raise ArgumentError('--no-header only applies to --csv mode.')
+        self.check_output_options()
 
         log.handlers[0] = PLAIN_HANDLER
         if self.format_csv:
             log.handlers[0] = CSV_HANDLER
-            if not self.no_header:
-                print('timestamp,hostname,resource,gpu_id,gpu_percent')
-
-        smi = SMIData()
-        while True:
-            time.sleep(self.sample_rate)
-            for gpu_id, gpu_percent in smi.percent.items():
-                log.debug(f'[{gpu_id}] {gpu_percent}')
+
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('gpu.percent', ['gpu_id', 'gpu_percent'], log, stats=stats)
+
+        smi = SMIData(self.provider, stream_interval=self.sample_rate if self.stream else None)
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                for gpu_id, gpu_percent in smi.percent.items():
+                    writer.write(gpu_id, gpu_percent)
+                writer.commit()
+        finally:
+            writer.close()
@@ -0,0 +1,121 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Monitor GPU memory and utilization by process."""
+
+
+# type annotations
+from __future__ import annotations
+
+# external libs
+from cmdkit.app import Application
+from cmdkit.cli import Interface
+
+# internal libs
+from ... import __appname__
+from ..options import OutputOptions, get_exceptions
+from ...contrib import SMIData, PROVIDERS
+from ...contrib.process import ProcessOwners
+from ...core.schedule import Scheduler
+from ...core.selfstats import get_self_stats
+from ...core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+
+# public interface
+__all__ = ['GPUProcs', ]
+
+
+PROGRAM = f'{__appname__} gpu procs'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] [-s SECONDS] [-q SECONDS] [--percent] [--provider NAME] [--align]
+       {PADDING} [--csv [--no-header] | --binary | --parquet PATH | --push ADDRESS]
+       {PADDING} [--flush SECONDS] [--self-stats PATH]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+options:
+-s, --sample-rate  SECONDS     Time between samples (default: 1).
+-q, --query-interval SECONDS   Time between process queries (default: sample rate).
+    --percent                  Include percent utilization by process.
+    --provider     NAME        Select GPU provider (default: detected).
+    --align                    Align samples with the clock (e.g., on the second).
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --binary                   Write compact binary records (see "monitor convert").
+    --parquet      PATH        Write Parquet files (requires pyarrow).
+    --push         ADDRESS     Send binary records to ADDRESS (see "monitor receive").
+    --no-header                Suppress printing header in CSV mode.
+    --flush        SECONDS     Time between writes (default: 0, not in plain mode).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('gpu.procs')
+
+
+class GPUProcs(OutputOptions, Application):
+    """Monitor GPU memory and utilization by process."""
+
+    ALLOW_NOARGS = True
+    interface = Interface(PROGRAM, USAGE, HELP)
+    keep_samples = False
+    exceptions = get_exceptions(log, alerts=False)
+
+    sample_rate: float = 1
+    interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    query_interval: float = None
+    interface.add_argument('-q', '--query-interval', type=float, default=query_interval)
+
+    percent: bool = False
+    interface.add_argument('--percent', action='store_true')
+
+    provider: str = None
+    interface.add_argument('--provider', choices=list(PROVIDERS), default=provider)
+
+    def run(self) -> None:
+        """Run monitor."""
+
+        self.check_output_options()
+
+        log.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            log.handlers[0] = CSV_HANDLER
+
+        columns = ['gpu_id', 'proc_id', 'proc_uid', 'proc_memory']
+        dtypes = ['H', 'I', 'I', 'Q']
+        if self.percent:
+            columns.append('proc_percent')
+            dtypes.append('f')
+        stats = get_self_stats(self.self_stats)
+        writer = self.get_writer('gpu.procs', columns, log, dtypes=dtypes, stats=stats)
+
+        owners = ProcessOwners()
+        smi = SMIData(self.provider, procs_interval=self.query_interval or 0)
+        try:
+            for _ in Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats):
+                data = smi.get_procs(percent=self.percent)
+                for (gpu_id, pid), memory in sorted(data['memory'].items()):
+                    values = [gpu_id, pid, owners.get(pid), int(memory)]
+                    if self.percent:
+                        values.append(data.get('percent', {}).get((gpu_id, pid), writer.missing))
+                    writer.write(*values)
+                owners.prune({pid for _, pid in data['memory']})
+                writer.commit()
+        finally:
+            writer.close()
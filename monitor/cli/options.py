@@ -0,0 +1,133 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Output options shared by resource commands."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Type, Callable
+
+# standard libs
+import functools
+
+# external libs
+from cmdkit.app import exit_status
+from cmdkit.cli import Interface, ArgumentError
+
+# internal libs
+from ..core.exceptions import log_and_exit, AlertTriggered, ALERT_STATUS
+from ..core.output import RecordWriter, get_writer
+from ..core.selfstats import SelfStats
+from ..core.logging import Logger
+
+# public interface
+__all__ = ['OutputOptions', 'get_exceptions', 'FORMATS', ]
+
+
+# NOTE: every output format (in order of options)
+FORMATS = ['plain', 'csv', 'binary', 'parquet', 'push']
+
+
+class OutputOptions:
+    """
+    Output options for a resource command (mixed in before `Application`).
+
+    The command declares the `formats` it supports and whether samples can also be
+    kept with --store and checked with --alerts (`keep_samples`). These options
+    are added to its `interface` when the class is defined (after its own options).
+    Commands with --report-interval also define `report_interval`.
+    """
+
+    interface: Interface
+    formats: List[str] = FORMATS
+    keep_samples: bool = True
+
+    sample_rate: float = 1
+    report_interval: float = None
+
+    format_plain: bool = True
+    format_csv: bool = False
+    format_binary: bool = False
+    parquet_path: str = None
+    push_address: str = None
+    no_header: bool = False
+    flush_interval: float = None
+    self_stats: str = None
+    store_path: str = None  # NOTE: empty for the default directory (see MONITOR_STORE_DIR)
+    alerts_path: str = None
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """Add options to the `interface` of the command."""
+        super().__init_subclass__(**kwargs)
+        for name in cls.formats:
+            if name not in FORMATS:
+                raise ValueError(f'Unknown output format ({name})')
+        format_interface = cls.interface.add_mutually_exclusive_group()
+        format_interface.add_argument('--plain', action='store_true', dest='format_plain')
+        format_interface.add_argument('--csv', action='store_true', dest='format_csv')
+        if 'binary' in cls.formats:
+            format_interface.add_argument('--binary', action='store_true', dest='format_binary')
+        if 'parquet' in cls.formats:
+            format_interface.add_argument('--parquet', default=None, dest='parquet_path')
+        if 'push' in cls.formats:
+            format_interface.add_argument('--push', default=None, dest='push_address')
+        cls.interface.add_argument('--no-header', action='store_true')
+        cls.interface.add_argument('--flush', type=float, default=None, dest='flush_interval')
+        cls.interface.add_argument('--self-stats', default=None)
+        if cls.keep_samples:
+            cls.interface.add_argument('--store', nargs='?', const='', default=None, dest='store_path')
+            cls.interface.add_argument('--alerts', default=None, dest='alerts_path')
+
+    @property
+    def output_format(self) -> str:
+        """Either 'plain', 'csv', 'binary', 'parquet', or 'push'."""
+        if self.parquet_path is not None:
+            return 'parquet'
+        if self.push_address is not None:
+            return 'push'
+        return 'csv' if self.format_csv else 'binary' if self.format_binary else 'plain'
+
+    @property
+    def report_window(self) -> int:
+        """Number of samples for each report (zero if not reporting statistics)."""
+        if self.report_interval is None:
+            return 0
+        return round(self.report_interval / self.sample_rate)
+
+    def check_output_options(self) -> None:
+        """Raise ArgumentError if options do not apply together."""
+        if not self.format_csv and self.no_header:
+            raise ArgumentError('--no-header only applies to --csv mode.')
+        if self.output_format == 'plain' and self.flush_interval is not None:
+            raise ArgumentError('--flush does not apply to --plain mode.')
+        if self.report_interval is not None and self.report_interval < self.sample_rate:
+            raise ArgumentError('--report-interval must not be less than --sample-rate.')
+
+    def get_writer(self, resource: str, columns: List[str], logger: Logger, dtypes: List[str] = None,
+                   stats: SelfStats = None) -> RecordWriter:
+        """Create writer for `resource` with the selected options (see `get_writer`)."""
+        return get_writer(resource, columns, logger, fmt=self.output_format, no_header=self.no_header,
+                          flush_interval=self.flush_interval or 0, dtypes=dtypes,
+                          path=self.parquet_path, address=self.push_address,
+                          window=self.report_window, stats=stats,
+                          store=self.store_path, alerts=self.alerts_path)
+
+
+def get_exceptions(logger: Logger, alerts: bool = True) -> Dict[Type[Exception], Callable[[Exception], int]]:
+    """Exception handlers for a resource command (`AlertTriggered` too if `alerts`)."""
+    exceptions = {
+        RuntimeError: functools.partial(log_and_exit, logger=logger.critical,
+                                        status=exit_status.runtime_error),
+    }
+    if alerts:
+        exceptions[AlertTriggered] = functools.partial(log_and_exit, logger=logger.critical,
+                                                       status=ALERT_STATUS)
+    return exceptions
@@ -0,0 +1,167 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Read samples kept with the --store option."""
+
+
+# type annotations
+from __future__ import annotations
+
+# standard libs
+import re
+import functools
+from datetime import datetime, timedelta
+
+# external libs
+from cmdkit.app import Application, exit_status
+from cmdkit.cli import Interface, ArgumentError
+
+# internal libs
+from .. import __appname__
+from ..core.exceptions import log_and_exit
+from ..core.output import get_writer, format_float32
+from ..core.store import STORE_DIR, TIERS, query, list_series
+from ..core.logging import Logger, PLAIN_HANDLER, CSV_HANDLER
+
+# public interface
+__all__ = ['Query', 'parse_time', ]
+
+
+PROGRAM = f'{__appname__} query'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] -r NAME [--since TIME] [--until TIME] [--tier NAME] [--series PATTERN,...]
+       {PADDING} [--store DIR] [--list] [--csv [--no-header]]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+Samples kept with --store are summarized in tiers of 1 second, 1 minute,
+and 1 hour. Each row has the mean, minimum, and maximum for a single
+series (a column, and identifier if any, e.g., gpu_temp.0) over one
+period of the tier. Unless given, the finest tier that still has data
+for the start of the range is used.
+
+TIME is either a duration before now (e.g., 90s, 30m, 2h, or 1d) or a
+date and time (e.g., '2026-10-18 06:00').
+
+options:
+-r, --resource     NAME        Resource to read (e.g., cpu.percent or all).
+    --since        TIME        Start of range (default: 1h).
+    --until        TIME        End of range (default: now).
+    --tier         NAME        Select tier ({', '.join(tier for tier, _, _ in TIERS)}).
+    --series       PATTERN,... Select series by glob pattern (default: all).
+    --store        DIR         Location of store (default: {STORE_DIR}).
+    --list                     List series for the resource and exit.
+    --plain                    Print messages in syslog format (default).
+    --csv                      Print messages in CSV format.
+    --no-header                Suppress printing header in CSV mode.
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('query')
+
+
+DURATION: re.Pattern = re.compile(r'^(\d+(?:\.\d+)?)([smhd])$')
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_time(value: str, now: datetime) -> datetime:
+    """Time from `value`, a duration before `now` (e.g., '2h') or a date and time."""
+    value = value.strip()
+    if value == 'now':
+        return now
+    match = DURATION.match(value)
+    if match:
+        return now - timedelta(seconds=float(match.group(1)) * UNITS[match.group(2)])
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ArgumentError(f'Expected duration (e.g., 2h) or date and time (given "{value}").') from None
+
+
+class Query(Application):
+    """Read samples kept with the --store option."""
+
+    interface = Interface(PROGRAM, USAGE, HELP)
+
+    resource: str = None
+    interface.add_argument('-r', '--resource', required=True)
+
+    since: str = '1h'
+    interface.add_argument('--since', default=since)
+
+    until: str = 'now'
+    interface.add_argument('--until', default=until)
+
+    tier: str = None
+    interface.add_argument('--tier', choices=[tier for tier, _, _ in TIERS], default=tier)
+
+    series: str = None
+    interface.add_argument('--series', default=series)
+
+    store_path: str = STORE_DIR
+    interface.add_argument('--store', default=store_path, dest='store_path')
+
+    list_only: bool = False
+    interface.add_argument('--list', action='store_true', dest='list_only')
+
+    format_plain: bool = True
+    format_csv: bool = False
+    format_interface = interface.add_mutually_exclusive_group()
+    format_interface.add_argument('--plain', action='store_true', dest='format_plain')
+    format_interface.add_argument('--csv', action='store_true', dest='format_csv')
+
+    no_header: bool = False
+    interface.add_argument('--no-header', action='store_true')
+
+    exceptions = {
+        RuntimeError: functools.partial(log_and_exit, logger=log.critical,
+                                        status=exit_status.runtime_error),
+    }
+
+    def run(self) -> None:
+        """Print records in range."""
+
+        if not self.format_csv and self.no_header:
+            raise ArgumentError('--no-header only applies to --csv mode.')
+
+        names = list_series(self.store_path, self.resource)
+        if not names:
+            raise RuntimeError(f'Nothing stored for {self.resource} in {self.store_path}')
+        if self.list_only:
+            print('\n'.join(names))
+            return
+
+        now = datetime.now()
+        start, end = parse_time(self.since, now), parse_time(self.until, now)
+        if end <= start:
+            raise ArgumentError('--until must be after --since.')
+
+        output = Logger.with_name(self.resource)  # NOTE: messages are from the stored resource
+        output.handlers[0] = PLAIN_HANDLER
+        if self.format_csv:
+            output.handlers[0] = CSV_HANDLER
+        writer = get_writer(self.resource, ['series_id', 'mean', 'min', 'max'], output,
+                            fmt='csv' if self.format_csv else 'plain', no_header=self.no_header,
+                            flush_interval=float('inf'))
+        try:
+            rows = query(self.store_path, self.resource, round(start.timestamp() * 1000),
+                         round(end.timestamp() * 1000), tier=self.tier,
+                         series=self.series and self.series.split(','))
+            for timestamp, name, *values in rows:
+                writer.write_at(datetime.fromtimestamp(timestamp / 1000), name, *map(format_float32, values))
+                writer.commit()
+        finally:
+            writer.close()
@@ -0,0 +1,166 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Receive records sent with --push and print them as CSV."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Dict, Tuple
+
+# standard libs
+import sys
+import functools
+import threading
+import socketserver
+
+# external libs
+from cmdkit.app import Application, exit_status
+from cmdkit.cli import Interface
+
+# internal libs
+from .. import __appname__
+from ..core.exceptions import log_and_exit
+from ..core.logging import Logger
+from ..core.output import CSVWriter, format_float32
+from ..core.network import (FrameDecoder, RecordDecoder, parse_address, remove_socket,
+                            FRAME_HEADER, FRAME_RECORDS)
+
+# public interface
+__all__ = ['Receive', ]
+
+
+PROGRAM = f'{__appname__} receive'
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] ADDRESS [--no-header]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+Listen for records sent by any number of monitors with the --push option
+and print them in the same CSV format as the --csv option (with the
+hostname of each sender). This is meant for testing and small setups.
+
+arguments:
+ADDRESS                        Listen on tcp://HOST:PORT, udp://HOST:PORT, or unix://PATH.
+
+options:
+    --no-header                Suppress printing header (once for each sender and resource).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('receive')
+
+
+class Output:
+    """Write rows from many connections to <stdout> (one connection at a time)."""
+
+    no_header: bool
+    lock: threading.Lock
+    writers: Dict[Tuple[str, ...], CSVWriter]  # NOTE: one for each sender, resource, and columns
+
+    def __init__(self, no_header: bool = False) -> None:
+        """Initialize empty."""
+        self.no_header = no_header
+        self.lock = threading.Lock()
+        self.writers = {}
+
+    def write(self, decoder: RecordDecoder, payload: bytes) -> None:
+        """Write records in `payload` (header first if a new sender and resource)."""
+        formatters = [format_float32 if dtype == 'f' else str for dtype in decoder.dtypes]
+        with self.lock:
+            key = (decoder.hostname, decoder.resource, *decoder.columns)
+            writer = self.writers.get(key)
+            if writer is None:
+                writer = self.writers[key] = CSVWriter(decoder.resource, decoder.columns,
+                                                       hostname=decoder.hostname, buffer_size=1024 * 1024,
+                                                       flush_interval=float('inf'))
+                if not self.no_header:
+                    writer.write_header()
+            for timestamp, *values in decoder.decode(payload):
+                writer.write_ns(timestamp * 1_000_000, *(fmt(value) for fmt, value in zip(formatters, values)))
+            writer.flush()
+
+
+class StreamHandler(socketserver.BaseRequestHandler):
+    """Decode frames from a single connection."""
+
+    def handle(self) -> None:
+        frames, decoder = FrameDecoder(), None
+        while True:
+            data = self.request.recv(65536)
+            if not data:
+                return
+            for kind, payload in frames.feed(data):
+                if kind == FRAME_HEADER:
+                    decoder = RecordDecoder(payload)
+                elif kind == FRAME_RECORDS and decoder is not None:
+                    self.server.output.write(decoder, payload)
+
+
+class DatagramHandler(socketserver.BaseRequestHandler):
+    """Decode frames from a single datagram (always starting with a header)."""
+
+    def handle(self) -> None:
+        decoder = None
+        for kind, payload in FrameDecoder().feed(self.request[0]):
+            if kind == FRAME_HEADER:
+                decoder = RecordDecoder(payload)
+            elif kind == FRAME_RECORDS and decoder is not None:
+                self.server.output.write(decoder, payload)
+
+
+class TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class Receive(Application):
+    """Receive records sent with --push and print them as CSV."""
+
+    interface = Interface(PROGRAM, USAGE, HELP)
+
+    address: str = None
+    interface.add_argument('address')
+
+    no_header: bool = False
+    interface.add_argument('--no-header', action='store_true')
+
+    exceptions = {
+        RuntimeError: functools.partial(log_and_exit, logger=log.critical,
+                                        status=exit_status.runtime_error),
+        OSError: functools.partial(log_and_exit, logger=log.critical,
+                                   status=exit_status.runtime_error),
+    }
+
+    def run(self) -> None:
+        """Listen until interrupted."""
+        protocol, target = parse_address(self.address)
+        if protocol == 'tcp':
+            server = TCPServer(target, StreamHandler)
+        elif protocol == 'udp':
+            server = socketserver.UDPServer(target, DatagramHandler)
+        else:
+            remove_socket(target)  # NOTE: left behind by a previous receiver
+            server = UnixServer(target, StreamHandler)
+        server.output = Output(no_header=self.no_header)
+        try:
+            server.serve_forever()
+        finally:
+            server.server_close()
+            sys.stdout.flush()
@@ -0,0 +1,221 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Serve current values for scraping by Prometheus."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Dict, Tuple, Optional
+
+# standard libs
+import re
+import time
+import asyncio
+import functools
+from datetime import datetime
+
+# external libs
+from cmdkit.app import Application, exit_status
+from cmdkit.cli import Interface, ArgumentError
+
+# internal libs
+from .. import __appname__
+from ..contrib import SMIData, PROVIDERS
+from ..contrib.detect import get_provider
+from ..contrib.procfs import NetDev, DiskStats
+from ..core.exceptions import log_and_exit
+from ..core.schedule import Scheduler
+from ..core.engine import Engine
+from ..core.exposition import MetricsPage, MetricsServer
+from ..core.selfstats import SelfStats, get_self_stats, STAGES
+from ..core.logging import Logger
+from .all import Collector, RESOURCES, DEFAULT_RESOURCES
+
+# public interface
+__all__ = ['Serve', 'describe', ]
+
+
+DEFAULT_PORT = 9110
+GPU_RESOURCES = 'gpu.percent,gpu.memory,gpu.power,gpu.temp'
+
+
+PROGRAM = f'{__appname__} serve'
+PADDING = ' ' * len(PROGRAM)
+
+USAGE = f"""\
+usage: {PROGRAM} [-h] [-p PORT] [--host ADDRESS] [-r NAME,...] [-s SECONDS] [-t SECONDS]
+       {PADDING} [--align] [--stream] [--provider NAME] [--self-stats PATH]
+{__doc__}\
+"""
+
+HELP = f"""\
+{USAGE}
+
+Resources are sampled in the background (as with "monitor all") and the
+latest values are served at /metrics in the Prometheus text format.
+Each scrape returns the document rendered for the latest sample, so
+scraping never starts another query (e.g., nvidia-smi).
+
+resources:
+{', '.join(RESOURCES)}
+
+options:
+-p, --port         PORT        Port to listen on (default: {DEFAULT_PORT}).
+    --host         ADDRESS     Address to listen on (default: all).
+-r, --resources    NAME,...    Resources to sample (default: {DEFAULT_RESOURCES},
+                               and all gpu resources if a GPU is detected).
+-s, --sample-rate  SECONDS     Time between samples (default: 1).
+-t, --timeout      SECONDS     Time allowed for each resource (default: sample rate).
+    --align                    Align samples with the clock (e.g., on the second).
+    --stream                   Keep a single nvidia-smi process running.
+    --provider     NAME        Select GPU provider (default: detected).
+    --self-stats   PATH        Write overhead of the monitor itself as CSV ('-' for stderr).
+-h, --help                     Show this message and exit.\
+"""
+
+
+log = Logger.with_name('serve')
+
+
+# NOTE: metric names and help text for each column (see `describe`)
+HELP_TEXT = {
+    'monitor_cpu_percent': 'CPU percent utilization.',
+    'monitor_cpu_time_percent': 'Percent CPU time by state.',
+    'monitor_memory_percent': 'Memory percent utilization.',
+    'monitor_gpu_percent': 'GPU percent utilization.',
+    'monitor_gpu_memory': 'GPU memory utilization.',
+    'monitor_gpu_power_watts': 'GPU power consumption (Watts).',
+    'monitor_gpu_temp_celsius': 'GPU temperature (Celsius).',
+    'monitor_net_rx_bytes_per_second': 'Network bytes received per second.',
+    'monitor_net_tx_bytes_per_second': 'Network bytes sent per second.',
+    'monitor_net_rx_packets_per_second': 'Network packets received per second.',
+    'monitor_net_tx_packets_per_second': 'Network packets sent per second.',
+    'monitor_disk_read_bytes_per_second': 'Disk bytes read per second.',
+    'monitor_disk_write_bytes_per_second': 'Disk bytes written per second.',
+    'monitor_disk_read_iops': 'Disk read operations per second.',
+    'monitor_disk_write_iops': 'Disk write operations per second.',
+    'monitor_disk_busy_percent': 'Percent of time with disk I/O in progress.',
+    'monitor_sample_timestamp_seconds': 'Time of the latest sample (seconds since epoch).',
+}
+
+GPU_NAMES = {'percent': 'monitor_gpu_percent', 'memory': 'monitor_gpu_memory',
+             'power': 'monitor_gpu_power_watts', 'temp': 'monitor_gpu_temp_celsius'}
+
+COUNTER_FIELDS = {'net': NetDev.fields, 'disk': DiskStats.fields}
+COUNTER_NAMES = {'rx_bytes': 'rx_bytes_per_second', 'tx_bytes': 'tx_bytes_per_second',
+                 'rx_packets': 'rx_packets_per_second', 'tx_packets': 'tx_packets_per_second',
+                 'read_bytes': 'read_bytes_per_second', 'write_bytes': 'write_bytes_per_second',
+                 'read_iops': 'read_iops', 'write_iops': 'write_iops', 'busy': 'busy_percent'}
+
+GPU_PATTERN: re.Pattern = re.compile(r'^gpu_(\d+)_(\w+)$')
+
+
+def describe(column: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """Metric name and labels for a column of `Collector` (e.g., 'gpu_0_temp')."""
+    if column in ('cpu_percent', 'memory_percent', 'sample_timestamp_seconds'):
+        return f'monitor_{column}', {}
+    match = GPU_PATTERN.match(column)
+    if match and match.group(2) in GPU_NAMES:
+        return GPU_NAMES[match.group(2)], {'gpu': match.group(1)}
+    for device, fields in COUNTER_FIELDS.items():
+        if column.startswith(f'{device}_'):
+            for field in fields:
+                if column.endswith(f'_{field}'):
+                    name = column[len(device) + 1:-len(field) - 1]  # NOTE: may contain '_'
+                    return f'monitor_{device}_{COUNTER_NAMES[field]}', {'device': name}
+    if column.startswith('cpu_'):
+        return 'monitor_cpu_time_percent', {'state': column[4:]}
+    return None
+
+
+class Serve(Application):
+    """Serve current values for scraping by Prometheus."""
+
+    ALLOW_NOARGS = True
+    interface = Interface(PROGRAM, USAGE, HELP)
+
+    port: int = DEFAULT_PORT
+    interface.add_argument('-p', '--port', type=int, default=port)
+
+    host: str = ''
+    interface.add_argument('--host', default=host)
+
+    resources: str = None
+    interface.add_argument('-r', '--resources', default=resources)
+
+    sample_rate: float = 1
+    interface.add_argument('-s', '--sample-rate', type=float, default=sample_rate)
+
+    timeout: float = None
+    interface.add_argument('-t', '--timeout', type=float, default=timeout)
+
+    align: bool = False
+    interface.add_argument('--align', action='store_true')
+
+    stream: bool = False
+    interface.add_argument('--stream', action='store_true')
+
+    provider: str = None
+    interface.add_argument('--provider', choices=list(PROVIDERS), default=provider)
+
+    self_stats: str = None
+    interface.add_argument('--self-stats', default=self_stats)
+
+    page: MetricsPage = None
+    stats: Optional[SelfStats] = None
+
+    exceptions = {
+        RuntimeError: functools.partial(log_and_exit, logger=log.critical,
+                                        status=exit_status.runtime_error),
+        OSError: functools.partial(log_and_exit, logger=log.critical,
+                                   status=exit_status.runtime_error),
+    }
+
+    def run(self) -> None:
+        """Start server and sample until interrupted."""
+
+        if not 0 < self.port < 65536:
+            raise ArgumentError(f'--port must be between 1 and 65535 (given {self.port}).')
+
+        resources = self.resources
+        if resources is None:
+            resources = DEFAULT_RESOURCES
+            if self.provider is not None or get_provider() is not None:
+                resources += f',{GPU_RESOURCES}'
+
+        smi = SMIData(self.provider, stream_interval=self.sample_rate if self.stream else None)
+        collector = Collector(resources.split(','), smi=smi)
+        providers = collector.providers
+        self.stats = stats = get_self_stats(self.self_stats, STAGES + list(providers))
+        engine = Engine(providers, timeout=self.timeout or self.sample_rate, name=PROGRAM, stats=stats)
+        scheduler = Scheduler(self.sample_rate, align=self.align, name=PROGRAM, stats=stats)
+
+        self.page = MetricsPage(describe, HELP_TEXT)
+        server = MetricsServer(self.page, self.port, host=self.host)
+        try:
+            asyncio.run(self.run_async(engine, scheduler, server))
+        finally:
+            server.server_close()
+            if stats is not None:
+                stats.close()
+
+    async def run_async(self, engine: Engine, scheduler: Scheduler, server: MetricsServer) -> None:
+        """Collect an initial record before serving, then update on every sample."""
+        self.update(datetime.now(), await engine.prime())
+        server.start()
+        await engine.run(scheduler, self.update)
+
+    def update(self, timestamp: datetime, record: Dict[str, float]) -> None:
+        """Render page from `record` for a single tick."""
+        start = time.perf_counter_ns()
+        self.page.update({**record, 'sample_timestamp_seconds': round(timestamp.timestamp(), 3)})
+        if self.stats is not None:
+            self.stats.record_write(time.perf_counter_ns() - start)
@@ -13,24 +13,115 @@
 
 # type annotations
 from __future__ import annotations
-from typing import Dict, Type, Optional
+from typing import Dict, Tuple, Type, Iterator, Optional, Mapping, TYPE_CHECKING
 
 # standard libs
+import os
+import time
 import functools
-from subprocess import check_output
 
 # internal libs
-from ..core.extern import ExternalMetric
-from .nvidia import NvidiaPercent, NvidiaMemory, NvidiaTemperature, NvidiaPower
-from .rocm import RocmPercent, RocmMemory, RocmTemperature, RocmPower
+from ..core.extern import Metric
+from ..core.loader import load
+from .detect import get_provider
+
+if TYPE_CHECKING:
+    from .nvidia import NvidiaStream
 
 # public interface
-__all__ = ['SMIData', ]
+__all__ = ['SMIData', 'PROVIDERS', 'ProviderMap', ]
+
+
+# NOTE: modules for a provider are only imported when that provider is used
+PROVIDERS: Dict[str, Dict[str, str]] = {
+    'nvidia': {
+        'percent': f'{__name__}.nvidia:NvidiaPercent',
+        'memory': f'{__name__}.nvidia:NvidiaMemory',
+        'power': f'{__name__}.nvidia:NvidiaPower',
+        'temp': f'{__name__}.nvidia:NvidiaTemperature',
+        'all': f'{__name__}.nvidia:NvidiaSnapshot',
+        'devices': f'{__name__}.nvidia:NvidiaDevices',
+        'procs': f'{__name__}.nvidia:NvidiaProcs',
+        'procs_percent': f'{__name__}.nvidia:NvidiaProcsPercent',
+    },
+    'rocm': {
+        'percent': f'{__name__}.rocm:RocmPercent',
+        'memory': f'{__name__}.rocm:RocmMemory',
+        'power': f'{__name__}.rocm:RocmPower',
+        'temp': f'{__name__}.rocm:RocmTemperature',
+        'all': f'{__name__}.rocm:RocmSnapshot',
+        'procs': f'{__name__}.rocm:RocmProcs',
+    },
+    'nvml': {
+        'percent': f'{__name__}.nvml:NvmlPercent',
+        'memory': f'{__name__}.nvml:NvmlMemory',
+        'power': f'{__name__}.nvml:NvmlPower',
+        'temp': f'{__name__}.nvml:NvmlTemperature',
+        'all': f'{__name__}.nvml:NvmlSnapshot',
+    },
+    'amdgpu': {
+        'percent': f'{__name__}.amdgpu:AmdgpuPercent',
+        'memory': f'{__name__}.amdgpu:AmdgpuMemory',
+        'power': f'{__name__}.amdgpu:AmdgpuPower',
+        'temp': f'{__name__}.amdgpu:AmdgpuTemperature',
+        'all': f'{__name__}.amdgpu:AmdgpuSnapshot',
+    },
+}
+
+
+class ProviderMap(Mapping):
+    """Metric classes by provider and resource type (imported on first access)."""
+
+    _paths: Dict[str, Dict[str, str]]
+    _loaded: Dict[str, Dict[str, Type[Metric]]]
+
+    def __init__(self, paths: Dict[str, Dict[str, str]]) -> None:
+        """Initialize with import `paths` by provider and resource type."""
+        self._paths = paths
+        self._loaded = {}
+
+    def __getitem__(self, provider: str) -> Dict[str, Type[Metric]]:
+        if provider not in self._loaded:
+            self._loaded[provider] = {name: load(path) for name, path in self._paths[provider].items()}
+        return self._loaded[provider]
+
+    def __contains__(self, provider: object) -> bool:
+        return provider in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
 
 
 class SMIData:
     """High-level interface to external smi tool for GPU telemetry."""
 
+    selected_provider: Optional[str] = None
+    stream_interval: Optional[float] = None
+    procs_interval: float = 0
+    _streams: Dict[str, NvidiaStream]
+    _procs: Optional[Dict[str, Dict[Tuple[int, int], float]]] = None
+    _procs_time: float = 0
+
+    def __init__(self, provider: str = None, stream_interval: float = None,
+                 procs_interval: float = 0) -> None:
+        """
+        Initialize interface.
+
+        The `provider` is detected automatically unless given explicitly
+        (or by the MONITOR_GPU_PROVIDER environment variable).
+        If `stream_interval` is given, a single long-lived `nvidia-smi` process
+        per metric is kept running in loop mode and the most recent sample is
+        returned instead of invoking a new process each time.
+        Per-process queries (see `get_procs`) are made at most every `procs_interval` seconds.
+        """
+        self.selected_provider = provider or os.getenv('MONITOR_GPU_PROVIDER')
+        self.stream_interval = stream_interval
+        self.procs_interval = procs_interval
+        self._streams = {}
+
     @property
     def percent(self) -> Dict[int, float]:
         """Current percent usage by GPU index."""
@@ -51,49 +142,86 @@ class SMIData:
         """Current temperature by GPU index (in Celsius)."""
         return self.get_telemetry('temp')
 
+    @property
+    def snapshot(self) -> Dict[str, Dict[int, float]]:
+        """Current percent, memory, power, and temp by GPU index (from a single query)."""
+        if self.stream_interval is not None:
+            return self.get_stream('all').latest.data
+        return self.provider_map.get(self.provider).get('all').collect().data
+
     def get_telemetry(self, metric: str) -> Dict[int, float]:
         """Current usage of `metric` by GPU index."""
+        if self.stream_interval is not None:
+            return self.get_stream(metric).latest.data.get(metric)
+        provider = self.provider_map.get(self.provider).get(metric)
+        return provider.collect().data.get(metric)
+
+    async def get_telemetry_async(self, metric: str) -> Dict[int, float]:
+        """Current usage of `metric` by GPU index (without blocking)."""
+        if self.stream_interval is not None:
+            import asyncio  # NOTE: deferred, only needed by asynchronous callers
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self.get_telemetry, metric)
         provider = self.provider_map.get(self.provider).get(metric)
-        return provider.from_cmd().data.get(metric)
+        return (await provider.collect_async()).data.get(metric)
+
+    async def snapshot_async(self) -> Dict[str, Dict[int, float]]:
+        """Current percent, memory, power, and temp by GPU index (without blocking)."""
+        if self.stream_interval is not None:
+            import asyncio  # NOTE: deferred, only needed by asynchronous callers
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, lambda: self.snapshot)
+        return (await self.provider_map.get(self.provider).get('all').collect_async()).data
+
+    def get_procs(self, percent: bool = False) -> Dict[str, Dict[Tuple[int, int], float]]:
+        """
+        Current memory (and percent if requested) by GPU index and PID.
+        The previous result is returned if queried again within `procs_interval` seconds.
+        """
+        now = time.monotonic()
+        if self._procs is not None and now - self._procs_time < self.procs_interval:
+            return self._procs
+        provider = self.provider_map.get(self.provider)
+        if 'procs' not in provider:
+            raise RuntimeError(f'Process query not supported for provider ({self.provider})')
+        data = provider['procs'].collect().data
+        if 'devices' in provider:  # NOTE: processes listed by PCI bus ID
+            data = {metric: {(self.devices[bus_id], pid): value for (bus_id, pid), value in values.items()}
+                    for metric, values in data.items()}
+        if percent and 'procs_percent' in provider:
+            data.update(provider['procs_percent'].collect().data)
+        self._procs, self._procs_time = data, now
+        return data
 
     @functools.cached_property
-    def provider_map(self) -> Dict[str, Dict[str, Type[ExternalMetric]]]:
+    def devices(self) -> Dict[str, int]:
+        """GPU index by PCI bus ID (queried once)."""
+        return self.provider_map.get(self.provider).get('devices').collect().data.get('index')
+
+    def get_stream(self, metric: str) -> NvidiaStream:
+        """Running stream for `metric` (started on first access)."""
+        if self.provider != 'nvidia':
+            raise RuntimeError(f'Streaming not supported for provider ({self.provider})')
+        if metric not in self._streams:
+            from .nvidia import NvidiaStream
+            stream = NvidiaStream(self.provider_map['nvidia'][metric], self.stream_interval)
+            stream.start()
+            self._streams[metric] = stream
+        return self._streams[metric]
+
+    @functools.cached_property
+    def provider_map(self) -> ProviderMap:
         """Map of query providers by vendor and resource type."""
-        return {
-            'nvidia': {
-                'percent': NvidiaPercent,
-                'memory': NvidiaMemory,
-                'power': NvidiaPower,
-                'temp': NvidiaTemperature
-            },
-            'rocm': {
-                'percent': RocmPercent,
-                'memory': RocmMemory,
-                'power': RocmPower,
-                'temp': RocmTemperature
-            }
-        }
+        return ProviderMap(PROVIDERS)
 
     @functools.cached_property
     def provider(self) -> str:
-        """Either 'nvidia' or 'rocm' if available."""
-        if self._check_nvidia():
-            return 'nvidia'
-        if self._check_rocm():
-            return 'rocm'
-        else:
+        """Either 'nvidia' or 'rocm' if available (unless selected explicitly, see `get_provider`)."""
+        if self.selected_provider is not None:
+            if self.selected_provider not in self.provider_map:
+                raise RuntimeError(f'Unknown GPU provider ({self.selected_provider})')
+            return self.selected_provider
+        provider = get_provider()
+        if provider is None:
             raise RuntimeError('Neither `nvidia-smi` nor `rocm-smi` found')
-
-    def _check_nvidia(self) -> Optional[str]:
-        return self._check_command('nvidia-smi')
-
-    def _check_rocm(self) -> Optional[str]:
-        return self._check_command('rocm-smi')
-
-    @staticmethod
-    def _check_command(name: str) -> Optional[str]:
-        """Return default output of command given `name`, None if command not found."""
-        try:
-            return check_output([name, ]).decode().strip()
-        except FileNotFoundError:
-            return None
+        return provider
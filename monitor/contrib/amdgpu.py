@@ -0,0 +1,216 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""AMD GPU metrics read directly from sysfs (amdgpu driver)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Dict, Optional, Callable
+
+# standard libs
+import os
+import re
+import glob
+import functools
+import contextlib
+from abc import ABC, abstractmethod
+
+# internal libs
+from ..core.extern import Metric
+
+# public interface
+__all__ = ['AMDGPU', 'AmdgpuDevice', 'AmdgpuMetric', 'AmdgpuPercent', 'AmdgpuMemory',
+           'AmdgpuPower', 'AmdgpuTemperature', 'AmdgpuSnapshot', 'get_devices', ]
+
+
+# NOTE: the root can be overridden (e.g., to point at a fake sysfs tree)
+SYSFS_ROOT: str = os.getenv('MONITOR_AMDGPU_SYSFS', '/sys/class/drm')
+
+
+class AmdgpuDevice:
+    """Open file descriptors for the sysfs attributes of a single card."""
+
+    path: str
+    busy: int
+    vram_used: int
+    vram_total: int
+    temp: Optional[int] = None
+    power: Optional[int] = None
+
+    def __init__(self, path: str) -> None:
+        """Open attribute files under `path` (i.e., /sys/class/drm/cardN/device)."""
+        self.path = path
+        with contextlib.ExitStack() as opened:  # NOTE: close those already open if any fails
+            self.busy = self._open(opened, os.path.join(path, 'gpu_busy_percent'))
+            self.vram_used = self._open(opened, os.path.join(path, 'mem_info_vram_used'))
+            self.vram_total = self._open(opened, os.path.join(path, 'mem_info_vram_total'))
+            for hwmon in sorted(glob.glob(os.path.join(path, 'hwmon', 'hwmon*'))):
+                self.temp = self._open_temp(opened, hwmon)
+                power = (os.path.join(hwmon, 'power1_average'), os.path.join(hwmon, 'power1_input'))
+                for filepath in filter(os.path.exists, power):
+                    self.power = self._open(opened, filepath)
+                    break
+                if self.temp is not None or self.power is not None:
+                    break
+            opened.pop_all()
+
+    @staticmethod
+    def _open(opened: contextlib.ExitStack, filepath: str) -> int:
+        """Open attribute at `filepath` (closed by `opened` unless released)."""
+        fd = os.open(filepath, os.O_RDONLY)
+        opened.callback(os.close, fd)
+        return fd
+
+    @classmethod
+    def _open_temp(cls, opened: contextlib.ExitStack, hwmon: str) -> Optional[int]:
+        """Open the junction temperature sensor (or first available) under `hwmon`."""
+        inputs = sorted(glob.glob(os.path.join(hwmon, 'temp*_input')))
+        for filepath in inputs:
+            label = filepath.replace('_input', '_label')
+            if os.path.exists(label):
+                with open(label, mode='r') as stream:
+                    if stream.read().strip() == 'junction':
+                        return cls._open(opened, filepath)
+        return None if not inputs else cls._open(opened, inputs[0])
+
+    @staticmethod
+    def read(fd: int) -> int:
+        """Re-read integer value from open file descriptor `fd`."""
+        return int(os.pread(fd, 32, 0))
+
+    def get_percent(self) -> float:
+        """Percent utilization."""
+        return float(self.read(self.busy))
+
+    def get_memory(self) -> float:
+        """Percent of VRAM used."""
+        return 100 * self.read(self.vram_used) / self.read(self.vram_total)
+
+    def get_temp(self) -> float:
+        """Temperature in Celsius (sysfs reports millidegrees)."""
+        if self.temp is None:
+            raise RuntimeError(f'No temperature sensor found ({self.path})')
+        return self.read(self.temp) / 1000
+
+    def get_power(self) -> float:
+        """Power draw in Watts (sysfs reports microwatts)."""
+        if self.power is None:
+            raise RuntimeError(f'No power sensor found ({self.path})')
+        return self.read(self.power) / 1_000_000
+
+    def close(self) -> None:
+        """Close all file descriptors."""
+        for fd in (self.busy, self.vram_used, self.vram_total, self.temp, self.power):
+            if fd is not None:
+                os.close(fd)
+
+
+class AMDGPU:
+    """All amdgpu devices found under a sysfs root (by card number, as with rocm-smi)."""
+
+    root: str
+    devices: Dict[int, AmdgpuDevice]
+
+    _card_pattern: re.Pattern = re.compile(r'^card(\d+)$')
+
+    def __init__(self, root: str = SYSFS_ROOT) -> None:
+        """Discover devices under `root` (i.e., /sys/class/drm)."""
+        self.root = root
+        cards = []
+        for name in os.listdir(root) if os.path.isdir(root) else []:
+            match = self._card_pattern.match(name)
+            path = os.path.join(root, name, 'device')
+            if match and os.path.exists(os.path.join(path, 'gpu_busy_percent')):
+                cards.append((int(match.group(1)), path))
+        if not cards:
+            raise RuntimeError(f'No amdgpu devices found ({root})')
+        self.devices = {}
+        try:
+            for card, path in sorted(cards):
+                self.devices[card] = AmdgpuDevice(path)
+        except OSError:
+            self.close()
+            raise
+
+    def query(self, method: Callable[[AmdgpuDevice], float]) -> Dict[int, float]:
+        """Apply `method` to all devices by card number."""
+        return {card: method(device) for card, device in self.devices.items()}
+
+    def close(self) -> None:
+        """Close all devices."""
+        for device in self.devices.values():
+            device.close()
+
+
+@functools.lru_cache(maxsize=None)
+def get_devices(root: str = SYSFS_ROOT) -> AMDGPU:
+    """Discover and open devices (only once per process for a given `root`)."""
+    return AMDGPU(root)
+
+
+class AmdgpuMetric(Metric, ABC):
+    """Status object for AMD GPU resource (read from sysfs)."""
+
+    @classmethod
+    def collect(cls) -> AmdgpuMetric:
+        """Read the open sysfs attributes directly (no subprocess, see `MONITOR_AMDGPU_SYSFS`)."""
+        try:
+            return cls(cls.query(get_devices(SYSFS_ROOT)))
+        except (OSError, ValueError) as error:
+            raise RuntimeError(f'Failed to read sysfs ({SYSFS_ROOT}): {error}') from error
+
+    @classmethod
+    @abstractmethod
+    def query(cls, amdgpu: AMDGPU) -> Dict[str, Dict[int, float]]:
+        """Query `amdgpu` devices and return attributes."""
+
+
+class AmdgpuPercent(AmdgpuMetric):
+    """Read sysfs for GPU overall usage as a percentage."""
+
+    @classmethod
+    def query(cls, amdgpu: AMDGPU) -> Dict[str, Dict[int, float]]:
+        return {'percent': amdgpu.query(AmdgpuDevice.get_percent)}
+
+
+class AmdgpuMemory(AmdgpuMetric):
+    """Read sysfs for GPU memory usage as a percentage."""
+
+    @classmethod
+    def query(cls, amdgpu: AMDGPU) -> Dict[str, Dict[int, float]]:
+        return {'memory': amdgpu.query(AmdgpuDevice.get_memory)}
+
+
+class AmdgpuTemperature(AmdgpuMetric):
+    """Read sysfs for GPU (junction) temperature in Celsius."""
+
+    @classmethod
+    def query(cls, amdgpu: AMDGPU) -> Dict[str, Dict[int, float]]:
+        return {'temp': amdgpu.query(AmdgpuDevice.get_temp)}
+
+
+class AmdgpuPower(AmdgpuMetric):
+    """Read sysfs for GPU total power draw (in Watts)."""
+
+    @classmethod
+    def query(cls, amdgpu: AMDGPU) -> Dict[str, Dict[int, float]]:
+        return {'power': amdgpu.query(AmdgpuDevice.get_power)}
+
+
+class AmdgpuSnapshot(AmdgpuMetric):
+    """Read sysfs for all GPU metrics at once (percent, memory, power, and temp)."""
+
+    @classmethod
+    def query(cls, amdgpu: AMDGPU) -> Dict[str, Dict[int, float]]:
+        return {'percent': amdgpu.query(AmdgpuDevice.get_percent),
+                'memory': amdgpu.query(AmdgpuDevice.get_memory),
+                'power': amdgpu.query(AmdgpuDevice.get_power),
+                'temp': amdgpu.query(AmdgpuDevice.get_temp)}
@@ -0,0 +1,118 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""CPU and memory usage by control group (cgroup v2)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Tuple, Optional
+
+# standard libs
+import os
+import glob
+import time
+
+# internal libs
+from .procfs import ProcFile
+
+# public interface
+__all__ = ['CGROUP_ROOT', 'CGroup', 'CGroupTable', ]
+
+
+# NOTE: the root can be overridden (e.g., to point at a fake cgroup tree)
+CGROUP_ROOT: str = os.getenv('MONITOR_CGROUP_ROOT', '/sys/fs/cgroup')
+
+
+class CGroup:
+    """Open files for a single control group."""
+
+    name: str
+    cpu: ProcFile
+    memory: Optional[ProcFile] = None
+
+    _usage: int
+    _time: float
+
+    def __init__(self, path: str, name: str) -> None:
+        """Open cpu.stat and memory.current under `path`."""
+        self.name = name
+        self.cpu = ProcFile(os.path.join(path, 'cpu.stat'), buffer_size=4096)
+        if os.path.exists(os.path.join(path, 'memory.current')):
+            self.memory = ProcFile(os.path.join(path, 'memory.current'), buffer_size=64)
+        self._usage = self.read_usage()
+        self._time = time.monotonic()
+
+    def read_usage(self) -> int:
+        """Total CPU time in microseconds (usage_usec in cpu.stat)."""
+        data = self.cpu.read()
+        start = data.index(b'usage_usec ') + 11
+        return int(data[start:data.index(b'\n', start)])
+
+    def read_memory(self) -> Optional[int]:
+        """Current memory usage in bytes (None if not available, e.g., the root group)."""
+        return None if self.memory is None else int(self.memory.read())
+
+    def sample(self) -> Tuple[float, Optional[int]]:
+        """CPU percent (of a single core) since previous sample and current memory."""
+        usage, now = self.read_usage(), time.monotonic()
+        elapsed = now - self._time
+        percent = round(100 * (usage - self._usage) / (elapsed * 1_000_000), 1) if elapsed > 0 else 0.0
+        self._usage, self._time = usage, now
+        return percent, self.read_memory()
+
+    def close(self) -> None:
+        """Close open files."""
+        self.cpu.close()
+        if self.memory is not None:
+            self.memory.close()
+
+
+class CGroupTable:
+    """
+    Control groups matching `pattern` (a glob relative to `root`).
+    Groups are found again on each update but files are only opened for new groups.
+    """
+
+    root: str
+    pattern: str
+    groups: Dict[str, CGroup]
+
+    def __init__(self, pattern: str = '*', root: str = None) -> None:
+        """Initialize with `pattern` (e.g., 'system.slice/slurmstepd.scope/job_*')."""
+        self.root = root or CGROUP_ROOT
+        self.pattern = pattern
+        self.groups = {}
+        if not os.path.exists(os.path.join(self.root, 'cgroup.controllers')):
+            raise RuntimeError(f'Not a cgroup v2 hierarchy: {self.root}')
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Open newly created groups and close removed ones."""
+        paths = {path for path in glob.glob(os.path.join(self.root, self.pattern))
+                 if os.path.exists(os.path.join(path, 'cpu.stat'))}
+        for path in set(self.groups) - paths:
+            self.groups.pop(path).close()
+        for path in paths - set(self.groups):
+            try:
+                self.groups[path] = CGroup(path, os.path.relpath(path, self.root))
+            except (FileNotFoundError, ValueError):
+                pass  # NOTE: removed in the meantime
+
+    def sample(self) -> List[Tuple[str, float, Optional[int]]]:
+        """Rows of (name, cpu percent, memory) for each group."""
+        self.refresh()
+        rows = []
+        for path, group in sorted(self.groups.items()):
+            try:
+                rows.append((group.name, *group.sample()))
+            except (OSError, ValueError):
+                self.groups.pop(path).close()
+        return rows
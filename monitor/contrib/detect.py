@@ -0,0 +1,109 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Detect the available GPU provider (cached until the next reboot)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+# standard libs
+import os
+import shutil
+
+# internal libs
+from ..core.logging import get_hostname
+from .procfs import PROC_ROOT
+
+# public interface
+__all__ = ['CACHE_DIR', 'COMMANDS', 'DEVICE_NODES', 'detect_provider', 'get_provider', ]
+
+
+# NOTE: the cache directory can be overridden (e.g., if the home directory is read-only)
+CACHE_DIR: str = os.getenv('MONITOR_CACHE_DIR',
+                           os.path.join(os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+                                        'monitor'))
+
+
+# NOTE: providers detected automatically in order of preference
+COMMANDS: Dict[str, str] = {
+    'nvidia': 'nvidia-smi',
+    'rocm': 'rocm-smi',
+}
+
+DEVICE_NODES: Dict[str, List[str]] = {
+    'nvidia': ['/dev/nvidiactl', '/dev/nvidia0'],
+    'rocm': ['/dev/kfd'],
+}
+
+
+def detect_provider() -> Optional[str]:
+    """
+    Name of provider whose command is on the PATH (None if neither).
+    If both are installed (e.g., a shared software stack) the one with a device present is preferred.
+    """
+    found = [name for name, command in COMMANDS.items() if shutil.which(command) is not None]
+    for name in found:
+        if any(os.path.exists(path) for path in DEVICE_NODES[name]):
+            return name
+    return found[0] if found else None
+
+
+def get_boot_id() -> Optional[str]:
+    """Unique identifier for the current boot (None if not available)."""
+    try:
+        with open(os.path.join(PROC_ROOT, 'sys', 'kernel', 'random', 'boot_id'), mode='r') as stream:
+            return stream.read().strip()
+    except OSError:
+        return None
+
+
+def get_cache_path() -> str:
+    """Path to cache file for this host (home directories are often shared between hosts)."""
+    return os.path.join(CACHE_DIR, f'gpu-provider-{get_hostname()}')
+
+
+def read_cache(boot_id: str) -> Optional[str]:
+    """Cached provider if detected previously since the last reboot."""
+    try:
+        with open(get_cache_path(), mode='r') as stream:
+            cached_boot_id, provider = stream.read().split()
+    except (OSError, ValueError):
+        return None
+    return provider if cached_boot_id == boot_id and provider in COMMANDS else None
+
+
+def write_cache(boot_id: str, provider: str) -> None:
+    """Save detected provider (failure to write the cache is not an error)."""
+    path = get_cache_path()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(f'{path}.{os.getpid()}', mode='w') as stream:
+            stream.write(f'{boot_id} {provider}\n')
+        os.replace(f'{path}.{os.getpid()}', path)
+    except OSError:
+        pass
+
+
+def get_provider(cache: bool = True) -> Optional[str]:
+    """
+    Detected provider (None if not found).
+    The result is saved with the boot ID so devices are only probed once per boot on each host.
+    """
+    boot_id = get_boot_id() if cache else None
+    if boot_id is None:
+        return detect_provider()
+    provider = read_cache(boot_id)
+    if provider is None or shutil.which(COMMANDS[provider]) is None:  # NOTE: PATH may differ
+        provider = detect_provider()
+        if provider is not None:
+            write_cache(boot_id, provider)
+    return provider
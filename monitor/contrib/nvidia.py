@@ -13,16 +13,21 @@
 
 # type annotations
 from __future__ import annotations
-from typing import Dict
+from typing import Dict, List, Tuple, Type, Iterator, Optional
 
 # standard libs
+import time
+import shlex
+import threading
 from abc import ABC
+from subprocess import Popen, PIPE, DEVNULL
 
 # internal libs
 from ..core.extern import ExternalMetric
 
 # public interface
-__all__ = ['NvidiaMetric', 'NvidiaPercent', 'NvidiaMemory', 'NvidiaPower', 'NvidiaTemperature', ]
+__all__ = ['NvidiaMetric', 'NvidiaPercent', 'NvidiaMemory', 'NvidiaPower', 'NvidiaTemperature',
+           'NvidiaSnapshot', 'NvidiaStream', 'NvidiaDevices', 'NvidiaProcs', 'NvidiaProcsPercent', ]
 
 
 class NvidiaMetric(ExternalMetric, ABC):
@@ -99,3 +104,213 @@ class NvidiaPower(NvidiaMetric):
             return {'power': data}
         except Exception as error:
             raise RuntimeError(f'Failed to parse output ({cls._cmd}): {error}') from error
+
+
+class NvidiaSnapshot(NvidiaMetric):
+    """Parse nvidia-smi for all GPU metrics at once (percent, memory, power, and temp)."""
+
+    _cmd: str = ('nvidia-smi --format=csv,noheader,nounits -c1 --query-gpu=index,'
+                 'utilization.gpu,memory.used,memory.total,power.draw,temperature.gpu')
+
+    @classmethod
+    def parse_text(cls, block: str) -> Dict[str, Dict[int, float]]:
+        """Parse `nvidia-smi` output."""
+        try:
+            data = {'percent': {}, 'memory': {}, 'power': {}, 'temp': {}}
+            for line in block.strip().split('\n'):
+                index, percent, current, total, power, temp = map(float, line.strip().split(', '))
+                data['percent'][int(index)] = percent
+                data['memory'][int(index)] = current / total
+                data['power'][int(index)] = power
+                data['temp'][int(index)] = temp
+            return data
+        except Exception as error:
+            raise RuntimeError(f'Failed to parse output ({cls._cmd}): {error}') from error
+
+
+class NvidiaDevices(NvidiaMetric):
+    """Parse nvidia-smi for the GPU index of each PCI bus ID."""
+
+    _cmd: str = 'nvidia-smi --format=csv,noheader --query-gpu=index,pci.bus_id -c1'
+
+    @classmethod
+    def parse_text(cls, block: str) -> Dict[str, Dict[str, int]]:
+        """Parse `nvidia-smi` output."""
+        try:
+            data = {}
+            for line in block.strip().split('\n'):
+                index, bus_id = line.strip().split(', ')
+                data[bus_id] = int(index)
+            return {'index': data}
+        except Exception as error:
+            raise RuntimeError(f'Failed to parse output ({cls._cmd}): {error}') from error
+
+
+class NvidiaProcs(NvidiaMetric):
+    """Parse nvidia-smi for GPU memory used by each process (in bytes, by PCI bus ID and PID)."""
+
+    _cmd: str = 'nvidia-smi --format=csv,noheader,nounits --query-compute-apps=gpu_bus_id,pid,used_memory'
+
+    @classmethod
+    def parse_text(cls, block: str) -> Dict[str, Dict[Tuple[str, int], float]]:
+        """Parse `nvidia-smi` output (empty if no processes)."""
+        try:
+            data = {}
+            for line in block.strip().split('\n'):
+                if line.strip():
+                    bus_id, pid, memory = line.strip().split(', ')
+                    data[bus_id, int(pid)] = float(memory) * 1024**2  # NOTE: MiB
+            return {'memory': data}
+        except Exception as error:
+            raise RuntimeError(f'Failed to parse output ({cls._cmd}): {error}') from error
+
+
+class NvidiaProcsPercent(NvidiaMetric):
+    """Parse nvidia-smi (pmon) for percent utilization by each process (by GPU index and PID)."""
+
+    _cmd: str = 'nvidia-smi pmon -c 1 -s u'
+
+    @classmethod
+    def parse_text(cls, block: str) -> Dict[str, Dict[Tuple[int, int], float]]:
+        """Parse `nvidia-smi pmon` output (idle devices are shown with '-' for the PID)."""
+        try:
+            data, columns = {}, None
+            for line in block.strip().split('\n'):
+                fields = line.lstrip('#').split()
+                if line.startswith('#'):
+                    columns = columns or fields  # NOTE: second header line has units
+                elif fields and fields[1] != '-':
+                    row = dict(zip(columns, fields))
+                    percent = float(row['sm']) if row['sm'] != '-' else 0.0
+                    data[int(row['gpu']), int(row['pid'])] = percent
+            return {'percent': data}
+        except Exception as error:
+            raise RuntimeError(f'Failed to parse output ({cls._cmd}): {error}') from error
+
+
+class NvidiaStream:
+    """
+    Long-lived `nvidia-smi` process in loop mode (-lms) for a given metric.
+
+    Iterating yields a new instance of `metric` for each complete block of output
+    (one line per GPU). The child process is restarted if it exits, or if it
+    hangs (the latest block is older than `max_age` intervals). If no new block
+    arrives within `timeout` seconds, `latest` raises RuntimeError.
+    """
+
+    metric: Type[NvidiaMetric]
+    interval: float
+    restarts: int = 0
+    max_failures: int = 5
+    max_age: int = 5
+    timeout: float = 10
+
+    _process: Optional[Popen] = None
+    _thread: Optional[threading.Thread] = None
+    _latest: Optional[NvidiaMetric] = None
+    _received: float = 0  # NOTE: time.monotonic() when `_latest` arrived
+    _error: Optional[RuntimeError] = None
+    _ready: threading.Event
+    _closed: threading.Event
+
+    def __init__(self, metric: Type[NvidiaMetric], interval: float) -> None:
+        """Initialize with `metric` to stream and sampling `interval` (in seconds)."""
+        self.metric = metric
+        self.interval = interval
+        self._ready = threading.Event()
+        self._closed = threading.Event()
+
+    @property
+    def cmd(self) -> List[str]:
+        """Command-line arguments for loop mode (replaces `-c1` in `metric._cmd`)."""
+        args = [arg for arg in shlex.split(self.metric._cmd) if arg != '-c1']
+        return args + ['-lms', str(max(1, int(self.interval * 1000)))]
+
+    def __iter__(self) -> Iterator[NvidiaMetric]:
+        """Yield parsed blocks of output, restarting the process as needed."""
+        failures = 0
+        while not self._closed.is_set():
+            count = 0
+            for block in self._iter_blocks():
+                count += 1
+                yield self.metric.from_text(block)
+            failures = 0 if count else failures + 1
+            if failures >= self.max_failures:
+                raise RuntimeError(f'Process exited without output ({shlex.join(self.cmd)})')
+            if self._closed.wait(self.interval):
+                return
+            self.restarts += 1
+
+    def _iter_blocks(self) -> Iterator[str]:
+        """Yield blocks of lines (one per GPU) from a single run of the process."""
+        try:
+            self._process = Popen(self.cmd, stdout=PIPE, stderr=DEVNULL, bufsize=1,
+                                  universal_newlines=True)
+        except FileNotFoundError as error:
+            raise RuntimeError(f'Command not found ({shlex.join(self.cmd)})') from error
+        if self._closed.is_set():
+            self.stop()
+            return
+        try:
+            block, seen, size = [], set(), None
+            for line in self._process.stdout:
+                index = line.split(',', 1)[0].strip()
+                if index in seen:
+                    # index repeated, so we know how many devices are in a block
+                    size = len(block)
+                    yield ''.join(block)
+                    block, seen = [], set()
+                block.append(line)
+                seen.add(index)
+                if len(block) == size:
+                    yield ''.join(block)
+                    block, seen = [], set()
+        finally:
+            self.stop()
+
+    def start(self) -> None:
+        """Consume the stream in a background thread (see `latest`)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._consume, daemon=True)
+            self._thread.start()
+
+    def _consume(self) -> None:
+        """Update latest value from stream until the process fails."""
+        try:
+            for data in self:
+                self._latest, self._received = data, time.monotonic()
+                self._ready.set()
+        except RuntimeError as error:
+            self._error = error
+            self._ready.set()
+
+    @property
+    def latest(self) -> NvidiaMetric:
+        """Most recent complete sample (blocks until the first arrives, restarts a hung process)."""
+        self.start()
+        self._wait()
+        if time.monotonic() - self._received > self.max_age * self.interval:
+            self._ready.clear()
+            process = self._process
+            if process is not None and process.poll() is None:
+                process.kill()  # NOTE: the consumer thread starts a new process
+            self._wait()
+        return self._latest
+
+    def _wait(self) -> None:
+        """Wait for a sample (RuntimeError after `timeout` seconds or if the stream failed)."""
+        if not self._ready.wait(self.timeout):
+            raise RuntimeError(f'No output for {self.timeout} seconds ({shlex.join(self.cmd)})')
+        if self._error is not None:
+            raise self._error
+
+    def close(self) -> None:
+        """Terminate child process and do not restart it."""
+        self._closed.set()
+        self.stop()
+
+    def stop(self) -> None:
+        """Terminate child process if running."""
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            self._process.wait()
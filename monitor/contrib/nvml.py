@@ -0,0 +1,167 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""In-process NVML metrics (ctypes binding to `libnvidia-ml.so`)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Dict, List, Callable
+
+# standard libs
+import os
+import ctypes
+import functools
+from abc import ABC, abstractmethod
+
+# internal libs
+from ..core.extern import Metric
+
+# public interface
+__all__ = ['NVML', 'NvmlMetric', 'NvmlPercent', 'NvmlMemory', 'NvmlPower', 'NvmlTemperature',
+           'NvmlSnapshot', 'get_library', ]
+
+
+# NOTE: the library path can be overridden (e.g., to point at a stub library)
+NVML_LIBRARY: str = os.getenv('MONITOR_NVML_LIBRARY', 'libnvidia-ml.so.1')
+NVML_SUCCESS: int = 0
+NVML_TEMPERATURE_GPU: int = 0
+
+
+class _Utilization(ctypes.Structure):
+    _fields_ = [('gpu', ctypes.c_uint), ('memory', ctypes.c_uint)]
+
+
+class _Memory(ctypes.Structure):
+    _fields_ = [('total', ctypes.c_ulonglong), ('free', ctypes.c_ulonglong), ('used', ctypes.c_ulonglong)]
+
+
+class NVML:
+    """Minimal binding to the NVIDIA Management Library."""
+
+    path: str
+    lib: ctypes.CDLL
+    handles: List[ctypes.c_void_p]
+
+    def __init__(self, path: str = NVML_LIBRARY) -> None:
+        """Load library at `path`, initialize, and cache device handles."""
+        try:
+            self.path = path
+            self.lib = ctypes.CDLL(path)
+        except OSError as error:
+            raise RuntimeError(f'Failed to load NVML ({path}): {error}') from error
+        self.lib.nvmlErrorString.restype = ctypes.c_char_p
+        self._call('nvmlInit_v2')
+        count = ctypes.c_uint()
+        self._call('nvmlDeviceGetCount_v2', ctypes.byref(count))
+        self.handles = []
+        for index in range(count.value):
+            handle = ctypes.c_void_p()
+            self._call('nvmlDeviceGetHandleByIndex_v2', ctypes.c_uint(index), ctypes.byref(handle))
+            self.handles.append(handle)
+
+    def _call(self, name: str, *args) -> None:
+        """Call library function by `name`, raise RuntimeError on failure."""
+        status = getattr(self.lib, name)(*args)
+        if status != NVML_SUCCESS:
+            message = self.lib.nvmlErrorString(status).decode()
+            raise RuntimeError(f'NVML call failed ({name}): {message}')
+
+    def utilization(self, handle: ctypes.c_void_p) -> float:
+        """Percent utilization for device `handle`."""
+        value = _Utilization()
+        self._call('nvmlDeviceGetUtilizationRates', handle, ctypes.byref(value))
+        return float(value.gpu)
+
+    def memory(self, handle: ctypes.c_void_p) -> float:
+        """Fraction of memory used for device `handle`."""
+        value = _Memory()
+        self._call('nvmlDeviceGetMemoryInfo', handle, ctypes.byref(value))
+        return value.used / value.total
+
+    def power(self, handle: ctypes.c_void_p) -> float:
+        """Power draw in Watts for device `handle`."""
+        value = ctypes.c_uint()
+        self._call('nvmlDeviceGetPowerUsage', handle, ctypes.byref(value))
+        return value.value / 1000
+
+    def temperature(self, handle: ctypes.c_void_p) -> float:
+        """Temperature in Celsius for device `handle`."""
+        value = ctypes.c_uint()
+        self._call('nvmlDeviceGetTemperature', handle, ctypes.c_int(NVML_TEMPERATURE_GPU),
+                   ctypes.byref(value))
+        return float(value.value)
+
+    def query(self, method: Callable[[ctypes.c_void_p], float]) -> Dict[int, float]:
+        """Apply `method` to all devices by index."""
+        return {index: method(handle) for index, handle in enumerate(self.handles)}
+
+
+@functools.lru_cache(maxsize=None)
+def get_library(path: str = NVML_LIBRARY) -> NVML:
+    """Load and initialize NVML (only once per process for a given `path`)."""
+    return NVML(path)
+
+
+class NvmlMetric(Metric, ABC):
+    """Status object for Nvidia GPU resource (queried in-process)."""
+
+    @classmethod
+    def collect(cls) -> NvmlMetric:
+        """Query the library directly (no subprocess, see `MONITOR_NVML_LIBRARY`)."""
+        return cls(cls.query(get_library(NVML_LIBRARY)))
+
+    @classmethod
+    @abstractmethod
+    def query(cls, nvml: NVML) -> Dict[str, Dict[int, float]]:
+        """Query `nvml` and return attributes."""
+
+
+class NvmlPercent(NvmlMetric):
+    """Query NVML for overall percent utilization."""
+
+    @classmethod
+    def query(cls, nvml: NVML) -> Dict[str, Dict[int, float]]:
+        return {'percent': nvml.query(nvml.utilization)}
+
+
+class NvmlMemory(NvmlMetric):
+    """Query NVML for memory usage."""
+
+    @classmethod
+    def query(cls, nvml: NVML) -> Dict[str, Dict[int, float]]:
+        return {'memory': nvml.query(nvml.memory)}
+
+
+class NvmlTemperature(NvmlMetric):
+    """Query NVML for GPU temperature (in degrees C)."""
+
+    @classmethod
+    def query(cls, nvml: NVML) -> Dict[str, Dict[int, float]]:
+        return {'temp': nvml.query(nvml.temperature)}
+
+
+class NvmlPower(NvmlMetric):
+    """Query NVML for GPU total power draw (in Watts)."""
+
+    @classmethod
+    def query(cls, nvml: NVML) -> Dict[str, Dict[int, float]]:
+        return {'power': nvml.query(nvml.power)}
+
+
+class NvmlSnapshot(NvmlMetric):
+    """Query NVML for all GPU metrics at once (percent, memory, power, and temp)."""
+
+    @classmethod
+    def query(cls, nvml: NVML) -> Dict[str, Dict[int, float]]:
+        return {'percent': nvml.query(nvml.utilization),
+                'memory': nvml.query(nvml.memory),
+                'power': nvml.query(nvml.power),
+                'temp': nvml.query(nvml.temperature)}
@@ -0,0 +1,132 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Process metrics (via psutil) with cached process handles."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Set, Tuple
+
+# standard libs
+import heapq
+from collections import deque
+
+# external libs
+import psutil
+
+# public interface
+__all__ = ['ProcessTable', 'ProcessOwners', ]
+
+
+class ProcessTable:
+    """
+    Cached process handles with CPU percent and memory (RSS) for each process.
+
+    Each call to `update` lists process IDs and then visits at most `max_scan`
+    processes (all if zero) in round-robin order. New processes are only
+    inspected when their turn comes, so the cost of each update is bounded.
+    A value is the average since the previous visit to that process.
+
+    A handle is only reused for the same process (process ID and creation time),
+    so a reused process ID starts over with a new handle.
+    """
+
+    max_scan: int
+    values: Dict[int, Tuple[float, int]]
+
+    _handles: Dict[int, psutil.Process]
+    _known: Set[int]
+    _queue: deque
+    _queued: Set[int]  # NOTE: process IDs in `_queue` (each at most once)
+
+    def __init__(self, max_scan: int = 0) -> None:
+        """Initialize empty table."""
+        self.max_scan = max_scan
+        self.values = {}
+        self._handles = {}
+        self._known = set()
+        self._queue = deque()
+        self._queued = set()
+
+    def update(self) -> None:
+        """Find new processes and refresh values for the next `max_scan` processes."""
+        pids = set(psutil.pids())
+        for pid in self._known - pids:
+            self._remove(pid)
+        new = pids - self._known
+        self._known |= new
+        for pid in sorted(new - self._queued):  # NOTE: a reused process ID may still be queued
+            self._queue.append(pid)
+            self._queued.add(pid)
+        count = len(self._queue) if not self.max_scan else min(self.max_scan, len(self._queue))
+        for _ in range(count):
+            pid = self._queue.popleft()
+            self._queued.discard(pid)
+            if pid not in self._known:
+                continue  # NOTE: already removed
+            try:
+                self._visit(pid)
+                self._queue.append(pid)
+                self._queued.add(pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                self._remove(pid)
+
+    def _remove(self, pid: int) -> None:
+        """Forget process with `pid`."""
+        self._known.discard(pid)
+        self._handles.pop(pid, None)
+        self.values.pop(pid, None)
+
+    def _visit(self, pid: int) -> None:
+        """Refresh values for a single process (the first visit only primes the counters)."""
+        process = self._handles.get(pid)
+        if process is not None and process.is_running():  # NOTE: false if the process ID was reused
+            with process.oneshot():
+                self.values[pid] = process.cpu_percent(), process.memory_info().rss
+            return
+        process = self._handles[pid] = psutil.Process(pid)
+        self.values.pop(pid, None)
+        process.cpu_percent()
+
+    def top(self, count: int) -> List[Tuple[int, float, int]]:
+        """The `count` processes with the highest CPU percent, as (pid, percent, memory)."""
+        return heapq.nlargest(count, ((pid, *values) for pid, values in self.values.items()),
+                              key=lambda row: row[1])
+
+
+class ProcessOwners:
+    """
+    User ID for each process, looked up once per process.
+    Entries are dropped with `prune` once a process is no longer of interest.
+    """
+
+    # NOTE: the kernel's overflow user ID (e.g., processes in other namespaces)
+    unknown: int = 65534
+
+    _uids: Dict[int, int]
+
+    def __init__(self) -> None:
+        """Initialize empty cache."""
+        self._uids = {}
+
+    def get(self, pid: int) -> int:
+        """User ID for process `pid` (`unknown` if not found)."""
+        if pid not in self._uids:
+            try:
+                self._uids[pid] = psutil.Process(pid).uids().real
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                self._uids[pid] = self.unknown
+        return self._uids[pid]
+
+    def prune(self, pids: Set[int]) -> None:
+        """Forget processes other than `pids`."""
+        for pid in self._uids.keys() - pids:
+            del self._uids[pid]
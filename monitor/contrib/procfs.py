@@ -0,0 +1,265 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Counters read directly from procfs (Linux)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Tuple, Optional
+
+# standard libs
+import os
+import time
+import fnmatch
+import operator
+from itertools import repeat
+from abc import ABC, abstractmethod
+from array import array
+
+# public interface
+__all__ = ['PROC_ROOT', 'ProcFile', 'CPUStat', 'CPU_FIELDS', 'get_cpustat',
+           'CounterTable', 'NetDev', 'DiskStats', ]
+
+
+# NOTE: the root can be overridden (e.g., to point at a synthetic procfs tree)
+PROC_ROOT: str = os.getenv('MONITOR_PROCFS', '/proc')
+
+
+class ProcFile:
+    """An open procfs file read repeatedly into a single reusable buffer."""
+
+    path: str
+
+    _fd: int
+    _buffer: bytearray
+
+    def __init__(self, path: str, buffer_size: int = 65536) -> None:
+        """Open `path` for reading."""
+        self.path = path
+        self._fd = os.open(path, os.O_RDONLY)
+        self._buffer = bytearray(buffer_size)
+
+    def read(self) -> bytes:
+        """Current contents of the file."""
+        size = os.preadv(self._fd, [self._buffer], 0)
+        while size == len(self._buffer):
+            self._buffer = bytearray(2 * len(self._buffer))
+            size = os.preadv(self._fd, [self._buffer], 0)
+        return bytes(memoryview(self._buffer)[:size])
+
+    def close(self) -> None:
+        """Close the file descriptor."""
+        os.close(self._fd)
+
+
+# NOTE: guest time is already counted in user time (see proc(5))
+CPU_FIELDS = ['user', 'nice', 'system', 'idle', 'iowait', 'irq', 'softirq', 'steal', 'guest', 'guest_nice']
+
+
+class CPUStat:
+    """
+    CPU time counters from /proc/stat for the total (first row) and each core.
+
+    Counters are stored as a flat array with `width` values per row. The change
+    since the previous update is computed in a single pass over the whole array,
+    and each state is a strided slice of it (so totals and ratios for all rows
+    are computed column by column, not with a loop over rows in Python).
+    """
+
+    file: ProcFile
+    width: int
+    counters: array
+    delta: List[int]
+
+    def __init__(self, path: str = None) -> None:
+        """Open /proc/stat (or `path`) and take initial snapshot."""
+        self.file = ProcFile(path or os.path.join(PROC_ROOT, 'stat'))
+        fields = self._split()
+        self.width = (fields.index(b'cpu0') if b'cpu0' in fields else len(fields)) - 1
+        self.counters = self._parse(fields)
+        self.delta = [0] * len(self.counters)
+
+    @property
+    def cores(self) -> int:
+        """Number of cores (excluding the total)."""
+        return len(self.counters) // self.width - 1
+
+    @property
+    def path(self) -> str:
+        """Path to the underlying file."""
+        return self.file.path
+
+    def _split(self) -> List[bytes]:
+        """Tokens of the leading 'cpu' lines."""
+        data = self.file.read()
+        end = data.find(b'\n', data.rfind(b'\ncpu') + 1)
+        return data[:end].split() if end != -1 else data.split()
+
+    def _parse(self, fields: List[bytes]) -> array:
+        """Counters from tokens (dropping the label on each row)."""
+        del fields[::self.width + 1]
+        return array('Q', map(int, fields))
+
+    def update(self) -> List[int]:
+        """Read new counters and compute change since previous update."""
+        counters = self._parse(self._split())
+        if len(counters) != len(self.counters):
+            raise RuntimeError(f'Number of cores changed ({self.path})')
+        delta = list(map(operator.sub, counters, self.counters))
+        if min(delta) < 0:
+            # NOTE: counters can go backwards (e.g., on hotplug), treat as zero change
+            delta = [max(0, value) for value in delta]
+        self.delta = delta
+        self.counters = counters
+        return delta
+
+    def percent(self, delta: List[int] = None) -> List[float]:
+        """Percent busy time for the total and each core (since previous update if no `delta`)."""
+        delta, width = self.update() if delta is None else delta, self.width
+        idle = delta[3::width]
+        if width > 4:
+            idle = list(map(operator.add, idle, delta[4::width]))
+        total = self._total(delta)
+        return [round(100 * (t - i) / t, 1) if t > 0 else 0.0 for t, i in zip(total, idle)]
+
+    def times_percent(self, delta: List[int] = None) -> List[List[float]]:
+        """Percent time in each state (see `fields`) for the total and each core (as with `percent`)."""
+        delta, width = self.update() if delta is None else delta, self.width
+        scale = [100 / total if total > 0 else 0 for total in self._total(delta)]
+        columns = [map(round, map(operator.mul, delta[i::width], scale), repeat(1)) for i in range(width)]
+        return list(map(list, zip(*columns)))
+
+    @property
+    def fields(self) -> List[str]:
+        """Names of the counters available on this system."""
+        return CPU_FIELDS[:self.width]
+
+    def _total(self, delta: List[int]) -> List[int]:
+        """Total time for each row (excluding guest time)."""
+        width, count = self.width, min(self.width, 8)
+        return list(map(sum, zip(*(delta[i::width] for i in range(count)))))
+
+
+def get_cpustat() -> Optional[CPUStat]:
+    """New instance (None if /proc/stat is not available)."""
+    try:
+        return CPUStat()
+    except (FileNotFoundError, PermissionError):
+        return None
+
+
+class CounterTable(ABC):
+    """
+    Counters by device from a procfs file, reported as rates per second.
+
+    Devices are selected by `include` and `exclude` glob patterns.
+    Counters that wrap around (at 32 or 64 bits) are handled.
+    """
+
+    filename: str
+    fields: List[str]      # NOTE: names of reported rates
+    scale: List[float]     # NOTE: rates are multiplied by these (e.g., sectors to bytes)
+    exclude_default: List[str] = []
+
+    file: ProcFile
+    include: List[str]
+    exclude: List[str]
+
+    _counters: Dict[str, List[int]]
+    _time: float
+
+    def __init__(self, include: List[str] = None, exclude: List[str] = None, path: str = None) -> None:
+        """Open file (relative to `PROC_ROOT` unless `path` is given) and take initial snapshot."""
+        self.file = ProcFile(path or os.path.join(PROC_ROOT, self.filename))
+        self.include = include or ['*']
+        self.exclude = self.exclude_default if exclude is None else exclude
+        self._counters = self.read()
+        self._time = time.monotonic()
+
+    def select(self, device: str) -> bool:
+        """True if `device` should be reported."""
+        return (any(fnmatch.fnmatchcase(device, pattern) for pattern in self.include) and
+                not any(fnmatch.fnmatchcase(device, pattern) for pattern in self.exclude))
+
+    def read(self) -> Dict[str, List[int]]:
+        """Current counters for selected devices."""
+        return {device: counters for device, counters in self.parse(self.file.read())
+                if self.select(device)}
+
+    @abstractmethod
+    def parse(self, data: bytes) -> List[Tuple[str, List[int]]]:
+        """Device name and counters (one for each field) for all devices."""
+
+    @staticmethod
+    def difference(new: int, old: int) -> int:
+        """Change in counter from `old` to `new` (allowing for wraparound or reset)."""
+        if new >= old:
+            return new - old
+        for bits in (32, 64):
+            if old < 2**bits and new + 2**bits - old < 2**(bits - 1):
+                return new + 2**bits - old
+        return new  # NOTE: counter was reset (e.g., device was re-created)
+
+    def update(self) -> Dict[str, List[float]]:
+        """Rates per second since previous update (devices seen for the first time are omitted)."""
+        counters, now = self.read(), time.monotonic()
+        elapsed, previous = now - self._time, self._counters
+        self._counters, self._time = counters, now
+        if elapsed <= 0:
+            return {}
+        return {device: [round(self.difference(new, old) * scale / elapsed, 1)
+                         for new, old, scale in zip(values, previous[device], self.scale)]
+                for device, values in counters.items() if device in previous}
+
+    @property
+    def devices(self) -> List[str]:
+        """Names of selected devices (as of the latest update)."""
+        return sorted(self._counters)
+
+
+class NetDev(CounterTable):
+    """Network interface throughput from /proc/net/dev."""
+
+    filename = 'net/dev'
+    fields = ['rx_bytes', 'tx_bytes', 'rx_packets', 'tx_packets']
+    scale = [1, 1, 1, 1]
+    exclude_default = ['lo']
+
+    def parse(self, data: bytes) -> List[Tuple[str, List[int]]]:
+        """Parse lines like 'eth0: <rx bytes> <rx packets> ... <tx bytes> <tx packets> ...'."""
+        devices = []
+        for line in data.split(b'\n')[2:]:  # NOTE: two lines of header
+            if line:
+                name, counters = line.split(b':', 1)
+                values = counters.split()
+                devices.append((name.strip().decode(),
+                                [int(values[0]), int(values[8]), int(values[1]), int(values[9])]))
+        return devices
+
+
+class DiskStats(CounterTable):
+    """Block device throughput, operations, and percent busy time from /proc/diskstats."""
+
+    filename = 'diskstats'
+    fields = ['read_bytes', 'write_bytes', 'read_iops', 'write_iops', 'busy']
+    scale = [512, 512, 1, 1, 0.1]  # NOTE: 512-byte sectors; milliseconds to percent
+    exclude_default = ['loop*', 'ram*']
+
+    def parse(self, data: bytes) -> List[Tuple[str, List[int]]]:
+        """Parse lines like '<major> <minor> <name> <reads> <merged> <sectors> ...' (see proc(5))."""
+        devices = []
+        for line in data.split(b'\n'):
+            values = line.split()
+            if len(values) >= 14:
+                devices.append((values[2].decode(),
+                                [int(values[5]), int(values[9]), int(values[3]), int(values[7]),
+                                 int(values[12])]))
+        return devices
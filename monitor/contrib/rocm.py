@@ -13,7 +13,7 @@
 
 # type annotations
 from __future__ import annotations
-from typing import Dict
+from typing import Dict, Tuple
 
 # standard libs
 import re
@@ -23,7 +23,8 @@ from abc import ABC
 from ..core.extern import ExternalMetric
 
 # public interface
-__all__ = ['RocmMetric', 'RocmPercent', 'RocmMemory', 'RocmPower', 'RocmTemperature', ]
+__all__ = ['RocmMetric', 'RocmPercent', 'RocmMemory', 'RocmPower', 'RocmTemperature',
+           'RocmSnapshot', 'RocmProcs', ]
 
 
 class RocmMetric(ExternalMetric, ABC):
@@ -34,7 +35,7 @@ class RocmPercent(RocmMetric):
     """Parse rocm-smi for GPU overall usage as a percentage."""
 
     _cmd: str = 'rocm-smi --showuse --csv'
-    _pattern: re.Pattern = re.compile(r'^card(\d),(\d+(?:\.\d+)?)')
+    _pattern: re.Pattern = re.compile(r'^card(\d+),(\d+(?:\.\d+)?)')
 
     @classmethod
     def parse_text(cls, block: str) -> Dict[str, Dict[int, float]]:
@@ -54,7 +55,7 @@ class RocmMemory(RocmMetric):
     """Parse rocm-smi for GPU memory usage as a percentage."""
 
     _cmd: str = 'rocm-smi --showmemuse --csv'
-    _pattern: re.Pattern = re.compile(r'^card(\d),(\d+(?:\.\d+)?)')
+    _pattern: re.Pattern = re.compile(r'^card(\d+),(\d+(?:\.\d+)?)')
 
     @classmethod
     def parse_text(cls, block: str) -> Dict[str, Dict[int, float]]:
@@ -74,7 +75,7 @@ class RocmTemperature(RocmMetric):
     """Parse rocm-smi for GPU temperature in Celsius."""
 
     _cmd: str = 'rocm-smi --showtemp --csv'
-    _pattern: re.Pattern = re.compile(r'^card(\d),(\d+(?:\.\d+)?),(\d+(?:\.\d+)?),(\d+(?:\.\d+)?)')
+    _pattern: re.Pattern = re.compile(r'^card(\d+),(\d+(?:\.\d+)?),(\d+(?:\.\d+)?),(\d+(?:\.\d+)?)')
 
     @classmethod
     def parse_text(cls, block: str) -> Dict[str, Dict[int, float]]:
@@ -95,7 +96,7 @@ class RocmPower(RocmMetric):
     """Parse rocm-smi for GPU total power draw (in Watts)."""
 
     _cmd: str = 'rocm-smi --showpower --csv'
-    _pattern: re.Pattern = re.compile(r'^card(\d),(\d+(?:\.\d+)?)')
+    _pattern: re.Pattern = re.compile(r'^card(\d+),(\d+(?:\.\d+)?)')
 
     @classmethod
     def parse_text(cls, block: str) -> Dict[str, Dict[int, float]]:
@@ -109,3 +110,75 @@ class RocmPower(RocmMetric):
             return {'power': data}
         except Exception as error:
             raise RuntimeError(f'Failed to parse output ({cls._cmd}): {error}') from error
+
+
+class RocmSnapshot(RocmMetric):
+    """Parse rocm-smi for all GPU metrics at once (percent, memory, power, and temp)."""
+
+    _cmd: str = 'rocm-smi --showuse --showmemuse --showpower --showtemp --csv'
+    _device: re.Pattern = re.compile(r'^card(\d+)$')
+    _columns: Dict[str, re.Pattern] = {
+        'percent': re.compile(r'^GPU use \(%\)$'),
+        'memory': re.compile(r'^GPU memory use \(%\)$'),
+        'power': re.compile(r'^.*Graphics Package Power \(W\)$'),
+        'temp': re.compile(r'^Temperature \(Sensor junction\) \(C\)$'),
+    }
+
+    @classmethod
+    def parse_text(cls, block: str) -> Dict[str, Dict[int, float]]:
+        """Parse `rocm-smi` output."""
+        try:
+            lines = block.strip().split('\n')  # NOTE: lines[0] == 'device,<name>,...' (order varies)
+            header = lines[0].strip().split(',')
+            columns = {}
+            for metric, pattern in cls._columns.items():
+                columns[metric], = [i for i, name in enumerate(header) if pattern.match(name)]
+            data = {metric: {} for metric in cls._columns}
+            for line in lines[1:]:
+                fields = line.strip().split(',')
+                index = int(cls._device.match(fields[0]).group(1))
+                for metric, column in columns.items():
+                    data[metric][index] = float(fields[column])
+            return data
+        except Exception as error:
+            raise RuntimeError(f'Failed to parse output ({cls._cmd}): {error}') from error
+
+
+class RocmProcs(RocmMetric):
+    """Parse rocm-smi for GPU memory (in bytes) and CU occupancy of each process (by GPU index and PID)."""
+
+    _cmd: str = 'rocm-smi --showpids --showpidgpus'
+    _process: re.Pattern = re.compile(r'^(\d+)\t[^\t]*\t\d+\t(\d+)\t\d+\t(\S+)')
+    _devices: re.Pattern = re.compile(r'^PID (\d+) is using \d+ DRM device\(s\):')
+
+    @classmethod
+    def parse_text(cls, block: str) -> Dict[str, Dict[Tuple[int, int], float]]:
+        """Parse `rocm-smi` output (processes are listed with 'PID<tab>PROCESS NAME<tab>...')."""
+        try:
+            processes, devices, lines = {}, {}, block.strip().split('\n')
+            for i, line in enumerate(lines):
+                match = cls._process.match(line)
+                if match:
+                    pid, memory, occupancy = match.groups()
+                    processes[int(pid)] = float(memory), cls._parse_percent(occupancy)
+                match = cls._devices.match(line)
+                if match and i + 1 < len(lines):
+                    devices[int(match.group(1))] = [int(index) for index in lines[i + 1].split()]
+            data = {'memory': {}, 'percent': {}}
+            for pid, (memory, occupancy) in processes.items():
+                indices = devices.get(pid, [])
+                for index in indices:
+                    # NOTE: rocm-smi only reports the total for the process
+                    data['memory'][index, pid] = memory / len(indices)
+                    data['percent'][index, pid] = occupancy
+            return data
+        except Exception as error:
+            raise RuntimeError(f'Failed to parse output ({cls._cmd}): {error}') from error
+
+    @staticmethod
+    def _parse_percent(value: str) -> float:
+        """CU occupancy as a percentage (NaN if not available, e.g., 'UNKNOWN' or 'N/A')."""
+        try:
+            return float(value.rstrip('%'))
+        except ValueError:
+            return float('nan')
@@ -0,0 +1,161 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Windowed aggregation of samples (report statistics instead of every sample)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Tuple, Any, Hashable
+
+# standard libs
+import math
+from array import array
+from datetime import datetime
+
+# internal libs
+from .output import RecordWriter
+
+# public interface
+__all__ = ['RingBuffer', 'AggregateWriter', 'STATISTICS', 'summarize', ]
+
+
+# NOTE: order of columns in output
+STATISTICS = ['mean', 'min', 'max', 'p95', 'last']
+
+
+class RingBuffer:
+    """Preallocated fixed-capacity buffer of floats (oldest values are overwritten)."""
+
+    capacity: int
+    count: int = 0
+
+    _data: array
+    _index: int = 0
+
+    def __init__(self, capacity: int) -> None:
+        """Allocate storage for `capacity` values."""
+        self.capacity = capacity
+        self._data = array('d', bytes(8 * capacity))
+
+    def append(self, value: float) -> None:
+        """Add `value`, overwriting the oldest value if full."""
+        self._data[self._index] = value
+        self._index = (self._index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    @property
+    def last(self) -> float:
+        """Most recent value."""
+        return self._data[self._index - 1]
+
+    def values(self) -> array:
+        """Current values (in no particular order)."""
+        return self._data[:self.count]
+
+    def clear(self) -> None:
+        """Reset without releasing storage."""
+        self.count = 0
+        self._index = 0
+
+
+def summarize(buffer: RingBuffer) -> Tuple[float, ...]:
+    """Statistics (see `STATISTICS`) for values in `buffer`, NaN if empty."""
+    if not buffer.count:
+        return (math.nan, ) * len(STATISTICS)
+    values = sorted(buffer.values())
+    p95 = values[max(0, math.ceil(0.95 * len(values)) - 1)]  # NOTE: nearest-rank
+    return math.fsum(values) / len(values), values[0], values[-1], p95, buffer.last
+
+
+class AggregateWriter(RecordWriter):
+    """
+    Accumulate samples in a ring buffer per series and write statistics
+    (see `STATISTICS`) to the underlying `writer` every `window` samples.
+
+    If the first column is an identifier (e.g., 'gpu_id'), each identifier is
+    a separate series and one row is written for each. Otherwise each column
+    is a series and a single row is written. On `close`, statistics are written
+    for the samples of a partial window.
+    """
+
+    writer: RecordWriter
+    window: int
+    indexed: bool
+
+    _series: Dict[Tuple[Hashable, int], RingBuffer]
+    _count: int = 0
+
+    def __init__(self, resource: str, columns: List[str], writer: RecordWriter, window: int) -> None:
+        """Wrap `writer` (whose columns are those of `expand_columns`)."""
+        super().__init__(resource, columns)
+        self.writer = writer
+        self.window = window
+        self.indexed = columns[0].endswith('_id')
+        self.missing = writer.missing
+        self._series = {}
+
+    @staticmethod
+    def expand_columns(columns: List[str]) -> List[str]:
+        """Output columns with a column per statistic for each value column."""
+        index = [] if not columns[0].endswith('_id') else columns[:1]
+        values = columns[len(index):]
+        return index + [f'{name}_{stat}' for name in values for stat in STATISTICS]
+
+    @staticmethod
+    def expand_dtypes(columns: List[str], dtypes: List[str]) -> List[str]:
+        """
+        Format codes (see `BinaryWriter`) for the columns of `expand_columns`.
+        Statistics are float32 for float32 columns, otherwise float64 (exact for integers).
+        """
+        index = [] if not columns[0].endswith('_id') else dtypes[:1]
+        values = dtypes[len(index):]
+        return index + ['f' if dtype == 'f' else 'd' for dtype in values for _ in STATISTICS]
+
+    def write(self, *values: Any) -> None:
+        key = values[0] if self.indexed else None
+        for i, value in enumerate(values[1:] if self.indexed else values):
+            if value == '' or value != value:  # NOTE: missing or NaN
+                continue
+            if (key, i) not in self._series:
+                self._series[key, i] = RingBuffer(self.window)
+            self._series[key, i].append(value)
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        self.write(*values)
+
+    def commit(self) -> None:
+        """Write statistics once `window` samples have accumulated."""
+        self._count += 1
+        if self._count >= self.window:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write statistics for the samples accumulated so far (even if fewer than `window`)."""
+        width = len(self.columns) - (1 if self.indexed else 0)
+        keys = sorted({key for key, _ in self._series}, key=lambda key: (key is not None, key))
+        for key in keys:
+            row = [] if key is None else [key]
+            for i in range(width):
+                buffer = self._series.get((key, i))
+                row.extend(summarize(buffer) if buffer else (math.nan, ) * len(STATISTICS))
+            self.writer.write(*row)
+        for buffer in self._series.values():
+            buffer.clear()
+        self._count = 0
+        self.writer.commit()
+
+    def close(self) -> None:
+        """Write statistics for a partial window (if any) before closing `writer`."""
+        try:
+            if self._count:
+                self.flush()
+        finally:
+            self.writer.close()
@@ -0,0 +1,310 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Alert rules evaluated on every sample (thresholds, rate of change, and deviation from average)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Tuple, Any, Optional, Callable
+
+# standard libs
+import os
+import sys
+import math
+import time
+import shlex
+import fnmatch
+import operator
+import subprocess
+from datetime import datetime
+
+# internal libs
+from .output import RecordWriter, CSVWriter
+from .exceptions import AlertTriggered
+from .logging import Logger
+
+# public interface
+__all__ = ['Rule', 'State', 'parse_rule', 'load_rules', 'AlertWriter', 'AlertLog', 'get_alert_log',
+           'ALERT_COLUMNS', 'ALERT_LOG', ]
+
+
+# NOTE: alert events are appended here ('-' for <stderr>)
+ALERT_LOG: str = os.getenv('MONITOR_ALERT_LOG', '-')
+
+# NOTE: order of columns for alert events
+ALERT_COLUMNS = ['rule', 'series_id', 'state', 'value']
+
+OPERATORS: Dict[str, Callable[[float, float], bool]] = {
+    '>': operator.gt, '>=': operator.ge, '<': operator.lt, '<=': operator.le,
+}
+
+
+log = Logger.with_name('alert')
+
+
+class State:
+    """Everything kept for a single rule and series (constant size)."""
+
+    __slots__ = ('count', 'active', 'last', 'time', 'samples', 'mean', 'var')
+
+    def __init__(self) -> None:
+        """Initialize empty."""
+        self.count = 0
+        self.active = False
+        self.last = None
+        self.time = None
+        self.samples = 0
+        self.mean = 0.0
+        self.var = 0.0
+
+
+class Rule:
+    """
+    Condition on every series with a column matching `pattern`.
+
+    The measure is the value itself, its rate of change (per second), or its
+    deviation from an exponentially weighted moving average (in standard
+    deviations, with weight `alpha`). The rule is firing once the measure
+    compares true with `threshold` for `count` samples in a row, and is
+    resolved at the first sample after that for which it does not.
+    """
+
+    __slots__ = ('name', 'pattern', 'kind', 'alpha', 'op', 'compare', 'threshold', 'count',
+                 'action', 'command', 'warmup')
+
+    KINDS = ['value', 'rate', 'ewma']
+    ACTIONS = ['exit', 'exec']
+
+    def __init__(self, name: str, pattern: str, op: str, threshold: float, kind: str = 'value',
+                 alpha: float = None, count: int = 1, action: str = None, command: List[str] = None) -> None:
+        """Initialize and check all parameters (ValueError if invalid)."""
+        if kind not in self.KINDS:
+            raise ValueError(f'Unknown kind of rule ({kind})')
+        if op not in OPERATORS:
+            raise ValueError(f'Expected one of {", ".join(OPERATORS)} (given "{op}")')
+        if kind == 'ewma' and not (alpha is not None and 0 < alpha <= 1):
+            raise ValueError(f'Expected weight between 0 and 1 for ewma (given {alpha})')
+        if count < 1:
+            raise ValueError(f'Expected at least 1 sample for "for" (given {count})')
+        if action is not None and action not in self.ACTIONS:
+            raise ValueError(f'Expected exit or exec (given "{action}")')
+        if action == 'exec' and not command:
+            raise ValueError('Expected command for exec')
+        self.name = name
+        self.pattern = pattern
+        self.kind = kind
+        self.alpha = alpha
+        self.op = op
+        self.compare = OPERATORS[op]
+        self.threshold = threshold
+        self.count = count
+        self.action = action
+        self.command = command
+        self.warmup = math.ceil(1 / alpha) if kind == 'ewma' else 0
+
+    def matches(self, column: str) -> bool:
+        """True if rule applies to `column`."""
+        return fnmatch.fnmatchcase(column, self.pattern)
+
+    def measure(self, state: State, value: float, timestamp: float) -> Optional[float]:
+        """Update `state` with `value` at `timestamp` (seconds), and return the measure if available."""
+        if self.kind == 'value':
+            return value
+        if self.kind == 'rate':
+            last, last_time = state.last, state.time
+            state.last, state.time = value, timestamp
+            if last is None or timestamp <= last_time:
+                return None
+            return (value - last) / (timestamp - last_time)
+        state.samples += 1
+        if state.samples == 1:
+            state.mean = value
+            return None
+        diff = value - state.mean
+        score = diff / math.sqrt(state.var) if state.var > 0 else 0.0
+        increment = self.alpha * diff
+        state.mean += increment
+        state.var = (1 - self.alpha) * (state.var + diff * increment)
+        return score if state.samples > self.warmup else None
+
+
+def parse_rule(line: str) -> Optional[Rule]:
+    """
+    Rule from a single `line` (None if empty or only a comment), e.g.,
+    'gpu-hot gpu_temp > 85 for 3 exec notify-send "GPU is hot"'.
+    """
+    tokens = shlex.split(line, comments=True)
+    if not tokens:
+        return None
+    if len(tokens) < 4:
+        raise ValueError('Expected NAME SERIES CONDITION')
+    name, pattern, *tokens = tokens
+    kind, alpha = 'value', None
+    try:
+        if tokens[0] == 'rate':
+            kind, tokens = 'rate', tokens[1:]
+        elif tokens[0] == 'ewma':
+            kind, alpha, tokens = 'ewma', float(tokens[1]), tokens[2:]
+        op, threshold, *tokens = tokens
+        threshold = float(threshold)
+        count = 1
+        if tokens[:1] == ['for']:
+            count, tokens = int(tokens[1]), tokens[2:]
+    except IndexError:
+        raise ValueError('Incomplete condition') from None
+    action, *command = tokens or [None]
+    if action == 'exit' and command:
+        raise ValueError(f'Unexpected "{command[0]}" after exit')
+    return Rule(name, pattern, op, threshold, kind=kind, alpha=alpha, count=count,
+                action=action, command=command or None)
+
+
+def load_rules(path: str) -> List[Rule]:
+    """Read rules from file at `path` (one per line, RuntimeError if invalid)."""
+    try:
+        with open(path, mode='r') as stream:
+            lines = stream.readlines()
+    except FileNotFoundError as error:
+        raise RuntimeError(f'File not found: {path}') from error
+    rules = []
+    for number, line in enumerate(lines, start=1):
+        try:
+            rule = parse_rule(line)
+        except ValueError as error:
+            raise RuntimeError(f'{path}, line {number}: {error}') from error
+        if rule is not None:
+            rules.append(rule)
+    return rules
+
+
+class AlertLog(CSVWriter):
+    """Alert events in CSV format (the file is closed with the writer, but not <stderr>)."""
+
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            if self.stream is not sys.stderr.buffer:
+                self.stream.close()
+
+
+def get_alert_log(resource: str, path: str = ALERT_LOG) -> AlertLog:
+    """Writer for alert events appended to `path` ('-' for <stderr>, header only if new)."""
+    stream = sys.stderr.buffer if path == '-' else open(path, mode='ab')
+    writer = AlertLog(resource, ALERT_COLUMNS, stream=stream, flush_interval=0)
+    if path == '-' or stream.tell() == 0:
+        writer.write_header()
+    return writer
+
+
+def report_error(rule: Rule, error: Exception) -> None:
+    """Log a warning when a command fails to start."""
+    log.warning(f'alert {rule.name}: {error}')
+
+
+class AlertWriter(RecordWriter):
+    """
+    Evaluate `rules` on every row before passing it to `writer`.
+
+    Rules are matched with the columns once (the first column is the identifier
+    of each series if it ends in '_id'), so each row is only a few comparisons.
+    Changes of state are written to `events`, and start the command of rules with
+    the "exec" action (without waiting). A firing rule with the "exit" action raises
+    `AlertTriggered` when the sample is committed.
+    """
+
+    writer: RecordWriter
+    events: RecordWriter
+    indexed: bool
+
+    _bindings: List[Tuple[int, str, Rule]]
+    _states: Dict[Any, List[State]]  # NOTE: one for each binding, by identifier
+    _processes: List[subprocess.Popen]
+    _triggered: Optional[str] = None
+
+    def __init__(self, writer: RecordWriter, rules: List[Rule], events: RecordWriter) -> None:
+        """Wrap `writer` (rules not matching any column are ignored)."""
+        super().__init__(writer.resource, writer.columns)
+        self.writer = writer
+        self.events = events
+        self.missing = writer.missing
+        self.indexed = self.columns[0].endswith('_id')
+        self._bindings = [(index, column, rule) for rule in rules
+                          for index, column in enumerate(self.columns)
+                          if (index or not self.indexed) and rule.matches(column)]
+        self._states = {}
+        self._processes = []
+
+    def write(self, *values: Any) -> None:
+        self.writer.write(*values)
+        self.evaluate(time.time(), values)
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        self.writer.write_at(timestamp, *values)
+        self.evaluate(timestamp.timestamp(), values)
+
+    def evaluate(self, timestamp: float, values: Tuple[Any, ...]) -> None:
+        """Update every rule for the series in `values` at `timestamp` (seconds)."""
+        key = values[0] if self.indexed else None
+        states = self._states.get(key)
+        if states is None:
+            states = self._states[key] = [State() for _ in self._bindings]
+        for (index, column, rule), state in zip(self._bindings, states):
+            value = values[index]
+            if not isinstance(value, (int, float)) or value != value:
+                continue  # NOTE: missing (or NaN)
+            series = column if key is None else f'{column}.{key}'
+            measure = rule.measure(state, value, timestamp)
+            if measure is None:
+                continue
+            if rule.compare(measure, rule.threshold):
+                if state.count < rule.count:
+                    state.count += 1
+                    if state.count == rule.count:
+                        state.active = True
+                        self.emit(timestamp, rule, series, 'firing', value)
+            else:
+                state.count = 0
+                if state.active:
+                    state.active = False
+                    self.emit(timestamp, rule, series, 'resolved', value)
+
+    def emit(self, timestamp: float, rule: Rule, series: str, state: str, value: float) -> None:
+        """Write event and take action of `rule`."""
+        self.events.write_at(datetime.fromtimestamp(timestamp), rule.name, series, state, value)
+        if rule.action == 'exec':
+            env = {**os.environ, 'MONITOR_ALERT_RULE': rule.name, 'MONITOR_ALERT_RESOURCE': self.resource,
+                   'MONITOR_ALERT_SERIES': series, 'MONITOR_ALERT_STATE': state,
+                   'MONITOR_ALERT_VALUE': str(value)}
+            try:
+                # NOTE: output of the command must not mix with records on <stdout>
+                self._processes.append(subprocess.Popen(rule.command, env=env, stdin=subprocess.DEVNULL,
+                                                        stdout=sys.stderr.fileno()))
+            except OSError as error:
+                report_error(rule, error)
+        elif rule.action == 'exit' and state == 'firing' and self._triggered is None:
+            self._triggered = f'Alert {rule.name} firing for {series} (value {value})'
+
+    def write_header(self) -> None:
+        self.writer.write_header()
+
+    def commit(self) -> None:
+        self.writer.commit()
+        self.events.commit()
+        self._processes = [process for process in self._processes if process.poll() is None]
+        if self._triggered is not None:
+            raise AlertTriggered(self._triggered)
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        finally:
+            self.events.close()
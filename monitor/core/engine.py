@@ -0,0 +1,148 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Asynchronous collection engine (concurrent providers with timeouts)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Dict, Callable, Awaitable, Optional, Tuple, Any, TYPE_CHECKING
+
+# standard libs
+import time
+import asyncio
+from datetime import datetime
+
+# internal libs
+from .schedule import Scheduler
+from .logging import Logger
+
+if TYPE_CHECKING:
+    from .selfstats import SelfStats
+
+# public interface
+__all__ = ['Provider', 'Engine', 'report_drop', ]
+
+
+# A provider is a coroutine function returning values by column name
+Provider = Callable[[], Awaitable[Dict[str, Any]]]
+
+
+log = Logger.with_name('engine')
+
+
+def report_drop(engine: Engine, name: str, reason: str) -> None:
+    """Log a warning for a dropped result."""
+    log.warning(f'{engine.name}: {name} {reason} ({engine.dropped[name]} dropped)')
+
+
+def discard(task: asyncio.Future) -> None:
+    """Retrieve and ignore the outcome of a `task` that is no longer awaited."""
+    if not task.cancelled():
+        task.exception()
+
+
+class Engine:
+    """
+    Collect from many `providers` concurrently on each tick.
+
+    Each provider has `timeout` seconds to complete. A result that arrives
+    within the timeout is attached to the tick it was started for, even if
+    later ticks have already begun; otherwise it is dropped and counted.
+    A provider that timed out is not cancelled (a worker thread cannot be
+    stopped) but is left to finish on its own; until it does, it is not
+    started again (also dropped and counted), so a hung provider holds at
+    most one worker thread and slow providers never pile up.
+    """
+
+    name: str
+    providers: Dict[str, Provider]
+    timeout: Optional[float] = None
+    on_drop: Optional[Callable[[Engine, str, str], None]] = None
+    dropped: Dict[str, int]
+    stats: Optional[SelfStats] = None
+
+    _running: Dict[str, asyncio.Future]
+
+    def __init__(self, providers: Dict[str, Provider], timeout: float = None, name: str = 'monitor',
+                 on_drop: Optional[Callable[[Engine, str, str], None]] = report_drop,
+                 stats: SelfStats = None) -> None:
+        """Initialize with named `providers` (time taken by each is added to `stats`)."""
+        self.name = name
+        self.providers = providers
+        self.timeout = timeout
+        self.on_drop = on_drop
+        self.dropped = {name: 0 for name in providers}
+        self.stats = stats
+        self._running = {}
+
+    async def collect(self) -> Dict[str, Any]:
+        """Run all providers concurrently and merge their results."""
+        return await self._collect(self.timeout)
+
+    async def prime(self) -> Dict[str, Any]:
+        """Run all providers once without a timeout (e.g., to establish columns)."""
+        return await self._collect(None)
+
+    async def _collect(self, timeout: Optional[float]) -> Dict[str, Any]:
+        start = time.perf_counter_ns()
+        results = await asyncio.gather(*(self._collect_one(name, timeout) for name in self.providers))
+        if self.stats is not None:
+            self.stats.record('collect', time.perf_counter_ns() - start)
+        record = {}
+        for result in results:
+            record.update(result)
+        return record
+
+    async def _collect_one(self, name: str, timeout: Optional[float]) -> Dict[str, Any]:
+        """Run a single provider by `name`, empty result if dropped."""
+        if name in self._running and not self._running[name].done():
+            self._drop(name, 'still running')
+            return {}
+        task = asyncio.ensure_future(self.providers[name]())
+        self._running[name] = task
+        start = time.perf_counter_ns()
+        try:
+            result = await asyncio.wait_for(asyncio.shield(task), timeout)
+            if self.stats is not None:
+                self.stats.record(name, time.perf_counter_ns() - start)
+            return result
+        except asyncio.TimeoutError:
+            task.add_done_callback(discard)  # NOTE: late result (or error) is not used
+            self._drop(name, 'timed out')
+            return {}
+
+    def _drop(self, name: str, reason: str) -> None:
+        self.dropped[name] += 1
+        if self.on_drop is not None:
+            self.on_drop(self, name, reason)
+
+    async def run(self, scheduler: Scheduler,
+                  callback: Callable[[datetime, Dict[str, Any]], None]) -> None:
+        """
+        Start collection on every tick of `scheduler` and pass each record
+        with its tick timestamp to `callback` (in order).
+        """
+        pending: asyncio.Queue[Tuple[datetime, asyncio.Future]] = asyncio.Queue()
+
+        async def emit() -> None:
+            while True:
+                timestamp, task = await pending.get()
+                callback(timestamp, await task)
+
+        emitter = asyncio.ensure_future(emit())
+        try:
+            async for _ in scheduler:
+                if emitter.done():
+                    break
+                pending.put_nowait((datetime.now(), asyncio.ensure_future(self.collect())))
+            emitter.result()  # raises if the emitter failed
+        finally:
+            emitter.cancel()
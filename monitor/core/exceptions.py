@@ -15,13 +15,21 @@
 from typing import Callable
 
 # public interface
-__all__ = ['CompletedCommand', 'log_and_exit', ]
+__all__ = ['CompletedCommand', 'AlertTriggered', 'log_and_exit', 'ALERT_STATUS', ]
+
+
+# NOTE: exit status for an alert rule with the "exit" action (after those of cmdkit)
+ALERT_STATUS: int = 7
 
 
 class CompletedCommand(Exception):
     """Lift exit_status of sub-commands `main` method."""
 
 
+class AlertTriggered(Exception):
+    """An alert rule with the "exit" action is firing."""
+
+
 def log_and_exit(exc: Exception, logger: Callable[[str], None], status: int) -> int:
     """Log the exception arguments and return with `status`."""
     logger(*exc.args)
@@ -0,0 +1,136 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Serve records in the Prometheus text exposition format over HTTP."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Tuple, Callable, Optional, Any
+
+# standard libs
+import math
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# public interface
+__all__ = ['MetricsPage', 'MetricsServer', 'CONTENT_TYPE', 'format_labels', ]
+
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+# A description is the metric name and labels for a column (None to leave it out)
+Describe = Callable[[str], Optional[Tuple[str, Dict[str, str]]]]
+
+
+def format_labels(labels: Dict[str, str]) -> str:
+    """Format `labels` as '{name="value",...}' (empty if no labels)."""
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for value in labels.values())
+    return '{' + ','.join(f'{name}="{value}"' for name, value in zip(labels, escaped)) + '}'
+
+
+def format_value(value: Any) -> str:
+    """Format `value` as a sample value (e.g., 'NaN' or '+Inf')."""
+    value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+
+class MetricsPage:
+    """
+    Current values of all metrics rendered as a single document.
+
+    The document is rendered once on each `update` and swapped in as a whole,
+    so reading `content` is only a reference (any number of scrapes per sample).
+    Columns are grouped into metric families by `describe` (all gauges).
+    """
+
+    describe: Describe
+    help: Dict[str, str]
+    content: bytes = b''
+
+    _families: Dict[str, List[Tuple[str, str]]]  # NOTE: (column, series) by metric name
+    _columns: set
+
+    def __init__(self, describe: Describe, help: Dict[str, str] = None) -> None:
+        """Initialize with `describe` for column names and `help` text by metric name."""
+        self.describe = describe
+        self.help = help or {}
+        self._families = {}
+        self._columns = set()
+
+    def add_columns(self, columns: List[str]) -> None:
+        """Prepare series for new `columns` (e.g., a network interface appeared)."""
+        for column in columns:
+            self._columns.add(column)
+            description = self.describe(column)
+            if description is not None:
+                name, labels = description
+                self._families.setdefault(name, []).append((column, name + format_labels(labels)))
+
+    def update(self, record: Dict[str, Any]) -> None:
+        """Render document from `record` (values by column name, empty values are left out)."""
+        if not self._columns.issuperset(record):
+            self.add_columns([column for column in record if column not in self._columns])
+        lines = []
+        for name, series in self._families.items():
+            samples = [f'{text} {format_value(record[column])}' for column, text in series
+                       if record.get(column, '') != '']
+            if samples:
+                if name in self.help:
+                    lines.append(f'# HELP {name} {self.help[name]}')
+                lines.append(f'# TYPE {name} gauge')
+                lines.extend(samples)
+        self.content = ('\n'.join(lines) + '\n').encode() if lines else b''
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Respond to GET /metrics with the current page."""
+
+    server: MetricsServer
+
+    def do_GET(self) -> None:  # noqa: name required by base class
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        content = self.server.page.content
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Do not log each request."""
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """HTTP server for a `MetricsPage` (in a background thread, see `start`)."""
+
+    page: MetricsPage
+    daemon_threads = True
+
+    def __init__(self, page: MetricsPage, port: int, host: str = '') -> None:
+        """Bind to `port` on `host` (default: all interfaces)."""
+        super().__init__((host, port), MetricsHandler)
+        self.page = page
+
+    def start(self) -> threading.Thread:
+        """Serve requests in a background (daemon) thread."""
+        thread = threading.Thread(target=self.serve_forever, name='metrics-server', daemon=True)
+        thread.start()
+        return thread
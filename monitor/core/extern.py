@@ -8,7 +8,7 @@
 # You should have received a copy of the Apache License along with this program.
 # If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
 
-"""Simple support for external metrics (subprocess call to external commands)."""
+"""Simple support for metrics (collected in-process or by a subprocess call to external commands)."""
 
 
 # type annotations
@@ -16,11 +16,12 @@ from __future__ import annotations
 from typing import Mapping, Union, List, Dict, TypeVar
 
 # standard library
+import shlex
 from abc import ABC, abstractclassmethod
-from subprocess import check_output
+from subprocess import check_output, PIPE, DEVNULL
 
 # public interface
-__all__ = ['ExternalMetric', ]
+__all__ = ['Metric', 'ExternalMetric', ]
 
 
 # value type for metrics
@@ -28,15 +29,14 @@ __all__ = ['ExternalMetric', ]
 T = TypeVar('T', float, List[float], Dict[int, float])
 
 
-class ExternalMetric(ABC):
-    """Structured object from text-block."""
+class Metric(ABC):
+    """Structured object for a single sample of a resource (see `collect`)."""
 
-    _cmd: str = None
     _data: Dict[str, T]
 
-    def __init__(self, other: Union[Mapping, ExternalMetric]) -> None:
+    def __init__(self, other: Union[Mapping, Metric]) -> None:
         """Initialize directly from initial object."""
-        self.data = other if not isinstance(other, ExternalMetric) else other.data
+        self.data = other if not isinstance(other, Metric) else other.data
 
     @property
     def data(self) -> Dict[str, T]:
@@ -46,12 +46,64 @@ class ExternalMetric(ABC):
     def data(self, other: Dict[str, T]) -> None:
         self._data = dict(other)
 
+    @abstractclassmethod
+    def collect(cls) -> Metric:
+        """Collect a new sample."""
+
+    @classmethod
+    async def collect_async(cls) -> Metric:
+        """Collect a new sample without blocking (default calls `collect` in a worker thread)."""
+        import asyncio  # NOTE: deferred, only needed by asynchronous callers
+        return await asyncio.get_running_loop().run_in_executor(None, cls.collect)
+
+    def __str__(self) -> str:
+        """String representation."""
+        return str(self._data)
+
+    def __repr__(self) -> str:
+        """Interactive representation."""
+        return f'{self.__class__.__name__}({self._data})'
+
+
+class ExternalMetric(Metric, ABC):
+    """Structured object from text-block (output of `_cmd`)."""
+
+    _cmd: str = None
+
+    @classmethod
+    def collect(cls) -> ExternalMetric:
+        """Collect a new sample (default executes `_cmd`, see `from_cmd`)."""
+        return cls.from_cmd()
+
+    @classmethod
+    async def collect_async(cls) -> ExternalMetric:
+        """Collect a new sample without blocking (default executes `_cmd`, see `from_cmd_async`)."""
+        return await cls.from_cmd_async()
+
     @classmethod
     def from_cmd(cls) -> ExternalMetric:
         """Execute `_cmd` in a subprocess and parse text block."""
         block = check_output(cls._cmd, shell=True).decode()
         return cls.from_text(block)
 
+    @classmethod
+    async def from_cmd_async(cls) -> ExternalMetric:
+        """Execute `_cmd` in an asynchronous subprocess and parse text block."""
+        import asyncio  # NOTE: deferred, only needed by asynchronous callers
+        try:
+            process = await asyncio.create_subprocess_exec(*shlex.split(cls._cmd),
+                                                           stdout=PIPE, stderr=DEVNULL)
+        except FileNotFoundError as error:
+            raise RuntimeError(f'Command not found ({cls._cmd})') from error
+        try:
+            block, _ = await process.communicate()
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+        if process.returncode != 0:
+            raise RuntimeError(f'Command failed with exit status {process.returncode} ({cls._cmd})')
+        return cls.from_text(block.decode())
+
     @classmethod
     def from_text(cls, block: str) -> ExternalMetric:
         """Parse text `block` for attributes."""
@@ -61,11 +113,3 @@ class ExternalMetric(ABC):
     @abstractclassmethod
     def parse_text(cls, block: str) -> Dict[str, T]:
         """Parse the text `block` and return attributes."""
-
-    def __str__(self) -> str:
-        """String representation."""
-        return str(self._data)
-
-    def __repr__(self) -> str:
-        """Interactive representation."""
-        return f'{self.__class__.__name__}({self._data})'
@@ -0,0 +1,421 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""
+Merge records pushed by many monitors (see `NetworkWriter`) and summarize
+them by group of hosts (e.g., rack or partition).
+
+The last few samples of every device (e.g., a single GPU on a host) are kept in a
+`Table` with all devices of the same group and metrics. Records are decoded and
+stored as they arrive; `Fleet.rollup` then computes the mean and maximum over
+these windows for each group and metric.
+"""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Set, Tuple, Callable, Optional, Any, Hashable, TYPE_CHECKING
+
+# standard libs
+import re
+import math
+import time
+import socket
+import fnmatch
+import asyncio
+from array import array
+from operator import itemgetter
+
+# internal libs
+from .network import (FrameDecoder, RecordDecoder, parse_address, remove_socket,
+                      FRAME_HEADER, FRAME_RECORDS)
+
+if TYPE_CHECKING:
+    from .selfstats import SelfStats
+
+# public interface
+__all__ = ['Table', 'Source', 'Grouping', 'Fleet', 'listen', 'ROLLUP_COLUMNS', 'ALL_HOSTS', ]
+
+
+# NOTE: columns of each row from `Fleet.rollup`
+ROLLUP_COLUMNS = ['group_id', 'metric', 'hosts', 'devices', 'mean', 'max', 'hot']
+
+# NOTE: group name for every host (in addition to any other group)
+ALL_HOSTS = 'all'
+
+# NOTE: wide columns from "monitor all" (e.g., 'gpu_0_temp' is 'gpu_temp' for device 0)
+DEVICE_COLUMN: re.Pattern = re.compile(r'^(gpu|cpu)_(\d+)_(\w+)$')
+
+
+class Table:
+    """
+    Windows of the latest samples for many devices with the same metrics.
+
+    Each device (a row) has `size` samples of every metric in a single
+    preallocated array, so a statistic over all devices and samples for one
+    metric is a single strided slice. Empty and released rows hold NaN.
+    """
+
+    metrics: Tuple[str, ...]
+    width: int
+    size: int
+
+    _data: array
+    _latest: array
+    _updated: array
+    _index: List[int]
+    _owners: List[Optional[Tuple[str, Dict[Hashable, int], Hashable]]]
+    _free: List[int]
+    _used: int = 0  # NOTE: rows beyond this were never used (not included in statistics)
+
+    def __init__(self, metrics: Tuple[str, ...], size: int) -> None:
+        """Initialize empty for `size` samples of each of the `metrics`."""
+        self.metrics = metrics
+        self.width = len(metrics)
+        self.size = size
+        self._data = array('f')
+        self._latest = array('f')
+        self._updated = array('d')
+        self._index = []
+        self._owners = []
+        self._free = []
+
+    @property
+    def rows(self) -> int:
+        """Number of rows allocated (including released rows)."""
+        return len(self._index)
+
+    def add(self, hostname: str, rows: Dict[Hashable, int], key: Hashable, now: float) -> int:
+        """Allocate a row for device `key` of `hostname` (also stored in `rows`)."""
+        if not self._free:
+            count = max(self.rows, 16)  # NOTE: grow by doubling
+            self._data.extend(array('f', [math.nan]) * (count * self.size * self.width))
+            self._latest.extend(array('f', [math.nan]) * (count * self.width))
+            self._updated.extend(array('d', bytes(8 * count)))
+            self._free.extend(reversed(range(self.rows, self.rows + count)))
+            self._index.extend([0] * count)
+            self._owners.extend([None] * count)
+        row = rows[key] = self._free.pop()
+        self._owners[row] = (hostname, rows, key)
+        self._used = max(self._used, row + 1)
+        self._updated[row] = now
+        return row
+
+    def append(self, row: int, values: Tuple[float, ...], now: float) -> None:
+        """Add a sample of `values` (one per metric) to `row`, overwriting the oldest if full."""
+        width = self.width
+        index = self._index[row]
+        start = (row * self.size + index) * width
+        values = array('f', values)
+        self._data[start:start + width] = values
+        self._latest[row * width:row * width + width] = values
+        self._index[row] = (index + 1) % self.size
+        self._updated[row] = now
+
+    def expire(self, before: float) -> None:
+        """Release rows not updated since `before` (e.g., the host went down)."""
+        for row, updated in enumerate(self._updated):
+            owner = self._owners[row]
+            if owner is not None and updated < before:
+                _, rows, key = owner
+                del rows[key]
+                self._owners[row] = None
+                self._free.append(row)
+                span = self.size * self.width
+                self._data[row * span:(row + 1) * span] = array('f', [math.nan]) * span
+                self._latest[row * self.width:(row + 1) * self.width] = array('f', [math.nan]) * self.width
+
+    @property
+    def hosts(self) -> Set[str]:
+        """Hostnames with at least one row."""
+        return {owner[0] for owner in self._owners if owner is not None}
+
+    @property
+    def devices(self) -> int:
+        """Number of rows in use."""
+        return self.rows - len(self._free)
+
+    def summarize(self, column: int, threshold: float = None) -> Optional[Tuple[float, int, float, int]]:
+        """
+        Sum, count, and maximum of all (non-missing) values of the metric at `column`,
+        and the number of devices whose latest value exceeds `threshold` (None if no values).
+        """
+        values = self._data[column:self._used * self.size * self.width:self.width]
+        total = sum(values)
+        if total != total:  # NOTE: skip missing (NaN) values
+            values = [value for value in values if value == value]
+            if not values:
+                return None
+            total = sum(values)
+        hot = 0
+        if threshold is not None:
+            hot = sum(1 for value in self._latest[column:self._used * self.width:self.width]
+                      if value > threshold)
+        return total, len(values), max(values), hot
+
+
+# A part of each record is stored in its own row: the position of the device
+# identifier (or None), the fixed device otherwise, the metrics, and a getter for their values
+Part = Tuple[Optional[int], Hashable, Tuple[str, ...], Callable[[Tuple], Tuple[float, ...]]]
+
+
+def _getter(indices: List[int]) -> Callable[[Tuple], Tuple[float, ...]]:
+    """Like `itemgetter` but always returns a tuple."""
+    if len(indices) == 1:
+        index, = indices
+        return lambda values: (values[index], )
+    return itemgetter(*indices)
+
+
+def split_columns(columns: List[str], offset: int = 0) -> List[Part]:
+    """How to split records with `columns` into rows (see `Part`), values start at `offset`."""
+    if columns[0].endswith('_id'):
+        return [(offset, None, tuple(columns[1:]), _getter(list(range(offset + 1, offset + len(columns)))))]
+    devices: Dict[Hashable, Tuple[List[str], List[int]]] = {}
+    for index, column in enumerate(columns, start=offset):
+        device, metric = None, column
+        match = DEVICE_COLUMN.match(column)
+        if match:
+            device, metric = int(match.group(2)), f'{match.group(1)}_{match.group(3)}'
+        metrics, indices = devices.setdefault(device, ([], []))
+        metrics.append(metric)
+        indices.append(index)
+    return [(None, device, tuple(metrics), _getter(indices))
+            for device, (metrics, indices) in devices.items()]
+
+
+class Source:
+    """A single sender (host and resource) and the row for each of its devices."""
+
+    hostname: str
+    resource: str
+    group: str
+    decoder: RecordDecoder
+    parts: List[Tuple[Optional[int], Hashable, Callable[[Tuple], Tuple[float, ...]], Table]]
+    rows: Dict[Hashable, int]
+
+    def __init__(self, decoder: RecordDecoder, group: str,
+                 tables: Callable[[str, Tuple[str, ...]], Table]) -> None:
+        """Initialize from `decoder` (from the header sent by the host) with `tables` by group and metrics."""
+        self.hostname = decoder.hostname
+        self.resource = decoder.resource
+        self.group = group
+        self.decoder = decoder
+        self.parts = [(position, device, get, tables(group, metrics))
+                      for position, device, metrics, get in split_columns(decoder.columns, offset=1)]
+        self.rows = {}
+
+
+class Grouping:
+    """
+    Assign hosts to groups (e.g., rack or partition).
+
+    Either by `rules`, a list of (pattern, group) with glob-style patterns
+    checked in order, or by `pattern`, a regular expression whose first group
+    (or entire match) is the name of the group. Other hosts are in `default`.
+    """
+
+    rules: List[Tuple[str, str]]
+    pattern: Optional[re.Pattern] = None
+    default: str = 'other'
+
+    _cache: Dict[str, str]
+
+    def __init__(self, rules: List[Tuple[str, str]] = None, pattern: str = None,
+                 default: str = default) -> None:
+        """Initialize with `rules` or regular expression `pattern` (neither for no groups)."""
+        self.rules = rules or []
+        self.pattern = None if pattern is None else re.compile(pattern)
+        self.default = default
+        self._cache = {}
+
+    @classmethod
+    def from_file(cls, path: str, default: str = default) -> Grouping:
+        """Load rules from file with a pattern and group on each line ('#' for comments)."""
+        rules = []
+        with open(path, mode='r') as stream:
+            for number, line in enumerate(stream, start=1):
+                line = line.split('#', 1)[0].strip()
+                if not line:
+                    continue
+                fields = line.split()
+                if len(fields) != 2:
+                    raise RuntimeError(f'Expected PATTERN GROUP on line {number} of {path}')
+                rules.append((fields[0], fields[1]))
+        return cls(rules=rules, default=default)
+
+    @property
+    def enabled(self) -> bool:
+        """True if hosts are divided into groups."""
+        return bool(self.rules) or self.pattern is not None
+
+    def __call__(self, hostname: str) -> str:
+        """Group for `hostname`."""
+        if hostname not in self._cache:
+            self._cache[hostname] = self._find(hostname)
+        return self._cache[hostname]
+
+    def _find(self, hostname: str) -> str:
+        if not self.enabled:
+            return ALL_HOSTS
+        if self.pattern is not None:
+            match = self.pattern.search(hostname)
+            if not match:
+                return self.default
+            return match.group(1) if self.pattern.groups else match.group(0)
+        for pattern, group in self.rules:
+            if fnmatch.fnmatchcase(hostname, pattern):
+                return group
+        return self.default
+
+
+class Fleet:
+    """
+    Latest samples from all sources (see `ingest`) and rollups by group (see `rollup`).
+
+    Devices are stored in a `Table` for each group and set of metrics. A device
+    that has not been updated for `expire` seconds is released (e.g., the host
+    went down). Devices whose latest value of a metric exceeds its threshold in
+    `thresholds` are counted as hot.
+    """
+
+    window: int
+    expire: float
+    grouping: Grouping
+    thresholds: Dict[str, float]
+    stats: Optional[SelfStats] = None
+    received: int = 0
+
+    _sources: Dict[bytes, Source]
+    _tables: Dict[Tuple[str, Tuple[str, ...]], Table]
+
+    def __init__(self, window: int = 10, expire: float = 60, grouping: Grouping = None,
+                 thresholds: Dict[str, float] = None, stats: SelfStats = None) -> None:
+        """Initialize empty with `window` samples for each device."""
+        self.window = window
+        self.expire = expire
+        self.grouping = grouping or Grouping()
+        self.thresholds = thresholds or {}
+        self.stats = stats
+        self._sources = {}
+        self._tables = {}
+
+    def table(self, group: str, metrics: Tuple[str, ...]) -> Table:
+        """The table for devices with `metrics` in `group`."""
+        table = self._tables.get((group, metrics))
+        if table is None:
+            table = self._tables[group, metrics] = Table(metrics, self.window)
+        return table
+
+    def source(self, header: bytes) -> Source:
+        """The source for `header` (the same for every connection or datagram with this header)."""
+        source = self._sources.get(header)
+        if source is None:
+            decoder = RecordDecoder(header)
+            source = self._sources[header] = Source(decoder, self.grouping(decoder.hostname), self.table)
+        return source
+
+    def ingest(self, source: Source, payload: bytes) -> None:
+        """Store all records in `payload` from `source`."""
+        start = time.perf_counter_ns()
+        now = time.monotonic()
+        rows = source.rows
+        for values in source.decoder.decode(payload):
+            self.received += 1
+            for position, device, get, table in source.parts:
+                key = device if position is None else values[position]
+                row = rows.get(key)
+                if row is None:
+                    row = table.add(source.hostname, rows, key, now)
+                table.append(row, get(values), now)
+        if self.stats is not None:
+            self.stats.record('ingest', time.perf_counter_ns() - start)
+
+    def rollup(self) -> List[Tuple[str, str, int, int, float, float, int]]:
+        """Statistics for each group and metric (see `ROLLUP_COLUMNS`), sorted by group and metric."""
+        start = time.perf_counter_ns()
+        before = time.monotonic() - self.expire
+        groups: Dict[Tuple[str, str], list] = {}
+        for (group, metrics), table in self._tables.items():
+            table.expire(before)
+            if not table.devices:
+                continue
+            hosts, devices = table.hosts, table.devices
+            for column, metric in enumerate(metrics):
+                summary = table.summarize(column, self.thresholds.get(metric))
+                if summary is None:
+                    continue
+                total, count, largest, hot = summary
+                for name in ((group, ALL_HOSTS) if group != ALL_HOSTS else (ALL_HOSTS, )):
+                    entry = groups.get((name, metric))
+                    if entry is None:
+                        groups[name, metric] = [set(hosts), devices, total, count, largest, hot]
+                    else:
+                        entry[0].update(hosts)
+                        entry[1] += devices
+                        entry[2] += total
+                        entry[3] += count
+                        entry[4] = max(entry[4], largest)
+                        entry[5] += hot
+        rows = [(name, metric, len(hosts), devices, round(total / count, 3), round(largest, 3), hot)
+                for (name, metric), (hosts, devices, total, count, largest, hot) in sorted(groups.items())]
+        if self.stats is not None:
+            self.stats.record('rollup', time.perf_counter_ns() - start)
+        return rows
+
+
+class StreamProtocol(asyncio.Protocol):
+    """Frames from a single connection (TCP or Unix socket)."""
+
+    fleet: Fleet
+    source: Optional[Source] = None
+
+    def __init__(self, fleet: Fleet) -> None:
+        self.fleet = fleet
+        self._frames = FrameDecoder()
+
+    def data_received(self, data: bytes) -> None:
+        for kind, payload in self._frames.feed(data):
+            if kind == FRAME_HEADER:
+                self.source = self.fleet.source(payload)
+            elif kind == FRAME_RECORDS and self.source is not None:
+                self.fleet.ingest(self.source, payload)
+
+
+class DatagramProtocol(asyncio.DatagramProtocol):
+    """Frames from datagrams (each starts with a header)."""
+
+    fleet: Fleet
+
+    def __init__(self, fleet: Fleet) -> None:
+        self.fleet = fleet
+
+    def datagram_received(self, data: bytes, address: Any) -> None:
+        source = None
+        for kind, payload in FrameDecoder().feed(data):
+            if kind == FRAME_HEADER:
+                source = self.fleet.source(payload)
+            elif kind == FRAME_RECORDS and source is not None:
+                self.fleet.ingest(source, payload)
+
+
+async def listen(fleet: Fleet, address: str) -> asyncio.BaseTransport:
+    """Start receiving records on `address` (see `parse_address`) into `fleet`."""
+    loop = asyncio.get_running_loop()
+    protocol, target = parse_address(address)
+    if protocol == 'udp':
+        transport, _ = await loop.create_datagram_endpoint(lambda: DatagramProtocol(fleet), local_addr=target)
+        return transport
+    if protocol == 'unix':
+        remove_socket(target)  # NOTE: left behind by a previous run
+        return await loop.create_unix_server(lambda: StreamProtocol(fleet), target, backlog=socket.SOMAXCONN)
+    host, port = target
+    return await loop.create_server(lambda: StreamProtocol(fleet), host, port, reuse_address=True,
+                                    backlog=socket.SOMAXCONN)  # NOTE: many hosts connect at once
@@ -0,0 +1,28 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Deferred import of commands (only the selected command is imported)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Any
+
+# standard libs
+import importlib
+
+# public interface
+__all__ = ['load', ]
+
+
+def load(path: str) -> Any:
+    """Import object given by `path` (e.g., 'monitor.cli.cpu:CPUDevice')."""
+    module, name = path.split(':')
+    return getattr(importlib.import_module(module), name)
@@ -19,6 +19,7 @@ from typing import List, Callable
 import io
 import sys
 import socket
+import functools
 from datetime import datetime
 from dataclasses import dataclass
 
@@ -30,11 +31,20 @@ from cmdkit import logging as _cmdkit_logging
 from .. import __appname__
 
 # public interface
-__all__ = ['HOSTNAME', 'Logger', 'PLAIN_HANDLER', 'CSV_HANDLER', ]
+__all__ = ['get_hostname', 'Logger', 'PLAIN_HANDLER', 'CSV_HANDLER', ]
 
 
-# cache hostname
-HOSTNAME = socket.gethostname()
+@functools.lru_cache(maxsize=None)
+def get_hostname() -> str:
+    """Hostname of this machine (looked up on first use and cached)."""
+    return socket.gethostname()
+
+
+def __getattr__(name: str) -> str:
+    """Compute `HOSTNAME` on first access (not at import)."""
+    if name == 'HOSTNAME':
+        return get_hostname()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 LEVELS = levels.Level.from_names(['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'])  # noqa: typing is broken
@@ -68,6 +78,14 @@ class Logger(loggers.Logger):
         self.callbacks = {**self.callbacks, 'source': (lambda: f'{__appname__}.{name}')}
         return self
 
+    def write_at(self, timestamp: datetime, level: levels.Level, content: str) -> None:
+        """Publish message with an explicit `timestamp` (e.g., when a sample was started)."""
+        message = self.Message(level=level, content=content,
+                               **{**self.evaluate_callbacks(), 'timestamp': timestamp})
+        for handler in self.handlers:
+            if message.level >= handler.level:
+                handler.write(message)
+
     @property
     def handlers(self) -> List[handlers.Handler]:
         """Override of local handlers to global list."""
@@ -105,7 +123,7 @@ class PlainHandler(handlers.Handler):
 
     def format(self, msg: Message) -> str:
         timestamp = msg.timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        return f'{timestamp} {HOSTNAME} {msg.source} {msg.content}'
+        return f'{timestamp} {get_hostname()} {msg.source} {msg.content}'
 
 
 @dataclass
@@ -119,7 +137,7 @@ class CSVHandler(handlers.Handler):
         timestamp = msg.timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
         content = msg.content.replace('[','').replace('] ',',')
         source = msg.source.replace(f'{__appname__}.', '')
-        return f'{timestamp},{HOSTNAME},{source},{content}'
+        return f'{timestamp},{get_hostname()},{source},{content}'
 
 
 BASIC_HANDLER = BasicHandler()
@@ -0,0 +1,285 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""
+Send binary records over the network (TCP, UDP, or a Unix socket).
+
+Records are sent in frames: a 4-byte little-endian length followed by that many
+bytes, the first of which is the kind of frame. A header frame (`FRAME_HEADER`)
+has the same JSON as a file written by `BinaryWriter` and a records frame
+(`FRAME_RECORDS`) has any number of fixed-width records. The header is sent
+first on every connection (and in every datagram for UDP).
+"""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Tuple, Iterator, Union, Callable, Optional, Any
+
+# standard libs
+import os
+import json
+import stat
+import time
+import struct
+import socket
+import threading
+from collections import deque
+
+# internal libs
+from .logging import Logger, get_hostname
+from .output import BinaryWriter
+
+# public interface
+__all__ = ['NetworkWriter', 'FrameDecoder', 'RecordDecoder', 'parse_address', 'encode_frame',
+           'remove_socket', 'FRAME_HEADER', 'FRAME_RECORDS', 'report_error', ]
+
+
+FRAME_HEADER: bytes = b'H'
+FRAME_RECORDS: bytes = b'R'
+FRAME_LENGTH: struct.Struct = struct.Struct('<I')
+
+# NOTE: largest payload for a single UDP datagram
+MAX_DATAGRAM: int = 65507
+
+# NOTE: can be overridden without changing every command's options
+QUEUE_SIZE: int = int(os.getenv('MONITOR_PUSH_QUEUE', 1024))
+DROP_POLICY: str = os.getenv('MONITOR_PUSH_POLICY', 'oldest')
+
+
+Address = Union[Tuple[str, int], str]
+
+
+log = Logger.with_name('push')
+
+
+def parse_address(address: str) -> Tuple[str, Address]:
+    """Protocol and address from 'tcp://HOST:PORT', 'udp://HOST:PORT', or 'unix://PATH'."""
+    protocol, sep, location = address.partition('://')
+    if not sep or protocol not in ('tcp', 'udp', 'unix') or not location:
+        raise RuntimeError(f'Expected tcp://HOST:PORT, udp://HOST:PORT, or unix://PATH ({address})')
+    if protocol == 'unix':
+        return protocol, location
+    host, sep, port = location.rpartition(':')
+    if not sep or not port.isdigit():
+        raise RuntimeError(f'Missing port in address ({address})')
+    return protocol, (host.strip('[]') or 'localhost', int(port))
+
+
+def remove_socket(path: str) -> None:
+    """Remove socket left behind at `path` by a previous listener (RuntimeError if not a socket)."""
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f'Not a socket, refusing to remove: {path}')
+    os.remove(path)
+
+
+def encode_frame(kind: bytes, payload: bytes) -> bytes:
+    """Length-prefixed frame of `kind` with `payload`."""
+    return FRAME_LENGTH.pack(len(payload) + 1) + kind + payload
+
+
+class FrameDecoder:
+    """Split a byte stream into frames (data may arrive in pieces of any size)."""
+
+    _buffer: bytearray
+
+    def __init__(self) -> None:
+        """Start with an empty buffer."""
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> Iterator[Tuple[bytes, bytes]]:
+        """Kind and payload of each frame completed by `data`."""
+        self._buffer += data
+        start = 0
+        while len(self._buffer) - start >= FRAME_LENGTH.size:
+            size, = FRAME_LENGTH.unpack_from(self._buffer, start)
+            end = start + FRAME_LENGTH.size + size
+            if end > len(self._buffer):
+                break
+            yield bytes(self._buffer[start + 4:start + 5]), bytes(self._buffer[start + 5:end])
+            start = end
+        del self._buffer[:start]
+
+
+def report_error(writer: NetworkWriter, error: Exception, delay: float) -> None:
+    """Log a warning when sending fails."""
+    log.warning(f'{writer.address}: {error} (retry in {delay:.1f}s, {writer.dropped} batches dropped)')
+
+
+class NetworkWriter(BinaryWriter):
+    """
+    Binary records sent to `address` in batches by a background thread.
+
+    Each flush puts a batch of records on a bounded queue and returns immediately,
+    so a slow or unavailable receiver never blocks sampling. If the queue is full,
+    either the oldest batch or the new batch is dropped (`policy`) and counted.
+    After a failure the connection is retried with exponential backoff.
+    """
+
+    address: str
+    protocol: str
+    queue_size: int = QUEUE_SIZE
+    policy: str = DROP_POLICY
+    timeout: float = 5
+    backoff: Tuple[float, float] = (0.1, 30)  # NOTE: initial and maximum delay in seconds
+    on_error: Optional[Callable[[NetworkWriter, Exception, float], None]] = None
+    dropped: int = 0
+
+    _target: Address
+    _header: bytes
+    _chunk: int  # NOTE: bytes of records in each datagram (udp only)
+    _queue: deque
+    _ready: threading.Condition
+    _closing: threading.Event
+    _socket: Optional[socket.socket] = None
+    _thread: threading.Thread
+
+    def __init__(self, resource: str, columns: List[str], dtypes: List[str], address: str,
+                 flush_interval: float = BinaryWriter.flush_interval,
+                 queue_size: int = QUEUE_SIZE, policy: str = DROP_POLICY,
+                 on_error: Optional[Callable[[NetworkWriter, Exception, float], None]] = report_error) -> None:
+        """Initialize with `address` (see `parse_address`) and start sending thread."""
+        if policy not in ('oldest', 'newest'):
+            raise RuntimeError(f'Drop policy must be "oldest" or "newest" ({policy})')
+        super().__init__(resource, columns, dtypes, flush_interval=flush_interval)
+        self.address = address
+        self.protocol, self._target = parse_address(address)
+        self.queue_size = queue_size
+        self.policy = policy
+        self.on_error = on_error
+        self._header = encode_frame(FRAME_HEADER, json.dumps({
+            'hostname': get_hostname(), 'resource': resource,
+            'columns': columns, 'format': self.record.format}).encode())
+        if self.protocol == 'udp':
+            self._chunk = (MAX_DATAGRAM - len(self._header) - 5) // self.record.size * self.record.size
+            if self._chunk <= 0:
+                raise RuntimeError(f'Too many columns for udp ({len(columns)}), use tcp instead')
+        self._queue = deque()
+        self._ready = threading.Condition()
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='network-writer', daemon=True)
+        self._thread.start()
+
+    def write_header(self) -> None:
+        """The header is sent by the background thread on each connection."""
+
+    def flush(self) -> None:
+        """Put buffered records on the queue (dropping a batch if full)."""
+        if self._buffer:
+            batch = b''.join(self._buffer)
+            self._buffer.clear()
+            self._buffered = 0
+            with self._ready:
+                if len(self._queue) >= self.queue_size:
+                    self.dropped += 1
+                    if self.policy == 'newest':
+                        batch = None
+                    else:
+                        self._queue.popleft()
+                if batch is not None:
+                    self._queue.append(batch)
+                    self._ready.notify()
+        self._last_flush = time.monotonic()
+
+    def close(self, timeout: float = 5) -> None:
+        """Send remaining records (waiting at most `timeout` seconds) and disconnect."""
+        self.flush()
+        self._closing.set()
+        with self._ready:
+            self._ready.notify()
+        self._thread.join(timeout)
+        self._disconnect()
+
+    def _run(self) -> None:
+        """Send batches from the queue until closed."""
+        while True:
+            with self._ready:
+                while not self._queue and not self._closing.is_set():
+                    self._ready.wait()
+                if not self._queue:
+                    return
+                batch = self._queue.popleft()
+            self._send(batch)
+
+    def _send(self, batch: bytes) -> None:
+        """Send `batch`, reconnecting with exponential backoff until sent (or closing)."""
+        delay = self.backoff[0]
+        while True:
+            try:
+                if self._socket is None:
+                    self._connect()
+                if self.protocol == 'udp':
+                    for start in range(0, len(batch), self._chunk):
+                        chunk = batch[start:start + self._chunk]
+                        self._socket.send(self._header + encode_frame(FRAME_RECORDS, chunk))
+                else:
+                    self._socket.sendall(encode_frame(FRAME_RECORDS, batch))
+                return
+            except OSError as error:
+                self._disconnect()
+                if self._closing.is_set():
+                    self.dropped += 1
+                    return
+                if self.on_error is not None:
+                    self.on_error(self, error, delay)
+                self._closing.wait(delay)
+                delay = min(2 * delay, self.backoff[1])
+
+    def _connect(self) -> None:
+        """Open socket (and send header for stream connections)."""
+        family = socket.AF_UNIX if self.protocol == 'unix' else socket.AF_INET
+        if self.protocol != 'unix' and ':' in self._target[0]:
+            family = socket.AF_INET6
+        kind = socket.SOCK_DGRAM if self.protocol == 'udp' else socket.SOCK_STREAM
+        sock = socket.socket(family, kind)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self._target)
+            if self.protocol != 'udp':
+                sock.sendall(self._header)
+        except OSError:
+            sock.close()
+            raise
+        self._socket = sock
+
+    def _disconnect(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+class RecordDecoder:
+    """Decode records frames given the header frame from a sender."""
+
+    hostname: str
+    resource: str
+    columns: List[str]
+    record: struct.Struct
+
+    def __init__(self, header: bytes) -> None:
+        """Initialize from JSON `header` (payload of a header frame)."""
+        data: Dict[str, Any] = json.loads(header.decode())
+        self.hostname = data['hostname']
+        self.resource = data['resource']
+        self.columns = data['columns']
+        self.record = struct.Struct(data['format'])
+
+    @property
+    def dtypes(self) -> str:
+        """Format codes for each column."""
+        return self.record.format[2:]
+
+    def decode(self, payload: bytes) -> Iterator[Tuple[int, ...]]:
+        """Records (timestamp in milliseconds, values...) in `payload`."""
+        return self.record.iter_unpack(payload[:len(payload) - len(payload) % self.record.size])
@@ -0,0 +1,343 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Record writers for sampled values (one row per sample)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Any, BinaryIO, Optional, Iterator, Tuple, TYPE_CHECKING
+
+# standard libs
+import sys
+import json
+import time
+import struct
+from abc import ABC, abstractmethod
+from datetime import datetime
+
+# internal libs
+from .logging import Logger, get_hostname
+
+if TYPE_CHECKING:
+    from .selfstats import SelfStats
+
+# public interface
+__all__ = ['RecordWriter', 'PlainWriter', 'BufferedWriter', 'CSVWriter', 'BinaryWriter',
+           'BinaryReader', 'format_float32', 'get_writer', ]
+
+
+# NOTE: identifies files written by `BinaryWriter` (and format version)
+BINARY_MAGIC: bytes = b'RMON\x01'
+
+
+class RecordWriter(ABC):
+    """
+    Write rows of `columns` for a named `resource` (e.g., 'cpu.percent').
+
+    Output is only guaranteed to be written after `commit` (called once
+    per sample) or `close`.
+    """
+
+    resource: str
+    columns: List[str]
+    missing: Any = ''  # NOTE: placeholder for values not collected
+
+    def __init__(self, resource: str, columns: List[str]) -> None:
+        """Initialize with `resource` name and value `columns`."""
+        self.resource = resource
+        self.columns = columns
+
+    @abstractmethod
+    def write(self, *values: Any) -> None:
+        """Write a single row of `values` (current time)."""
+
+    @abstractmethod
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        """Write a single row of `values` with an explicit `timestamp`."""
+
+    def write_header(self) -> None:
+        """Write header (if applicable for the format)."""
+
+    def commit(self) -> None:
+        """Signal the end of a sample."""
+
+    def close(self) -> None:
+        """Flush and release any resources."""
+
+
+class PlainWriter(RecordWriter):
+    """Messages in syslog format (via `logger`, see `PlainHandler`)."""
+
+    logger: Logger
+
+    def __init__(self, resource: str, columns: List[str], logger: Logger) -> None:
+        """Initialize with `logger` to publish messages."""
+        super().__init__(resource, columns)
+        self.logger = logger
+
+    def format(self, *values: Any) -> str:
+        """Format message content, e.g., '[0] 7.5' for indexed values."""
+        if self.columns[0].endswith('_id'):
+            return f'[{values[0]}] ' + ','.join(map(str, values[1:]))
+        if len(self.columns) == 1:
+            return str(values[0])
+        return ' '.join(f'{name}={value}' for name, value in zip(self.columns, values))
+
+    def write(self, *values: Any) -> None:
+        self.logger.debug(self.format(*values))
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        self.logger.write_at(timestamp, self.logger.levels[0], self.format(*values))
+
+
+class BufferedWriter(RecordWriter, ABC):
+    """
+    Encoded rows are collected in a buffer which is written to `stream` on
+    `commit` after `flush_interval` seconds or once it exceeds `buffer_size` bytes.
+    """
+
+    stream: BinaryIO
+    buffer_size: int = 65536
+    flush_interval: float = 0
+
+    _buffer: List[bytes]
+    _buffered: int = 0
+    _last_flush: float = 0
+
+    def __init__(self, resource: str, columns: List[str], stream: BinaryIO = None,
+                 buffer_size: int = buffer_size, flush_interval: float = flush_interval) -> None:
+        """Initialize with output `stream` (default <stdout>) and buffering parameters."""
+        super().__init__(resource, columns)
+        self.stream = stream or sys.stdout.buffer
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def _append(self, data: bytes) -> None:
+        self._buffer.append(data)
+        self._buffered += len(data)
+
+    def commit(self) -> None:
+        """Flush if the buffer is full or `flush_interval` has passed."""
+        if self._buffered >= self.buffer_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered rows to the stream."""
+        if self._buffer:
+            self.stream.write(b''.join(self._buffer))
+            self.stream.flush()
+            self._buffer.clear()
+            self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+
+
+class CSVWriter(BufferedWriter):
+    """
+    Messages in CSV format (byte-identical to `CSVHandler`).
+
+    Rows are formatted directly from the values. The timestamp prefix is only
+    formatted once per second (only the milliseconds change).
+    """
+
+    hostname: str
+
+    _second: Optional[int] = None
+    _prefix: str = ''
+    _suffix: str
+
+    def __init__(self, resource: str, columns: List[str], stream: BinaryIO = None,
+                 buffer_size: int = BufferedWriter.buffer_size,
+                 flush_interval: float = BufferedWriter.flush_interval,
+                 hostname: str = None) -> None:
+        """Initialize with output `stream` (default <stdout>) and buffering parameters."""
+        super().__init__(resource, columns, stream=stream, buffer_size=buffer_size,
+                         flush_interval=flush_interval)
+        self.hostname = hostname = hostname or get_hostname()
+        self._suffix = f',{hostname},{resource},'
+
+    def timestamp(self, ns: int) -> str:
+        """Formatted local time from epoch nanoseconds `ns` (millisecond precision)."""
+        second, ms = divmod(ns // 1_000_000, 1000)
+        if second != self._second:
+            self._second = second
+            self._prefix = datetime.fromtimestamp(second).strftime('%Y-%m-%d %H:%M:%S.')
+        return f'{self._prefix}{ms:03d}'
+
+    def write(self, *values: Any) -> None:
+        self.write_ns(time.time_ns(), *values)
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        self._write_row(self.timestamp(round(timestamp.timestamp() * 1_000_000) * 1000), values)
+
+    def write_ns(self, ns: int, *values: Any) -> None:
+        """Write a single row of `values` with timestamp in epoch nanoseconds."""
+        self._write_row(self.timestamp(ns), values)
+
+    def _write_row(self, timestamp: str, values: Any) -> None:
+        self._append((timestamp + self._suffix + ','.join(map(str, values)) + '\n').encode())
+
+    def write_header(self) -> None:
+        self._append(('timestamp,hostname,resource,' + ','.join(self.columns) + '\n').encode())
+
+
+class BinaryWriter(BufferedWriter):
+    """
+    Fixed-width little-endian records with a self-describing header.
+
+    The header is the magic bytes `BINARY_MAGIC`, a 4-byte length, and
+    that many bytes of JSON with the hostname, resource, column names, and
+    `struct` format of each record. Each record is the timestamp (int64
+    milliseconds since epoch) followed by one value per column.
+    """
+
+    dtypes: List[str]
+    record: struct.Struct
+    missing: Any = float('nan')
+
+    def __init__(self, resource: str, columns: List[str], dtypes: List[str], stream: BinaryIO = None,
+                 buffer_size: int = BufferedWriter.buffer_size,
+                 flush_interval: float = BufferedWriter.flush_interval) -> None:
+        """Initialize with `struct` format codes for each column (e.g., 'H' or 'f')."""
+        super().__init__(resource, columns, stream=stream, buffer_size=buffer_size,
+                         flush_interval=flush_interval)
+        self.dtypes = dtypes
+        self.record = struct.Struct('<q' + ''.join(dtypes))
+
+    def write(self, *values: Any) -> None:
+        self._append(self.record.pack(time.time_ns() // 1_000_000, *values))
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        self._append(self.record.pack(round(timestamp.timestamp() * 1000), *values))
+
+    def write_header(self) -> None:
+        header = json.dumps({'hostname': get_hostname(), 'resource': self.resource,
+                             'columns': self.columns, 'format': self.record.format}).encode()
+        self._append(BINARY_MAGIC + struct.pack('<I', len(header)) + header)
+
+
+class BinaryReader:
+    """Read files written by `BinaryWriter`."""
+
+    stream: BinaryIO
+    hostname: str
+    resource: str
+    columns: List[str]
+    record: struct.Struct
+
+    def __init__(self, stream: BinaryIO) -> None:
+        """Read header from `stream`."""
+        self.stream = stream
+        magic = stream.read(len(BINARY_MAGIC))
+        if magic != BINARY_MAGIC:
+            raise RuntimeError('Not a binary monitor file (bad header)')
+        size, = struct.unpack('<I', stream.read(4))
+        header = json.loads(stream.read(size).decode())
+        self.hostname = header['hostname']
+        self.resource = header['resource']
+        self.columns = header['columns']
+        self.record = struct.Struct(header['format'])
+
+    @property
+    def dtypes(self) -> str:
+        """Format codes for each column."""
+        return self.record.format[2:]
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        """Iterate over records (timestamp in milliseconds, values...)."""
+        while True:
+            data = self.stream.read(self.record.size * 4096)
+            remainder = len(data) % self.record.size  # NOTE: only if file is truncated
+            if remainder:
+                data = data[:-remainder]
+            if not data:
+                return
+            yield from self.record.iter_unpack(data)
+
+
+def format_float32(value: float) -> str:
+    """Shortest representation that reads back to the same 32-bit `value` (empty if missing)."""
+    if value != value:
+        return ''  # NOTE: NaN marks a missing value (as with `CSVWriter.missing`)
+    packed = struct.pack('<f', value)
+    for precision in range(1, 10):
+        text = f'{value:.{precision}g}'
+        if struct.pack('<f', float(text)) == packed:
+            return repr(float(text))
+    return repr(value)
+
+
+def default_dtype(column: str) -> str:
+    """The `struct` format code for `column` ('H' for identifiers, otherwise 'f')."""
+    return 'H' if column.endswith('_id') else 'f'
+
+
+def get_writer(resource: str, columns: List[str], logger: Logger, fmt: str = 'plain',
+               no_header: bool = False, flush_interval: float = 0,
+               dtypes: List[str] = None, path: str = None, window: int = 0,
+               stats: SelfStats = None, address: str = None, store: str = None,
+               alerts: str = None) -> RecordWriter:
+    """
+    Create writer for the selected format, `fmt` (and write header).
+    The 'parquet' format writes to `path` and 'push' sends to `address`.
+    If `window` is given, write statistics for every `window` samples instead.
+    If `stats` is given, time taken to write each sample is added to it.
+    If `store` is given, every sample is also kept in the store at that directory
+    (empty for the default, see `STORE_DIR`).
+    If `alerts` is given, the rules in that file are evaluated on every sample.
+    """
+    if stats is not None:
+        from .selfstats import TimedWriter  # NOTE: avoid circular import
+        return TimedWriter(get_writer(resource, columns, logger, fmt=fmt, no_header=no_header,
+                                      flush_interval=flush_interval, dtypes=dtypes, path=path,
+                                      window=window, address=address, store=store, alerts=alerts), stats)
+    if alerts is not None:
+        from .alert import AlertWriter, load_rules, get_alert_log  # NOTE: avoid circular import
+        rules = load_rules(alerts)
+        return AlertWriter(get_writer(resource, columns, logger, fmt=fmt, no_header=no_header,
+                                      flush_interval=flush_interval, dtypes=dtypes, path=path,
+                                      window=window, address=address, store=store),
+                           rules, get_alert_log(resource))
+    if store is not None:
+        from .store import Store, StoreWriter, STORE_DIR  # NOTE: avoid circular import
+        return StoreWriter(get_writer(resource, columns, logger, fmt=fmt, no_header=no_header,
+                                      flush_interval=flush_interval, dtypes=dtypes, path=path,
+                                      window=window, address=address),
+                           Store(store or STORE_DIR, resource, columns))
+    if window:
+        from .aggregate import AggregateWriter  # NOTE: avoid circular import
+        writer = get_writer(resource, AggregateWriter.expand_columns(columns), logger, fmt=fmt,
+                            no_header=no_header, flush_interval=flush_interval, path=path,
+                            dtypes=dtypes and AggregateWriter.expand_dtypes(columns, dtypes),
+                            address=address)
+        return AggregateWriter(resource, columns, writer, window)
+    if fmt == 'plain':
+        return PlainWriter(resource, columns, logger)
+    dtypes = dtypes or [default_dtype(column) for column in columns]
+    if fmt == 'parquet':
+        from .parquet import ParquetWriter  # NOTE: optional dependency
+        return ParquetWriter(resource, columns, dtypes, path, flush_interval=flush_interval)
+    if fmt == 'push':
+        from .network import NetworkWriter  # NOTE: avoid circular import
+        return NetworkWriter(resource, columns, dtypes, address, flush_interval=flush_interval)
+    if fmt == 'csv':
+        writer = CSVWriter(resource, columns, flush_interval=flush_interval)
+    elif fmt == 'binary':
+        writer = BinaryWriter(resource, columns, dtypes, flush_interval=flush_interval)
+    else:
+        raise RuntimeError(f'Unknown output format ({fmt})')
+    if not no_header:
+        writer.write_header()
+    return writer
@@ -0,0 +1,181 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Columnar Parquet output (requires `pyarrow`)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Sequence, Any, Optional
+
+# standard libs
+import os
+import time
+from array import array
+from datetime import datetime
+
+# internal libs
+from .logging import get_hostname
+from .output import RecordWriter
+
+# optional dependency
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+# public interface
+__all__ = ['ParquetWriter', ]
+
+
+# NOTE: `struct` format codes (see `BinaryWriter`) to array/arrow types
+ARROW_TYPES = {'H': 'uint16', 'I': 'uint32', 'f': 'float32', 'd': 'float64', 'Q': 'uint64'}
+
+
+class ParquetWriter(RecordWriter):
+    """
+    Accumulate values in columnar buffers and write Parquet row groups.
+
+    A row group is written on `commit` once `row_group_size` rows have
+    accumulated (or after `flush_interval` seconds if non-zero). A new file
+    is started after `rollover` rows, named by inserting a sequence number
+    before the extension of `path` (e.g., data.parquet -> data-0000.parquet).
+    The timestamp is stored as int64 nanoseconds since epoch (UTC). A missing
+    value that the column cannot hold (e.g., NaN or '' in an integer column)
+    is stored as null.
+    """
+
+    path: str
+    dtypes: List[str]
+    row_group_size: int = 65536
+    flush_interval: float = 0
+    rollover: int = 10_000_000
+
+    missing: Any = float('nan')
+
+    _schema: pyarrow.Schema
+    _timestamps: array
+    _values: List[array]
+    _missing: List[List[int]]  # NOTE: rows with a null value in each column
+    _file: Optional[pyarrow.parquet.ParquetWriter] = None
+    _file_count: int = 0
+    _file_rows: int = 0
+    _last_flush: float = 0
+
+    def __init__(self, resource: str, columns: List[str], dtypes: List[str], path: str,
+                 row_group_size: int = row_group_size, flush_interval: float = flush_interval,
+                 rollover: int = rollover) -> None:
+        """Initialize with output `path` and `struct` format codes for each column."""
+        if pyarrow is None:
+            raise RuntimeError('Parquet output requires pyarrow (pip install resource-monitor[parquet])')
+        super().__init__(resource, columns)
+        self.path = path
+        self.dtypes = dtypes
+        self.row_group_size = row_group_size
+        self.flush_interval = flush_interval
+        self.rollover = rollover
+        self._schema = pyarrow.schema(
+            [('timestamp', pyarrow.timestamp('ns', tz='UTC')),
+             ('hostname', pyarrow.dictionary(pyarrow.int8(), pyarrow.string())),
+             ('resource', pyarrow.dictionary(pyarrow.int8(), pyarrow.string()))] +
+            [(name, getattr(pyarrow, ARROW_TYPES[dtype])()) for name, dtype in zip(columns, dtypes)])
+        self._reset()
+        self._last_flush = time.monotonic()
+
+    def _reset(self) -> None:
+        self._timestamps = array('q')
+        self._values = [array(dtype) for dtype in self.dtypes]
+        self._missing = [[] for _ in self.dtypes]
+
+    def write(self, *values: Any) -> None:
+        self._write_row(time.time_ns(), values)
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        self._write_row(round(timestamp.timestamp() * 1_000_000) * 1000, values)
+
+    def _write_row(self, ns: int, values: Any) -> None:
+        self._timestamps.append(ns)
+        try:
+            for column, value in zip(self._values, values):
+                column.append(value)
+        except TypeError:
+            self._write_row_missing(values)
+
+    def _write_row_missing(self, values: Any) -> None:
+        """Finish the current row, with null for any value the column cannot hold."""
+        row = len(self._timestamps) - 1
+        for column, missing, value in zip(self._values, self._missing, values):
+            if len(column) > row:
+                continue  # NOTE: already appended
+            try:
+                column.append(value)
+            except TypeError:
+                column.append(0)
+                missing.append(row)
+
+    def commit(self) -> None:
+        """Write a row group if enough rows have accumulated (or interval has passed)."""
+        if len(self._timestamps) >= self.row_group_size or (
+                self.flush_interval and time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write accumulated rows as a row group."""
+        self._last_flush = time.monotonic()
+        size = len(self._timestamps)
+        if not size:
+            return
+        columns = [self._to_arrow(self._timestamps, pyarrow.timestamp('ns', tz='UTC')),
+                   pyarrow.DictionaryArray.from_arrays(pyarrow.array([0] * size, pyarrow.int8()),
+                                                       pyarrow.array([get_hostname()])),
+                   pyarrow.DictionaryArray.from_arrays(pyarrow.array([0] * size, pyarrow.int8()),
+                                                       pyarrow.array([self.resource]))]
+        for values, missing, dtype in zip(self._values, self._missing, self.dtypes):
+            columns.append(self._to_arrow(values, getattr(pyarrow, ARROW_TYPES[dtype])(), missing))
+        table = pyarrow.Table.from_arrays(columns, schema=self._schema)
+        if self._file is None:
+            self._file = pyarrow.parquet.ParquetWriter(self.next_path(), self._schema)
+        self._file.write_table(table, row_group_size=size)
+        self._file_rows += size
+        self._reset()
+        if self._file_rows >= self.rollover:
+            self._close_file()
+
+    @staticmethod
+    def _to_arrow(values: array, dtype: pyarrow.DataType, missing: Sequence[int] = ()) -> pyarrow.Array:
+        """Zero-copy conversion from `values` to arrow array of `dtype` (null at rows in `missing`)."""
+        validity = None
+        if missing:
+            bitmap = bytearray(b'\xff' * ((len(values) + 7) // 8))
+            for row in missing:
+                bitmap[row >> 3] &= ~(1 << (row & 7)) & 0xff
+            validity = pyarrow.py_buffer(bitmap)
+        return pyarrow.Array.from_buffers(dtype, len(values), [validity, pyarrow.py_buffer(values)],
+                                          null_count=len(missing))
+
+    def next_path(self) -> str:
+        """Path for the next file (sequence number inserted before extension, skipping existing)."""
+        base, ext = os.path.splitext(self.path)
+        while True:
+            path = f'{base}-{self._file_count:04d}{ext or ".parquet"}'
+            self._file_count += 1
+            if not os.path.exists(path):
+                return path
+
+    def _close_file(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._file_rows = 0
+
+    def close(self) -> None:
+        self.flush()
+        self._close_file()
@@ -0,0 +1,120 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Drift-free sampling schedule on monotonic deadlines."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import Iterator, AsyncIterator, Callable, Optional, TYPE_CHECKING
+
+# standard libs
+import time
+import math
+
+# internal libs
+from .logging import Logger
+
+if TYPE_CHECKING:
+    from .selfstats import SelfStats
+
+# public interface
+__all__ = ['Scheduler', 'report_overrun', ]
+
+
+log = Logger.with_name('schedule')
+
+
+def report_overrun(scheduler: Scheduler, delay: float, skipped: int) -> None:
+    """Log a warning for an overrun tick."""
+    log.warning(f'{scheduler.name}: sample late by {delay:.3f}s ({skipped} skipped)')
+
+
+class Scheduler:
+    """
+    Iterate on fixed deadlines every `interval` seconds.
+
+    Deadlines are computed on `time.monotonic` from the start (not from the end
+    of the previous sample) so the time taken to collect does not accumulate.
+    If a deadline was already missed by more than a full interval, those ticks
+    are skipped (and counted) rather than sampled in a burst. Every late tick
+    is counted as an overrun and reported with `on_overrun`.
+
+    If `align` is True, the first deadline is placed on the next wall-clock
+    multiple of `interval` (e.g., on the second) so that samples taken on
+    many machines (with synchronized clocks) line up.
+    """
+
+    name: str
+    interval: float
+    align: bool = False
+    on_overrun: Optional[Callable[[Scheduler, float, int], None]] = None
+    stats: Optional[SelfStats] = None
+
+    ticks: int = 0
+    overruns: int = 0
+    skipped: int = 0
+    _deadline: float = 0
+
+    def __init__(self, interval: float, align: bool = False, name: str = 'monitor',
+                 on_overrun: Optional[Callable[[Scheduler, float, int], None]] = report_overrun,
+                 stats: SelfStats = None) -> None:
+        """Initialize with sampling `interval` in seconds (time taken by each tick is added to `stats`)."""
+        if interval <= 0:
+            raise RuntimeError(f'Sample rate must be positive ({interval})')
+        self.interval = interval
+        self.align = align
+        self.name = name
+        self.on_overrun = on_overrun
+        self.stats = stats
+
+    def first_deadline(self) -> float:
+        """Initial deadline (monotonic), one interval from now or next aligned boundary."""
+        now = time.monotonic()
+        if not self.align:
+            return now + self.interval
+        return now + (self.interval - time.time() % self.interval)
+
+    def __iter__(self) -> Iterator[int]:
+        """Sleep until each deadline and yield the tick count."""
+        self._deadline = self.first_deadline()
+        while True:
+            time.sleep(self.wait_time())
+            self.ticks += 1
+            start = time.perf_counter_ns()
+            yield self.ticks
+            if self.stats is not None:
+                self.stats.end_tick(self, time.perf_counter_ns() - start)
+            self._deadline += self.interval
+
+    async def __aiter__(self) -> AsyncIterator[int]:
+        """Sleep (asynchronously) until each deadline and yield the tick count."""
+        import asyncio  # NOTE: deferred, only needed by asynchronous callers
+        self._deadline = self.first_deadline()
+        while True:
+            await asyncio.sleep(self.wait_time())
+            self.ticks += 1
+            yield self.ticks
+            if self.stats is not None:
+                self.stats.end_tick(self)  # NOTE: collection is timed by `Engine`
+            self._deadline += self.interval
+
+    def wait_time(self) -> float:
+        """Seconds until the next deadline (zero if late, skipping missed ticks)."""
+        delay = time.monotonic() - self._deadline
+        if delay < 0:
+            return -delay
+        skipped = math.floor(delay / self.interval)
+        self._deadline += skipped * self.interval
+        self.skipped += skipped
+        self.overruns += 1
+        if self.on_overrun is not None:
+            self.on_overrun(self, delay, skipped)
+        return 0
@@ -0,0 +1,220 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Overhead of the monitor itself (collection latency, write time, CPU, and memory)."""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+
+# standard libs
+import os
+import sys
+import time
+from array import array
+from datetime import datetime
+
+# internal libs
+from .output import RecordWriter, CSVWriter
+
+if TYPE_CHECKING:
+    from .schedule import Scheduler
+
+# public interface
+__all__ = ['Histogram', 'SelfStats', 'TimedWriter', 'get_self_stats', 'STAGES', 'STATISTICS', ]
+
+
+# NOTE: statistics are reported (and histograms reset) this often (in seconds)
+REPORT_INTERVAL: float = float(os.getenv('MONITOR_SELF_STATS_INTERVAL', 60))
+
+# NOTE: stages timed for every command ('monitor all' adds one for each provider)
+STAGES = ['collect', 'write']
+
+# NOTE: order of columns in output (for each stage, in microseconds)
+STATISTICS = ['mean', 'p99', 'max']
+
+
+class Histogram:
+    """
+    Counts of durations in nanoseconds in fixed power-of-two buckets.
+
+    Recording is a single increment (no allocation) and quantiles are
+    approximate (upper bound of the bucket, at most a factor of two).
+    """
+
+    counts: array
+    count: int = 0
+    total: int = 0
+    max: int = 0
+
+    def __init__(self) -> None:
+        """Allocate buckets (one for each bit length of a 64-bit duration)."""
+        self.counts = array('Q', bytes(8 * 65))
+
+    def record(self, ns: int) -> None:
+        """Add a single duration `ns` (in nanoseconds)."""
+        ns = max(0, ns)
+        self.counts[ns.bit_length()] += 1
+        self.count += 1
+        self.total += ns
+        self.max = max(self.max, ns)
+
+    @property
+    def mean(self) -> float:
+        """Average duration (NaN if empty)."""
+        return self.total / self.count if self.count else float('nan')
+
+    def quantile(self, q: float) -> float:
+        """Approximate duration below which `q` of all durations fall (NaN if empty)."""
+        if not self.count:
+            return float('nan')
+        rank, seen = q * self.count, 0
+        for bits, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(2**bits - 1, self.max)
+        return self.max
+
+    def reset(self) -> None:
+        """Clear all counts."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = self.total = self.max = 0
+
+
+class SelfStats:
+    """
+    Time spent in each stage of the sampling loop, the number of late and skipped
+    samples, and CPU and memory usage of the monitor (and its subprocesses).
+    A single row is written every `interval` seconds.
+    """
+
+    stages: Dict[str, Histogram]
+    writer: CSVWriter
+    interval: float
+    scheduler: Optional[Scheduler] = None  # NOTE: set on first tick (for sample counts)
+
+    _tick_write: int = 0
+    _last_time: float
+    _last_times: os.times_result
+    _last_counts: List[int]
+
+    def __init__(self, writer: CSVWriter, stages: List[str] = None, interval: float = REPORT_INTERVAL) -> None:
+        """Initialize with `writer` for the columns of `stages` (see `columns`)."""
+        self.stages = {name: Histogram() for name in stages or STAGES}
+        self.writer = writer
+        self.interval = interval
+        self._last_time, self._last_times, self._last_counts = time.monotonic(), os.times(), [0, 0, 0]
+
+    @staticmethod
+    def columns(stages: List[str]) -> List[str]:
+        """Output columns for `stages`."""
+        return (['samples', 'overruns', 'skipped'] +
+                [f"{stage.replace('.', '_')}_{stat}_us" for stage in stages for stat in STATISTICS] +
+                ['cpu_percent', 'subprocess_cpu_percent', 'memory_rss'])
+
+    def record(self, stage: str, ns: int) -> None:
+        """Add duration `ns` for `stage`."""
+        self.stages[stage].record(ns)
+
+    def record_write(self, ns: int) -> None:
+        """Add duration `ns` to write a sample (subtracted from the collection time for the tick)."""
+        self.stages['write'].record(ns)
+        self._tick_write += ns
+
+    def end_tick(self, scheduler: Scheduler, ns: Optional[int] = None) -> None:
+        """Record collection time (given `ns` for the whole tick) and report if due."""
+        self.scheduler = scheduler
+        if ns is not None:
+            self.stages['collect'].record(ns - self._tick_write)
+        self._tick_write = 0
+        if time.monotonic() - self._last_time >= self.interval:
+            self.report()
+
+    def report(self) -> None:
+        """Write a row of statistics since the previous report and reset."""
+        now, times = time.monotonic(), os.times()
+        elapsed = max(now - self._last_time, 1e-9)
+        scheduler = self.scheduler
+        counts = [0, 0, 0] if scheduler is None else [scheduler.ticks, scheduler.overruns, scheduler.skipped]
+        values = [new - old for new, old in zip(counts, self._last_counts)]
+        for histogram in self.stages.values():
+            values.extend(round(value / 1000, 1)
+                          for value in (histogram.mean, histogram.quantile(0.99), histogram.max))
+            histogram.reset()
+        cpu = (times.user + times.system) - (self._last_times.user + self._last_times.system)
+        children = ((times.children_user + times.children_system) -
+                    (self._last_times.children_user + self._last_times.children_system))
+        values.extend([round(100 * cpu / elapsed, 2), round(100 * children / elapsed, 2), self.get_rss()])
+        self.writer.write(*values)
+        self.writer.commit()
+        self._last_time, self._last_times, self._last_counts = now, times, counts
+
+    @staticmethod
+    def get_rss() -> int:
+        """Resident memory of this process in bytes."""
+        import psutil  # NOTE: deferred, only needed when reporting
+        return psutil.Process().memory_info().rss
+
+    def close(self) -> None:
+        """Write final report and close output."""
+        self.report()
+        self.writer.close()
+        if self.writer.stream not in (sys.stdout.buffer, sys.stderr.buffer):
+            self.writer.stream.close()
+
+
+def get_self_stats(path: Optional[str], stages: List[str] = None,
+                   interval: float = REPORT_INTERVAL) -> Optional[SelfStats]:
+    """New instance writing CSV to `path` ('-' for <stderr>), None if no `path`."""
+    if path is None:
+        return None
+    stages = stages or STAGES
+    stream = sys.stderr.buffer if path == '-' else open(path, mode='wb')
+    writer = CSVWriter('self', SelfStats.columns(stages), stream=stream)
+    writer.write_header()
+    return SelfStats(writer, stages, interval=interval)
+
+
+class TimedWriter(RecordWriter):
+    """Record time spent by `writer` (formatting and writing) for each sample in `stats`."""
+
+    writer: RecordWriter
+    stats: SelfStats
+
+    _elapsed: int = 0
+
+    def __init__(self, writer: RecordWriter, stats: SelfStats) -> None:
+        """Wrap `writer`."""
+        super().__init__(writer.resource, writer.columns)
+        self.writer = writer
+        self.stats = stats
+        self.missing = writer.missing
+
+    def write(self, *values: Any) -> None:
+        start = time.perf_counter_ns()
+        self.writer.write(*values)
+        self._elapsed += time.perf_counter_ns() - start
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        start = time.perf_counter_ns()
+        self.writer.write_at(timestamp, *values)
+        self._elapsed += time.perf_counter_ns() - start
+
+    def commit(self) -> None:
+        start = time.perf_counter_ns()
+        self.writer.commit()
+        self.stats.record_write(self._elapsed + time.perf_counter_ns() - start)
+        self._elapsed = 0
+
+    def close(self) -> None:
+        self.writer.close()
+        self.stats.close()
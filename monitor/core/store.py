@@ -0,0 +1,454 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""
+Local time-series store with downsampling tiers (see `monitor query`).
+
+Samples are summarized into buckets for each tier (see `TIERS`) and written
+to fixed-size segment files, one series (a column, and identifier if any) per
+directory: STORE_DIR/<resource>/<series>/<tier>-<start>.seg. A segment has a
+small header and fixed-width records (start of bucket in milliseconds since
+epoch, mean, minimum, maximum, and number of samples) in time order, and is
+accessed with `mmap` so that reading a range never loads whole files. Each tier of a resource is
+limited to its share of `STORE_SIZE` by removing the oldest segments.
+"""
+
+
+# type annotations
+from __future__ import annotations
+from typing import List, Dict, Tuple, Iterator, Optional, Any
+
+# standard libs
+import os
+import re
+import sys
+import mmap
+import time
+import heapq
+import struct
+from datetime import datetime
+from urllib.parse import quote, unquote
+
+# internal libs
+from .output import RecordWriter
+
+# public interface
+__all__ = ['Store', 'StoreWriter', 'Series', 'TIERS', 'STORE_DIR', 'STORE_SIZE',
+           'parse_size', 'read_segment', 'last_record', 'query', 'list_series', ]
+
+
+def parse_size(value: str) -> int:
+    """Number of bytes from `value` with optional suffix (e.g., '512M' or '2G')."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([KMGT]?)i?B?\s*', str(value), re.IGNORECASE)
+    if not match:
+        raise RuntimeError(f'Expected size like 512M or 2G ({value})')
+    number, suffix = match.groups()
+    return int(float(number) * 1024 ** ' KMGT'.index(suffix.upper() or ' '))
+
+
+# NOTE: the default location and size limit can be overridden for every command at once
+STORE_DIR: str = os.getenv('MONITOR_STORE_DIR',
+                           os.path.join(os.getenv('XDG_DATA_HOME', os.path.expanduser('~/.local/share')),
+                                        'monitor', 'store'))
+STORE_SIZE: int = parse_size(os.getenv('MONITOR_STORE_SIZE', '256M'))
+FLUSH_INTERVAL: float = float(os.getenv('MONITOR_STORE_FLUSH', 5))
+
+# NOTE: name, bucket width in seconds, and share of the size limit
+TIERS: List[Tuple[str, int, float]] = [
+    ('1s', 1, 0.80),
+    ('1m', 60, 0.15),
+    ('1h', 3600, 0.05),
+]
+
+SEGMENT_SIZE = 65536
+SEGMENT_MAGIC = b'MONSEG01'
+HEADER = struct.Struct('<8sIII')  # NOTE: magic, bucket width, record size, record count
+HEADER_SIZE = 64
+RECORD = struct.Struct('<qfffI')
+CAPACITY = (SEGMENT_SIZE - HEADER_SIZE) // RECORD.size
+
+
+def segment_name(tier: str, start: int) -> str:
+    """File name for segment of `tier` beginning with bucket `start` (milliseconds)."""
+    return f'{tier}-{start:015d}.seg'
+
+
+def parse_segment_name(name: str) -> Optional[Tuple[str, int]]:
+    """Tier and start from `name` (None if not a segment)."""
+    match = re.fullmatch(r'(\w+)-(\d+)\.seg', name)
+    return None if not match else (match.group(1), int(match.group(2)))
+
+
+def append_segment(path: str, data: bytes, width: int) -> int:
+    """Append records in `data` to segment at `path` (created if needed), returns number written."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size < SEGMENT_SIZE:
+            os.ftruncate(fd, SEGMENT_SIZE)
+        with mmap.mmap(fd, SEGMENT_SIZE) as view:
+            magic, _, _, count = HEADER.unpack_from(view)
+            if magic != SEGMENT_MAGIC:
+                count = 0
+            written = min(CAPACITY - count, len(data) // RECORD.size)
+            offset = HEADER_SIZE + count * RECORD.size
+            view[offset:offset + written * RECORD.size] = data[:written * RECORD.size]
+            HEADER.pack_into(view, 0, SEGMENT_MAGIC, width, RECORD.size, count + written)  # NOTE: count last
+    finally:
+        os.close(fd)
+    return written
+
+
+def update_last(path: str, record: bytes) -> bool:
+    """Overwrite the last record of segment at `path` with `record` (False if missing or empty)."""
+    try:
+        fd = os.open(path, os.O_RDWR)
+    except OSError:
+        return False
+    try:
+        with mmap.mmap(fd, SEGMENT_SIZE) as view:
+            magic, _, _, count = HEADER.unpack_from(view)
+            if magic != SEGMENT_MAGIC or not count:
+                return False
+            offset = HEADER_SIZE + (count - 1) * RECORD.size
+            view[offset:offset + RECORD.size] = record
+    except (OSError, ValueError):
+        return False
+    finally:
+        os.close(fd)
+    return True
+
+
+def last_record(path: str) -> Optional[Tuple[int, float, float, float, int]]:
+    """Last record in segment at `path` (None if missing or empty)."""
+    try:
+        with open(path, mode='rb') as stream:
+            magic, _, size, count = HEADER.unpack(stream.read(HEADER.size))
+            if magic != SEGMENT_MAGIC or size != RECORD.size or not count:
+                return None
+            stream.seek(HEADER_SIZE + (count - 1) * RECORD.size)
+            return RECORD.unpack(stream.read(RECORD.size))
+    except (OSError, struct.error):
+        return None
+
+
+def segment_count(path: str) -> int:
+    """Number of records in segment at `path` (zero if missing or not a segment)."""
+    try:
+        with open(path, mode='rb') as stream:
+            magic, _, _, count = HEADER.unpack(stream.read(HEADER.size))
+    except (OSError, struct.error):
+        return 0
+    return count if magic == SEGMENT_MAGIC else 0
+
+
+def read_segment(path: str, start: int = 0,
+                 end: int = sys.maxsize) -> Iterator[Tuple[int, float, float, float, int]]:
+    """Records in segment at `path` with `start` <= time < `end` (found by bisection)."""
+    try:
+        with open(path, mode='rb') as stream:
+            view = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return
+    with view:
+        magic, _, size, count = HEADER.unpack_from(view)
+        if magic != SEGMENT_MAGIC or size != RECORD.size:
+            return
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if RECORD.unpack_from(view, HEADER_SIZE + middle * RECORD.size)[0] < start:
+                low = middle + 1
+            else:
+                high = middle
+        for index in range(low, count):
+            record = RECORD.unpack_from(view, HEADER_SIZE + index * RECORD.size)
+            if record[0] >= end:
+                break
+            yield record
+
+
+class Series:
+    """
+    Buckets being filled for each tier of a single series, and records not yet written.
+
+    The last record of each tier on disk is resumed as the open bucket (e.g., after
+    a restart within the same minute), and is overwritten in place once that bucket
+    is written again, so a bucket is never stored twice.
+    """
+
+    __slots__ = ('path', 'buckets', 'pending', 'segments', 'resumed')
+
+    path: str
+    buckets: List[Optional[List[float]]]  # NOTE: start, total, count, minimum, maximum
+    pending: List[bytearray]
+    segments: List[Optional[str]]  # NOTE: current segment for each tier
+    resumed: List[Optional[str]]  # NOTE: segment with the last record (first pending record replaces it)
+
+    def __init__(self, path: str) -> None:
+        """Initialize for directory `path` (resume the latest segment and bucket of each tier)."""
+        self.path = path
+        self.buckets = [None] * len(TIERS)
+        self.pending = [bytearray() for _ in TIERS]
+        self.segments = [None] * len(TIERS)
+        self.resumed = [None] * len(TIERS)
+        os.makedirs(path, exist_ok=True)
+        latest: Dict[str, Tuple[int, str]] = {}
+        for name in os.listdir(path):
+            found = parse_segment_name(name)
+            if found and (found[0] not in latest or found[1] > latest[found[0]][0]):
+                latest[found[0]] = found[1], name
+        for i, (tier, _, _) in enumerate(TIERS):
+            if tier not in latest:
+                continue
+            segment = os.path.join(path, latest[tier][1])
+            if segment_count(segment) < CAPACITY:
+                self.segments[i] = segment
+            record = last_record(segment)
+            if record is not None:
+                start, mean, minimum, maximum, count = record
+                self.buckets[i] = [start, mean * count, count, minimum, maximum]
+                self.resumed[i] = segment
+
+    def add(self, ms: int, value: float) -> None:
+        """Add `value` at time `ms` to the bucket of each tier (completed buckets become records)."""
+        for i, (_, width, _) in enumerate(TIERS):
+            bucket = self.buckets[i]
+            if bucket is not None and ms >= bucket[0] + width * 1000:
+                self.pending[i] += RECORD.pack(int(bucket[0]), bucket[1] / bucket[2], bucket[3], bucket[4],
+                                               bucket[2])
+                bucket = None
+            if bucket is None:
+                self.buckets[i] = [ms - ms % (width * 1000), value, 1, value, value]
+            else:
+                bucket[1] += value
+                bucket[2] += 1
+                bucket[3] = min(bucket[3], value)
+                bucket[4] = max(bucket[4], value)
+
+    def close_buckets(self) -> None:
+        """Write incomplete buckets as records (e.g., at exit)."""
+        for i, bucket in enumerate(self.buckets):
+            if bucket is not None:
+                self.pending[i] += RECORD.pack(int(bucket[0]), bucket[1] / bucket[2], bucket[3], bucket[4],
+                                               bucket[2])
+                self.buckets[i] = None
+
+
+class Store:
+    """
+    Series for a single `resource` under `root`, written every `flush_interval` seconds.
+
+    The size of each tier (all segments of all series for the resource) is limited
+    to its share of `size` by removing the oldest segments, but the segment being
+    written for each series is always kept.
+    """
+
+    root: str
+    resource: str
+    size: int = STORE_SIZE
+    flush_interval: float = FLUSH_INTERVAL
+    indexed: bool
+
+    _series: Dict[Tuple[Any, str], Series]
+    _segments: List[List[Tuple[int, str]]]  # NOTE: heap of (start, path) for each tier
+    _last_flush: float
+
+    def __init__(self, root: str, resource: str, columns: List[str], size: int = STORE_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL) -> None:
+        """Initialize for `resource` with `columns` (an identifier first if indexed)."""
+        self.root = root
+        self.resource = resource
+        self.columns = columns
+        self.size = size
+        self.flush_interval = flush_interval
+        self.indexed = columns[0].endswith('_id')
+        self._series = {}
+        self._segments = [[] for _ in TIERS]
+        self._last_flush = time.monotonic()
+        tiers = {tier: i for i, (tier, _, _) in enumerate(TIERS)}
+        base = os.path.join(root, resource)
+        try:
+            os.makedirs(base, exist_ok=True)
+        except OSError as error:
+            raise RuntimeError(f'Cannot create store directory ({error})') from error
+        for entry in os.scandir(base):
+            if entry.is_dir():
+                for name in os.listdir(entry.path):
+                    found = parse_segment_name(name)
+                    if found and found[0] in tiers:
+                        self._segments[tiers[found[0]]].append((found[1], os.path.join(entry.path, name)))
+        for segments in self._segments:
+            heapq.heapify(segments)
+
+    def add(self, ms: int, values: Tuple[Any, ...]) -> None:
+        """Add a single row of `values` at time `ms` (non-numeric and missing values are skipped)."""
+        key = values[0] if self.indexed else None
+        for column, value in zip(self.columns[1:] if self.indexed else self.columns,
+                                 values[1:] if self.indexed else values):
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            if value != value:  # NOTE: NaN
+                continue
+            series = self._series.get((key, column))
+            if series is None:
+                name = column if key is None else f'{column}.{quote(str(key), safe="")}'
+                series = self._series[key, column] = Series(os.path.join(self.root, self.resource, name))
+            series.add(ms, value)
+
+    def commit(self) -> None:
+        """Write pending records if `flush_interval` has passed."""
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write pending records to segments (starting new segments as needed)."""
+        for series in self._series.values():
+            for i, (tier, width, _) in enumerate(TIERS):
+                data = series.pending[i]
+                if data and series.resumed[i] is not None:
+                    if update_last(series.resumed[i], data[:RECORD.size]):
+                        del data[:RECORD.size]
+                    series.resumed[i] = None
+                while data:
+                    if series.segments[i] is None:
+                        start, = struct.unpack_from('<q', data)
+                        series.segments[i] = os.path.join(series.path, segment_name(tier, start))
+                        heapq.heappush(self._segments[i], (start, series.segments[i]))
+                        self.expire(i)
+                    written = append_segment(series.segments[i], data, width)
+                    del data[:written * RECORD.size]
+                    if data:
+                        series.segments[i] = None  # NOTE: full
+        self._last_flush = time.monotonic()
+
+    def expire(self, tier: int) -> None:
+        """Remove oldest segments of `tier` until within its share of `size`."""
+        segments = self._segments[tier]
+        limit = max(1, int(self.size * TIERS[tier][2]) // SEGMENT_SIZE)
+        current = {series.segments[tier] for series in self._series.values()}
+        current.update(series.resumed[tier] for series in self._series.values())
+        kept = []
+        while len(segments) + len(kept) > limit and segments:
+            start, path = heapq.heappop(segments)
+            if path in current:
+                kept.append((start, path))
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        for item in kept:
+            heapq.heappush(segments, item)
+
+    def close(self) -> None:
+        """Write incomplete buckets and all pending records."""
+        for series in self._series.values():
+            series.close_buckets()
+        self.flush()
+
+
+class StoreWriter(RecordWriter):
+    """Add every row to `store` before passing it to `writer`."""
+
+    writer: RecordWriter
+    store: Store
+
+    def __init__(self, writer: RecordWriter, store: Store) -> None:
+        """Wrap `writer` (with the same columns as `store`)."""
+        super().__init__(writer.resource, writer.columns)
+        self.writer = writer
+        self.store = store
+        self.missing = writer.missing
+
+    def write(self, *values: Any) -> None:
+        self.store.add(time.time_ns() // 1_000_000, values)
+        self.writer.write(*values)
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        self.store.add(round(timestamp.timestamp() * 1000), values)
+        self.writer.write_at(timestamp, *values)
+
+    def write_header(self) -> None:
+        self.writer.write_header()
+
+    def commit(self) -> None:
+        self.writer.commit()
+        self.store.commit()
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        finally:
+            self.store.close()
+
+
+def _series_paths(root: str, resource: str) -> List[Tuple[str, str]]:
+    """Name and directory of each series stored for `resource` (sorted by name)."""
+    base = os.path.join(root, resource)
+    if not os.path.isdir(base):
+        return []
+    return sorted((unquote(entry.name), entry.path) for entry in os.scandir(base) if entry.is_dir())
+
+
+def list_series(root: str, resource: str) -> List[str]:
+    """Names of series stored for `resource` (e.g., 'gpu_temp.0')."""
+    return [name for name, _ in _series_paths(root, resource)]
+
+
+def _segments(path: str, tier: str) -> List[Tuple[int, str]]:
+    """Start and path of each segment of `tier` in series directory `path` (in order)."""
+    found = [(parse_segment_name(name), name) for name in os.listdir(path)]
+    return sorted((item[1], os.path.join(path, name)) for item, name in found if item and item[0] == tier)
+
+
+def select_tier(path: str, start: int) -> str:
+    """Finest tier with data at `start` (or the earliest data of any tier) for series at `path`."""
+    oldest, covered = {}, []
+    for tier, period, _ in TIERS:
+        segments = _segments(path, tier)
+        if segments:
+            oldest[tier] = segments[0][0]
+            covered.append(oldest[tier] + period * 1000)  # NOTE: end of oldest bucket
+    if not oldest:
+        return TIERS[0][0]
+    target = max(start, min(covered))
+    for tier, _, _ in TIERS:
+        if tier in oldest and oldest[tier] <= target:
+            return tier
+    return TIERS[-1][0]
+
+
+def _read_series(path: str, name: str, tier: str, start: int,
+                 end: int) -> Iterator[Tuple[int, str, float, float, float]]:
+    segments = _segments(path, tier)
+    for i, (first, segment) in enumerate(segments):
+        following = segments[i + 1][0] if i + 1 < len(segments) else sys.maxsize
+        if following <= start or first >= end:
+            continue  # NOTE: does not overlap (never opened)
+        for timestamp, mean, minimum, maximum, _ in read_segment(segment, start, end):
+            yield timestamp, name, mean, minimum, maximum
+
+
+def query(root: str, resource: str, start: int = 0, end: int = sys.maxsize, tier: str = None,
+          series: List[str] = None) -> Iterator[Tuple[int, str, float, float, float]]:
+    """
+    Records (time, series, mean, minimum, maximum) for `resource` with `start` <= time < `end`
+    (milliseconds), in time order. Select `series` by glob-style pattern (default: all).
+    The `tier` is selected for each series if not given (see `select_tier`).
+    """
+    import fnmatch  # NOTE: only needed for queries
+    streams = []
+    for name, path in _series_paths(root, resource):
+        if series and not any(fnmatch.fnmatchcase(name, pattern) for pattern in series):
+            continue
+        streams.append(_read_series(path, name, tier or select_tier(path, start), start, end))
+    return heapq.merge(*streams)
@@ -55,6 +55,7 @@ setup(
                             ],
     entry_points         = {'console_scripts': ['monitor=monitor.cli:main']},
     install_requires     = ['cmdkit==1.5.5', 'logalpha==2.0.2', 'psutil>=5.7.2'],
+    extras_require       = {'parquet': ['pyarrow>=4.0.0', ]},
     data_files = [
         ('share/man/man1', ['man/man1/monitor.1', ]),
     ],
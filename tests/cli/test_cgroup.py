@@ -0,0 +1,54 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for cpu cgroup command output."""
+
+
+# external libs
+import pytest
+from cmdkit.cli import ArgumentError
+
+# internal libs
+from monitor.cli.cpu.cgroup import CPUCGroup, log
+from monitor.contrib.cgroup import CGroupTable
+
+
+COLUMNS = ['cgroup_id', 'cgroup_percent', 'cgroup_memory']
+
+
+@pytest.fixture
+def root(tmp_path) -> str:
+    """Fake cgroup v2 hierarchy with a single (nested) group."""
+    group = tmp_path / 'system.slice' / 'job_1'
+    group.mkdir(parents=True)
+    (tmp_path / 'cgroup.controllers').write_text('cpu memory\n')
+    (group / 'cpu.stat').write_text('usage_usec 100\nuser_usec 50\n')
+    (group / 'memory.current').write_text('4096\n')
+    return str(tmp_path)
+
+
+@pytest.mark.parametrize('args', [['--binary'], ['--parquet', 'out.parquet'],
+                                  ['--push', 'tcp://localhost:1234']])
+def test_numeric_formats_rejected(args) -> None:
+    """Group names are not numeric, so only plain and CSV output are available."""
+    with pytest.raises(ArgumentError):
+        CPUCGroup.from_cmdline(args)
+
+
+def test_csv_row(root, capsysbinary) -> None:
+    """The group name is written as is."""
+    table = CGroupTable('system.slice/*', root=root)
+    writer = CPUCGroup.from_cmdline(['--csv']).get_writer('cpu.cgroup', COLUMNS, log)
+    for row in table.sample():
+        writer.write(*row)
+    writer.close()
+    header, row = capsysbinary.readouterr().out.decode().splitlines()
+    assert header == 'timestamp,hostname,resource,' + ','.join(COLUMNS)
+    assert row.split(',')[3:] == ['system.slice/job_1', '0.0', '4096']
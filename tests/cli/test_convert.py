@@ -0,0 +1,45 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for converting binary records to CSV."""
+
+
+# standard libs
+import io
+from datetime import datetime
+
+# internal libs
+from monitor.cli.convert import Convert
+from monitor.core.logging import get_hostname
+from monitor.core.output import CSVWriter, BinaryWriter
+
+
+COLUMNS = ['gpu_id', 'gpu_percent', 'gpu_temp']
+ROWS = [
+    (datetime(2026, 10, 18, 6, 0, 0, 125_000), 0, 12.5, 41.0),
+    (datetime(2026, 10, 18, 6, 0, 1, 125_000), 1, 0.1, None),  # NOTE: missing
+]
+
+
+def write_rows(writer) -> None:
+    writer.write_header()
+    for timestamp, *values in ROWS:
+        writer.write_at(timestamp, *(writer.missing if value is None else value for value in values))
+    writer.close()
+
+
+def test_same_as_csv(capsysbinary) -> None:
+    """Converted records are the same as with --csv (including missing values)."""
+    binary = BinaryWriter('gpu.all', COLUMNS, ['H', 'f', 'f'], stream=io.BytesIO())
+    write_rows(binary)
+    csv = CSVWriter('gpu.all', COLUMNS, stream=io.BytesIO(), hostname=get_hostname())
+    write_rows(csv)
+    Convert().convert(io.BytesIO(binary.stream.getvalue()))
+    assert capsysbinary.readouterr().out == csv.stream.getvalue()
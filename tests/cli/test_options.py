@@ -0,0 +1,59 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for output options shared by resource commands."""
+
+
+# external libs
+import pytest
+from cmdkit.cli import ArgumentError
+
+# internal libs
+from monitor.core.exceptions import AlertTriggered
+from monitor.cli.cpu.percent import CPUPercent
+from monitor.cli.cpu.cgroup import CPUCGroup
+from monitor.cli.cpu.procs import CPUProcs
+
+
+@pytest.mark.parametrize('args, expected', [([], 'plain'), (['--csv'], 'csv'), (['--binary'], 'binary'),
+                                            (['--parquet', 'out.parquet'], 'parquet'),
+                                            (['--push', 'tcp://localhost:1234'], 'push')])
+def test_output_format(args, expected) -> None:
+    assert CPUPercent.from_cmdline(args).output_format == expected
+
+
+def test_report_window() -> None:
+    assert CPUPercent.from_cmdline([]).report_window == 0
+    assert CPUPercent.from_cmdline(['-s', '0.5', '--report-interval', '10']).report_window == 20
+
+
+def test_formats() -> None:
+    """Only declared formats are options of the command."""
+    assert CPUCGroup.from_cmdline(['--csv']).output_format == 'csv'
+    for args in (['--binary'], ['--parquet', 'out.parquet'], ['--push', 'tcp://localhost:1234']):
+        with pytest.raises(ArgumentError):
+            CPUCGroup.from_cmdline(args)
+
+
+def test_keep_samples() -> None:
+    """Commands without `keep_samples` have no --store or --alerts (or exit status for alerts)."""
+    assert CPUPercent.from_cmdline(['--store']).store_path == ''
+    for option in ('--store', '--alerts'):
+        with pytest.raises(ArgumentError):
+            CPUProcs.from_cmdline([option, 'x'])
+    assert AlertTriggered in CPUPercent.exceptions
+    assert AlertTriggered not in CPUProcs.exceptions
+
+
+@pytest.mark.parametrize('args, message', [(['--no-header'], '--no-header'), (['--flush', '1'], '--flush'),
+                                           (['-s', '2', '--report-interval', '1'], '--report-interval')])
+def test_check_output_options(args, message) -> None:
+    with pytest.raises(ArgumentError, match=message):
+        CPUPercent.from_cmdline(args).check_output_options()
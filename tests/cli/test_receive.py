@@ -0,0 +1,49 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for receive command output."""
+
+
+# standard libs
+import json
+import struct
+
+# internal libs
+from monitor.cli.receive import Output
+from monitor.core.network import RecordDecoder
+
+
+RECORD = struct.Struct('<qHf')
+
+
+def decoder(hostname: str) -> RecordDecoder:
+    return RecordDecoder(json.dumps({'hostname': hostname, 'resource': 'gpu.temp',
+                                     'columns': ['gpu_id', 'gpu_temp'], 'format': RECORD.format}).encode())
+
+
+def test_one_writer_per_sender(capsysbinary) -> None:
+    """Payloads from the same sender share a writer (header only once)."""
+    output = Output()
+    first, second = decoder('a'), decoder('b')
+    output.write(first, RECORD.pack(1_800_000_000_000, 0, 41.5))
+    output.write(first, RECORD.pack(1_800_000_001_000, 0, 42.5))
+    output.write(second, RECORD.pack(1_800_000_001_000, 1, 50))
+    assert len(output.writers) == 2
+    lines = capsysbinary.readouterr().out.decode().splitlines()
+    assert [line.split(',')[-2:] for line in lines] == [
+        ['gpu_id', 'gpu_temp'], ['0', '41.5'], ['0', '42.5'],
+        ['gpu_id', 'gpu_temp'], ['1', '50.0'],
+    ]
+
+
+def test_no_header(capsysbinary) -> None:
+    output = Output(no_header=True)
+    output.write(decoder('a'), RECORD.pack(1_800_000_000_000, 0, 41.5))
+    assert capsysbinary.readouterr().out.decode().splitlines()[0].endswith(',0,41.5')
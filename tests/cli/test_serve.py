@@ -0,0 +1,100 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for serve command (scraped with a plain HTTP client)."""
+
+
+# standard libs
+import sys
+import time
+import socket
+import subprocess
+import urllib.error
+import urllib.request
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.cli.serve import describe
+
+
+MAIN = 'import sys; from monitor.cli import main; sys.exit(main())'
+
+
+def free_port() -> int:
+    """An ephemeral port (released again for the server to bind)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def server():
+    """Address of "monitor serve" running in a subprocess (cpu and memory only)."""
+    port = free_port()
+    process = subprocess.Popen([sys.executable, '-c', MAIN, 'serve', '-p', str(port), '--host', '127.0.0.1',
+                                '-r', 'cpu.percent,cpu.memory', '-s', '0.1'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    address = f'http://127.0.0.1:{port}'
+    try:
+        for _ in range(100):
+            if process.poll() is not None:
+                pytest.fail(f'serve exited: {process.stderr.read().decode()}')
+            try:
+                with socket.create_connection(('127.0.0.1', port), timeout=1):
+                    break
+            except OSError:
+                time.sleep(0.05)
+        else:
+            pytest.fail('serve did not start listening')
+        yield address
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        process.stderr.close()
+
+
+def scrape(url: str) -> str:
+    with urllib.request.urlopen(url, timeout=5) as response:
+        assert response.status == 200
+        assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+        return response.read().decode()
+
+
+def test_metrics(server) -> None:
+    """Every metric has its help and type, and the page follows the latest sample."""
+    text = scrape(f'{server}/metrics')
+    lines = text.splitlines()
+    for name in ('monitor_cpu_percent', 'monitor_memory_percent', 'monitor_sample_timestamp_seconds'):
+        assert f'# TYPE {name} gauge' in lines
+        assert any(line.startswith(f'# HELP {name} ') for line in lines)
+        value, = [line.split()[1] for line in lines if line.startswith(f'{name} ')]
+        assert float(value) >= 0
+    first, = [line for line in lines if line.startswith('monitor_sample_timestamp_seconds ')]
+    time.sleep(0.3)
+    assert first not in scrape(f'{server}/metrics').splitlines()
+
+
+def test_not_found(server) -> None:
+    with pytest.raises(urllib.error.HTTPError) as info:
+        urllib.request.urlopen(f'{server}/', timeout=5)
+    assert info.value.code == 404
+
+
+@pytest.mark.parametrize('column, expected', [
+    ('cpu_percent', ('monitor_cpu_percent', {})),
+    ('cpu_iowait', ('monitor_cpu_time_percent', {'state': 'iowait'})),
+    ('gpu_1_temp', ('monitor_gpu_temp_celsius', {'gpu': '1'})),
+    ('net_eth_0_rx_bytes', ('monitor_net_rx_bytes_per_second', {'device': 'eth_0'})),
+    ('disk_nvme0n1_busy', ('monitor_disk_busy_percent', {'device': 'nvme0n1'})),
+])
+def test_describe(column, expected) -> None:
+    assert describe(column) == expected
@@ -0,0 +1,87 @@
+/*
+ * Stub NVIDIA Management Library for testing the "nvml" provider without a GPU.
+ *
+ * Build with `cc -shared -fPIC -o libnvidia-ml.so nvml.c` and select it with
+ * MONITOR_NVML_LIBRARY. The number of devices is NVML_STUB_COUNT (default: 2),
+ * and device N reports 10*(N+1) percent, N+1 of 16 GiB used, 100+N Watts, and
+ * 40+N degrees. Initialization fails if NVML_STUB_FAIL is set.
+ */
+
+#include <stdint.h>
+#include <stdlib.h>
+
+#define NVML_SUCCESS 0
+#define NVML_ERROR_UNINITIALIZED 1
+#define NVML_ERROR_INVALID_ARGUMENT 2
+
+typedef struct { unsigned int gpu; unsigned int memory; } nvmlUtilization_t;
+typedef struct { unsigned long long total; unsigned long long free; unsigned long long used; } nvmlMemory_t;
+
+static unsigned int count(void) {
+    const char *value = getenv("NVML_STUB_COUNT");
+    return value ? (unsigned int) atoi(value) : 2;
+}
+
+static int device(void *handle, unsigned int *index) {
+    uintptr_t value = (uintptr_t) handle;
+    if (value == 0 || value > count())
+        return NVML_ERROR_INVALID_ARGUMENT;
+    *index = (unsigned int) (value - 1);
+    return NVML_SUCCESS;
+}
+
+const char *nvmlErrorString(int status) {
+    switch (status) {
+        case NVML_SUCCESS: return "Success";
+        case NVML_ERROR_UNINITIALIZED: return "Uninitialized";
+        case NVML_ERROR_INVALID_ARGUMENT: return "Invalid Argument";
+        default: return "Unknown Error";
+    }
+}
+
+int nvmlInit_v2(void) {
+    return getenv("NVML_STUB_FAIL") ? NVML_ERROR_UNINITIALIZED : NVML_SUCCESS;
+}
+
+int nvmlDeviceGetCount_v2(unsigned int *value) {
+    *value = count();
+    return NVML_SUCCESS;
+}
+
+int nvmlDeviceGetHandleByIndex_v2(unsigned int index, void **handle) {
+    if (index >= count())
+        return NVML_ERROR_INVALID_ARGUMENT;
+    *handle = (void *) (uintptr_t) (index + 1);
+    return NVML_SUCCESS;
+}
+
+int nvmlDeviceGetUtilizationRates(void *handle, nvmlUtilization_t *value) {
+    unsigned int index;
+    int status = device(handle, &index);
+    value->gpu = 10 * (index + 1);
+    value->memory = 0;
+    return status;
+}
+
+int nvmlDeviceGetMemoryInfo(void *handle, nvmlMemory_t *value) {
+    unsigned int index;
+    int status = device(handle, &index);
+    value->total = 16ULL << 30;
+    value->used = (unsigned long long) (index + 1) << 30;
+    value->free = value->total - value->used;
+    return status;
+}
+
+int nvmlDeviceGetPowerUsage(void *handle, unsigned int *value) {
+    unsigned int index;
+    int status = device(handle, &index);
+    *value = 1000 * (100 + index);  /* milliwatts */
+    return status;
+}
+
+int nvmlDeviceGetTemperature(void *handle, int sensor, unsigned int *value) {
+    unsigned int index;
+    int status = device(handle, &index);
+    *value = sensor == 0 ? 40 + index : 0;
+    return status;
+}
@@ -0,0 +1,134 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for amdgpu sysfs provider (against a fake sysfs tree)."""
+
+
+# standard libs
+import os
+import sys
+import asyncio
+import subprocess
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.contrib import amdgpu
+from monitor.contrib.amdgpu import (AMDGPU, AmdgpuDevice, AmdgpuPercent, AmdgpuMemory, AmdgpuPower,
+                                    AmdgpuTemperature, AmdgpuSnapshot, get_devices)
+
+
+def write_card(root, card: int, busy: int, used: int, total: int, temps: dict, power: int = None) -> str:
+    """Create attributes for /sys/class/drm/cardN/device under `root` (temperatures by label)."""
+    device = root / f'card{card}' / 'device'
+    hwmon = device / 'hwmon' / f'hwmon{card}'
+    hwmon.mkdir(parents=True)
+    (device / 'gpu_busy_percent').write_text(f'{busy}\n')
+    (device / 'mem_info_vram_used').write_text(f'{used}\n')
+    (device / 'mem_info_vram_total').write_text(f'{total}\n')
+    for number, (label, value) in enumerate(temps.items(), start=1):
+        (hwmon / f'temp{number}_input').write_text(f'{value}\n')
+        (hwmon / f'temp{number}_label').write_text(f'{label}\n')
+    if power is not None:
+        (hwmon / 'power1_average').write_text(f'{power}\n')
+    return str(device)
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    """Fake /sys/class/drm with cards 0 and 2 (no card 1), a connector, and a render node."""
+    write_card(tmp_path, 0, busy=12, used=1 << 30, total=4 << 30,
+               temps={'edge': 40_000, 'junction': 45_000}, power=150_000_000)
+    write_card(tmp_path, 2, busy=99, used=3 << 30, total=4 << 30,
+               temps={'edge': 70_000}, power=250_000_000)
+    (tmp_path / 'card0-DP-1').mkdir()
+    (tmp_path / 'renderD128').mkdir()
+    return tmp_path
+
+
+@pytest.fixture
+def selected(sysfs, monkeypatch):
+    """Select the fake sysfs tree as if by MONITOR_AMDGPU_SYSFS."""
+    monkeypatch.setattr(amdgpu, 'SYSFS_ROOT', str(sysfs))
+    get_devices.cache_clear()
+    yield sysfs
+    get_devices.cache_clear()
+
+
+EXPECTED = {
+    'percent': {0: 12.0, 2: 99.0},
+    'memory': {0: 25.0, 2: 75.0},
+    'power': {0: 150.0, 2: 250.0},
+    'temp': {0: 45.0, 2: 70.0},  # NOTE: junction if labeled, otherwise the first sensor
+}
+
+
+def open_fds() -> int:
+    return len(os.listdir('/proc/self/fd'))
+
+
+def test_card_numbers(sysfs) -> None:
+    """Devices are identified by card number (as with rocm-smi), even with gaps."""
+    assert list(AMDGPU(str(sysfs)).devices) == [0, 2]
+
+
+@pytest.mark.parametrize('metric, cls', [('percent', AmdgpuPercent), ('memory', AmdgpuMemory),
+                                         ('power', AmdgpuPower), ('temp', AmdgpuTemperature)])
+def test_metric(selected, metric, cls) -> None:
+    assert cls.collect().data == {metric: EXPECTED[metric]}
+
+
+def test_snapshot(selected) -> None:
+    assert AmdgpuSnapshot.collect().data == EXPECTED
+
+
+def test_snapshot_async(selected) -> None:
+    assert asyncio.run(AmdgpuSnapshot.collect_async()).data == EXPECTED
+
+
+def test_values_change(selected) -> None:
+    """Attributes are re-read from the open files on every sample."""
+    AmdgpuPercent.collect()
+    (selected / 'card2' / 'device' / 'gpu_busy_percent').write_text('5\n')
+    assert AmdgpuPercent.collect().data == {'percent': {0: 12.0, 2: 5.0}}
+
+
+def test_no_devices(tmp_path) -> None:
+    with pytest.raises(RuntimeError, match='No amdgpu devices'):
+        AMDGPU(str(tmp_path))
+
+
+@pytest.mark.skipif(not os.path.isdir('/proc/self/fd'), reason='requires /proc/self/fd')
+def test_no_leak_on_failure(sysfs) -> None:
+    """Files already opened are closed if a later attribute cannot be opened."""
+    os.remove(sysfs / 'card2' / 'device' / 'mem_info_vram_total')
+    before = open_fds()
+    with pytest.raises(FileNotFoundError):
+        AmdgpuDevice(str(sysfs / 'card2' / 'device'))
+    with pytest.raises(FileNotFoundError):
+        AMDGPU(str(sysfs))
+    assert open_fds() == before
+
+
+def test_missing_sensor(tmp_path) -> None:
+    device = AmdgpuDevice(write_card(tmp_path, 0, busy=0, used=0, total=1, temps={}))
+    with pytest.raises(RuntimeError, match='No temperature sensor'):
+        device.get_temp()
+    device.close()
+
+
+def test_environment(sysfs) -> None:
+    """The sysfs root is selected with MONITOR_AMDGPU_SYSFS."""
+    output = subprocess.check_output([sys.executable, '-c',
+                                      'from monitor.contrib.amdgpu import AmdgpuPower; '
+                                      'print(AmdgpuPower.collect().data)'],
+                                     env={**os.environ, 'MONITOR_AMDGPU_SYSFS': str(sysfs)})
+    assert output.decode().strip() == str({'power': EXPECTED['power']})
@@ -0,0 +1,109 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for device counters from /proc/net/dev and /proc/diskstats (against synthetic files)."""
+
+
+# type annotations
+from typing import Dict, Tuple
+
+# standard libs
+from types import SimpleNamespace
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.contrib import procfs
+from monitor.contrib.procfs import CounterTable, NetDev, DiskStats
+
+
+NET_HEADER = ('Inter-|   Receive                                          |  Transmit\n'
+              ' face |bytes packets errs drop fifo frame compressed multicast|'
+              'bytes packets errs drop fifo colls carrier compressed\n')
+
+
+def write_net_dev(path, devices: Dict[str, Tuple[int, int, int, int]]) -> None:
+    """Write /proc/net/dev with (rx bytes, rx packets, tx bytes, tx packets) for each device."""
+    lines = [f'{name:>6}: {rx} {rx_packets} 0 0 0 0 0 0 {tx} {tx_packets} 0 0 0 0 0 0'
+             for name, (rx, rx_packets, tx, tx_packets) in devices.items()]
+    path.write_text(NET_HEADER + '\n'.join(lines) + '\n')
+
+
+def write_diskstats(path, devices: Dict[str, Tuple[int, int, int, int, int]]) -> None:
+    """Write /proc/diskstats with (reads, sectors read, writes, sectors written, busy ms) for each device."""
+    lines = [f'   8       {minor} {name} {reads} 0 {read} 0 {writes} 0 {write} 0 0 {busy} {busy} 0 0 0 0'
+             for minor, (name, (reads, read, writes, write, busy)) in enumerate(devices.items())]
+    path.write_text('\n'.join(lines) + '\n')
+
+
+@pytest.fixture
+def clock(monkeypatch) -> list:
+    """Current monotonic time (in a list so a test can advance it)."""
+    now = [1000.0]
+    monkeypatch.setattr(procfs, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+@pytest.mark.parametrize('new, old, expected', [
+    (150, 100, 50),
+    (10, 2**32 - 90, 100),  # NOTE: 32-bit wraparound
+    (10, 2**64 - 90, 100),  # NOTE: 64-bit wraparound
+    (5, 2**40, 5),          # NOTE: reset (not near either limit)
+])
+def test_difference(new, old, expected) -> None:
+    assert CounterTable.difference(new, old) == expected
+
+
+def test_net_dev(tmp_path, clock) -> None:
+    """Rates per second for each interface (not loopback by default)."""
+    path = tmp_path / 'dev'
+    write_net_dev(path, {'lo': (0, 0, 0, 0), 'eth0': (1000, 10, 500, 5), 'eth1': (2**32 - 100, 0, 0, 0)})
+    table = NetDev(path=str(path))
+    assert table.devices == ['eth0', 'eth1']
+    write_net_dev(path, {'lo': (50, 1, 50, 1), 'eth0': (5000, 30, 900, 9), 'eth1': (300, 4, 0, 0)})
+    clock[0] += 2
+    assert table.update() == {'eth0': [2000.0, 200.0, 10.0, 2.0], 'eth1': [200.0, 0.0, 2.0, 0.0]}
+
+
+def test_new_device(tmp_path, clock) -> None:
+    """A device seen for the first time is reported from the next update."""
+    path = tmp_path / 'dev'
+    write_net_dev(path, {'eth0': (0, 0, 0, 0)})
+    table = NetDev(path=str(path))
+    write_net_dev(path, {'eth0': (100, 1, 0, 0), 'wg0': (100, 1, 0, 0)})
+    clock[0] += 1
+    assert list(table.update()) == ['eth0']
+    write_net_dev(path, {'eth0': (200, 2, 0, 0), 'wg0': (300, 2, 0, 0)})
+    clock[0] += 1
+    assert table.update()['wg0'] == [200.0, 0.0, 1.0, 0.0]
+
+
+def test_diskstats(tmp_path, clock) -> None:
+    """Bytes (from sectors), operations, and percent busy for each disk (not loop or ram by default)."""
+    path = tmp_path / 'diskstats'
+    write_diskstats(path, {'loop0': (0, 0, 0, 0, 0), 'ram0': (0, 0, 0, 0, 0), 'sda': (0, 0, 0, 0, 0)})
+    table = DiskStats(path=str(path))
+    assert table.devices == ['sda']
+    write_diskstats(path, {'loop0': (9, 9, 9, 9, 9), 'ram0': (9, 9, 9, 9, 9), 'sda': (20, 800, 10, 400, 500)})
+    clock[0] += 2
+    assert table.update() == {'sda': [204800.0, 102400.0, 10.0, 5.0, 25.0]}
+
+
+@pytest.mark.parametrize('include, exclude, expected', [
+    (None, None, ['nvme0n1', 'nvme0n1p1', 'sda', 'sda1']),
+    (['sd*'], None, ['sda', 'sda1']),
+    (None, ['loop*', '*[0-9]p[0-9]*', 'sd?[0-9]'], ['nvme0n1', 'sda']),  # NOTE: whole disks only
+    (['loop*'], [], ['loop0']),  # NOTE: an explicit exclude replaces the default
+])
+def test_select(tmp_path, include, exclude, expected) -> None:
+    path = tmp_path / 'diskstats'
+    write_diskstats(path, {name: (0, 0, 0, 0, 0) for name in ['loop0', 'nvme0n1', 'nvme0n1p1', 'sda', 'sda1']})
+    assert DiskStats(include, exclude, path=str(path)).devices == expected
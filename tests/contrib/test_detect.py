@@ -0,0 +1,104 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for GPU provider detection cache (with a fake boot ID)."""
+
+
+# standard libs
+import os
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.contrib import detect
+from monitor.contrib.detect import get_provider, get_cache_path
+
+
+@pytest.fixture
+def host(tmp_path, monkeypatch) -> dict:
+    """
+    Fake boot ID and cache directory, with nvidia-smi on the PATH.
+    Detection is counted (in 'calls') rather than probing devices.
+    """
+    proc = tmp_path / 'proc' / 'sys' / 'kernel' / 'random'
+    proc.mkdir(parents=True)
+    (proc / 'boot_id').write_text('boot-1\n')
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    command = bin_dir / 'nvidia-smi'
+    command.write_text('#!/bin/sh\n')
+    command.chmod(0o755)
+    state = {'calls': 0, 'boot_id': proc / 'boot_id', 'command': command}
+
+    def detect_provider() -> str:
+        state['calls'] += 1
+        return 'nvidia'
+
+    monkeypatch.setattr(detect, 'PROC_ROOT', str(tmp_path / 'proc'))
+    monkeypatch.setattr(detect, 'CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(detect, 'detect_provider', detect_provider)
+    monkeypatch.setenv('PATH', str(bin_dir))
+    return state
+
+
+def test_cache_hit(host) -> None:
+    """Detected once, then read from the cache."""
+    assert get_provider() == 'nvidia'
+    assert host['calls'] == 1
+    with open(get_cache_path()) as stream:
+        assert stream.read() == 'boot-1 nvidia\n'
+    assert get_provider() == 'nvidia'
+    assert host['calls'] == 1
+
+
+def test_boot_id_changed(host) -> None:
+    """A cache from a previous boot is not used (and is replaced)."""
+    get_provider()
+    host['boot_id'].write_text('boot-2\n')
+    assert get_provider() == 'nvidia'
+    assert host['calls'] == 2
+    with open(get_cache_path()) as stream:
+        assert stream.read() == 'boot-2 nvidia\n'
+
+
+def test_command_missing(host) -> None:
+    """Cached provider whose command is not on the PATH (e.g., another environment) is detected again."""
+    get_provider()
+    host['command'].unlink()
+    get_provider()
+    assert host['calls'] == 2
+
+
+def test_invalid_cache(host) -> None:
+    os.makedirs(detect.CACHE_DIR)
+    with open(get_cache_path(), mode='w') as stream:
+        stream.write('boot-1 unknown\n')
+    assert get_provider() == 'nvidia'
+    assert host['calls'] == 1
+
+
+def test_unwritable_cache(host, tmp_path, monkeypatch) -> None:
+    """Provider is still detected if the cache cannot be written."""
+    (tmp_path / 'file').write_text('')
+    monkeypatch.setattr(detect, 'CACHE_DIR', str(tmp_path / 'file' / 'cache'))  # NOTE: not a directory
+    assert get_provider() == 'nvidia'
+    assert get_provider() == 'nvidia'
+    assert host['calls'] == 2
+    assert not os.path.exists(detect.CACHE_DIR)
+
+
+def test_no_boot_id(host) -> None:
+    """Without a boot ID (or cache disabled) detection is done every time."""
+    get_provider(cache=False)
+    host['boot_id'].unlink()
+    get_provider()
+    assert host['calls'] == 2
+    assert not os.path.exists(detect.CACHE_DIR)
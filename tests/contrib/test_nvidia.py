@@ -0,0 +1,218 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for nvidia-smi parsers and long-lived stream (against a fake nvidia-smi)."""
+
+
+# standard libs
+import os
+import sys
+import time
+import subprocess
+from types import SimpleNamespace
+
+# external libs
+import pytest
+
+# internal libs
+from monitor import contrib
+from monitor.contrib import SMIData
+from monitor.contrib.nvidia import (NvidiaStream, NvidiaTemperature, NvidiaSnapshot, NvidiaDevices,
+                                    NvidiaProcs, NvidiaProcsPercent)
+
+
+# NOTE: the Nth run prints two blocks (temperature 40 + N) and then hangs (without output if
+# there is a file named "nvidia-smi.mute" next to it)
+FAKE_NVIDIA_SMI = """\
+#!/bin/sh
+echo x >> "$0.runs"
+runs=$(wc -l < "$0.runs")
+if [ ! -e "$0.mute" ]; then
+    printf '0, %d\\n1, %d\\n0, %d\\n1, %d\\n' $((40 + runs)) $((40 + runs)) $((40 + runs)) $((40 + runs))
+fi
+exec sleep 60
+"""
+
+
+# NOTE: output of the combined query (index, utilization, memory used and total, power, temperature)
+SNAPSHOT = """\
+0, 35, 1024, 16384, 61.25, 44
+1, 100, 8192, 16384, 250.00, 71
+"""
+
+DEVICES = """\
+0, 00000000:3B:00.0
+1, 00000000:AF:00.0
+"""
+
+# NOTE: memory in MiB by PCI bus ID and PID
+PROCS = """\
+00000000:3B:00.0, 4321, 512
+00000000:AF:00.0, 4321, 256
+00000000:AF:00.0, 4400, 1024
+"""
+
+# NOTE: idle devices are listed with '-' for the PID (and unknown utilization also as '-')
+PMON = """\
+# gpu        pid  type    sm   mem   enc   dec   command
+# Idx          #   C/G     %     %     %     %   name
+    0       4321     C    45    10     -     -   python
+    1       4321     C     -     -     -     -   python
+    1       4400     C    80    31     -     -   train
+    2          -     -     -     -     -     -   -
+"""
+
+# NOTE: answers each query with the output above (kept next to it) and keeps a line per call
+FAKE_QUERY_SMI = """\
+#!/bin/sh
+echo "$*" >> "$0.calls"
+case "$*" in
+    *pci.bus_id*) exec cat "$0.devices" ;;
+    *utilization.gpu,memory.used*) exec cat "$0.all" ;;
+    *query-compute-apps*) exec cat "$0.procs" ;;
+    pmon*) exec cat "$0.pmon" ;;
+    *) exit 1 ;;
+esac
+"""
+
+OUTPUTS = {'devices': DEVICES, 'all': SNAPSHOT, 'procs': PROCS, 'pmon': PMON}
+
+
+@pytest.fixture
+def fake_smi(tmp_path, monkeypatch) -> str:
+    """Put fake nvidia-smi (answering queries) first on the PATH."""
+    path = tmp_path / 'nvidia-smi'
+    path.write_text(FAKE_QUERY_SMI)
+    path.chmod(0o755)
+    for name, output in OUTPUTS.items():
+        (tmp_path / f'nvidia-smi.{name}').write_text(output)
+    monkeypatch.setenv('PATH', f'{tmp_path}{os.pathsep}{os.environ["PATH"]}')
+    return str(path)
+
+
+def calls(fake_smi: str) -> int:
+    """Number of times the fake nvidia-smi was run."""
+    with open(fake_smi + '.calls') as stream:
+        return len(stream.readlines())
+
+
+def test_snapshot() -> None:
+    """All four metrics from a single query (memory as a fraction of total)."""
+    assert NvidiaSnapshot.parse_text(SNAPSHOT) == {
+        'percent': {0: 35.0, 1: 100.0},
+        'memory': {0: 0.0625, 1: 0.5},
+        'power': {0: 61.25, 1: 250.0},
+        'temp': {0: 44.0, 1: 71.0},
+    }
+
+
+def test_devices() -> None:
+    assert NvidiaDevices.parse_text(DEVICES) == {'index': {'00000000:3B:00.0': 0, '00000000:AF:00.0': 1}}
+
+
+@pytest.mark.parametrize('metric', [NvidiaSnapshot, NvidiaDevices])
+def test_parse_error(metric) -> None:
+    with pytest.raises(RuntimeError, match='Failed to parse output'):
+        metric.parse_text('No devices were found\n')
+
+
+def test_procs() -> None:
+    """Memory in bytes by PCI bus ID and PID (empty without processes)."""
+    assert NvidiaProcs.parse_text(PROCS) == {'memory': {('00000000:3B:00.0', 4321): 512 * 1024**2,
+                                                        ('00000000:AF:00.0', 4321): 256 * 1024**2,
+                                                        ('00000000:AF:00.0', 4400): 1024 * 1024**2}}
+    assert NvidiaProcs.parse_text('\n') == {'memory': {}}
+
+
+def test_procs_percent() -> None:
+    """Percent by GPU index and PID (idle devices skipped, unknown utilization as zero)."""
+    data = NvidiaProcsPercent.parse_text(PMON)
+    assert data == {'percent': {(0, 4321): 45.0, (1, 4321): 0.0, (1, 4400): 80.0}}
+
+
+def test_get_procs(fake_smi, monkeypatch) -> None:
+    """Processes by GPU index (from the device map), queried again only after `procs_interval`."""
+    now = [1000.0]
+    monkeypatch.setattr(contrib, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    smi = SMIData('nvidia', procs_interval=5)
+    data = smi.get_procs(percent=True)
+    assert data['memory'] == {(0, 4321): 512 * 1024**2, (1, 4321): 256 * 1024**2, (1, 4400): 1024 * 1024**2}
+    assert data['percent'] == {(0, 4321): 45.0, (1, 4321): 0.0, (1, 4400): 80.0}
+    assert calls(fake_smi) == 3  # NOTE: processes, device map, and pmon
+    now[0] += 4.9
+    assert smi.get_procs(percent=True) is data
+    assert calls(fake_smi) == 3
+    now[0] += 0.2
+    assert smi.get_procs(percent=True) == data
+    assert calls(fake_smi) == 5  # NOTE: device map is not queried again
+
+
+def test_snapshot_single_query(fake_smi) -> None:
+    """The snapshot (and device map) is a single call to nvidia-smi."""
+    smi = SMIData('nvidia')
+    assert smi.snapshot['temp'] == {0: 44.0, 1: 71.0}
+    assert calls(fake_smi) == 1
+    assert smi.devices == {'00000000:3B:00.0': 0, '00000000:AF:00.0': 1}
+    assert smi.devices is smi.devices
+    assert calls(fake_smi) == 2
+
+
+def test_gpu_all(fake_smi) -> None:
+    """Command writes a row for each GPU with every metric."""
+    main = 'import sys; from monitor.cli import main; sys.exit(main())'
+    process = subprocess.Popen([sys.executable, '-c', main, 'gpu', 'all', '--csv', '--provider', 'nvidia',
+                                '-s', '0.05'], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        lines = [process.stdout.readline().decode().strip() for _ in range(3)]
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        process.stdout.close()
+    header, *rows = lines
+    assert header == 'timestamp,hostname,resource,gpu_id,gpu_percent,gpu_memory,gpu_power,gpu_temp'
+    assert [row.split(',')[2:] for row in rows] == [['gpu.all', '0', '35.0', '0.0625', '61.25', '44.0'],
+                                                   ['gpu.all', '1', '100.0', '0.5', '250.0', '71.0']]
+
+
+@pytest.fixture
+def hanging(tmp_path, monkeypatch) -> str:
+    """Put fake nvidia-smi first on the PATH."""
+    path = tmp_path / 'nvidia-smi'
+    path.write_text(FAKE_NVIDIA_SMI)
+    path.chmod(0o755)
+    monkeypatch.setenv('PATH', f'{tmp_path}{os.pathsep}{os.environ["PATH"]}')
+    return str(path)
+
+
+def test_restart_hung_process(hanging) -> None:
+    """A process that stops producing output is restarted (instead of returning a stale sample)."""
+    stream = NvidiaStream(NvidiaTemperature, interval=0.05)
+    stream.timeout = 5
+    try:
+        assert stream.latest.data == {'temp': {0: 41.0, 1: 41.0}}
+        time.sleep(stream.max_age * stream.interval + 0.1)
+        assert stream.latest.data == {'temp': {0: 42.0, 1: 42.0}}
+        assert stream.restarts == 1
+    finally:
+        stream.close()
+
+
+def test_timeout(hanging) -> None:
+    """RuntimeError if no new sample arrives after a restart."""
+    stream = NvidiaStream(NvidiaTemperature, interval=0.05)
+    stream.timeout = 0.5
+    try:
+        assert stream.latest.data == {'temp': {0: 41.0, 1: 41.0}}
+        open(hanging + '.mute', mode='w').close()
+        time.sleep(stream.max_age * stream.interval + 0.1)
+        with pytest.raises(RuntimeError, match='No output for 0.5 seconds'):
+            stream.latest
+    finally:
+        stream.close()
@@ -0,0 +1,105 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for in-process NVML provider (against a stub library, see stubs/nvml.c)."""
+
+
+# standard libs
+import os
+import sys
+import shutil
+import asyncio
+import subprocess
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.contrib import nvml
+from monitor.contrib.nvml import (NVML, NvmlPercent, NvmlMemory, NvmlPower, NvmlTemperature,
+                                  NvmlSnapshot, get_library)
+
+
+STUB_SOURCE = os.path.join(os.path.dirname(__file__), 'stubs', 'nvml.c')
+
+# NOTE: values reported by the stub for two devices
+EXPECTED = {
+    'percent': {0: 10.0, 1: 20.0},
+    'memory': {0: 1 / 16, 1: 2 / 16},
+    'power': {0: 100.0, 1: 101.0},
+    'temp': {0: 40.0, 1: 41.0},
+}
+
+
+@pytest.fixture(scope='module')
+def library(tmp_path_factory) -> str:
+    """Path to stub library (compiled once, skip if no compiler is available)."""
+    compiler = shutil.which('cc') or shutil.which('gcc')
+    if compiler is None:
+        pytest.skip('No C compiler to build stub library')
+    path = str(tmp_path_factory.mktemp('nvml') / 'libnvidia-ml.so')
+    subprocess.run([compiler, '-shared', '-fPIC', '-o', path, STUB_SOURCE], check=True)
+    return path
+
+
+@pytest.fixture
+def selected(library, monkeypatch) -> str:
+    """Select the stub library as if by MONITOR_NVML_LIBRARY."""
+    monkeypatch.setattr(nvml, 'NVML_LIBRARY', library)
+    get_library.cache_clear()
+    yield library
+    get_library.cache_clear()
+
+
+def test_devices(library, monkeypatch) -> None:
+    monkeypatch.setenv('NVML_STUB_COUNT', '4')
+    assert len(NVML(library).handles) == 4
+
+
+def test_values(library) -> None:
+    lib = NVML(library)
+    assert lib.query(lib.utilization) == EXPECTED['percent']
+    assert lib.query(lib.memory) == EXPECTED['memory']
+    assert lib.query(lib.power) == EXPECTED['power']
+    assert lib.query(lib.temperature) == EXPECTED['temp']
+
+
+@pytest.mark.parametrize('metric, cls', [('percent', NvmlPercent), ('memory', NvmlMemory),
+                                         ('power', NvmlPower), ('temp', NvmlTemperature)])
+def test_metric(selected, metric, cls) -> None:
+    assert cls.collect().data == {metric: EXPECTED[metric]}
+
+
+def test_snapshot(selected) -> None:
+    assert NvmlSnapshot.collect().data == EXPECTED
+
+
+def test_snapshot_async(selected) -> None:
+    assert asyncio.run(NvmlSnapshot.collect_async()).data == EXPECTED
+
+
+def test_init_failure(library, monkeypatch) -> None:
+    monkeypatch.setenv('NVML_STUB_FAIL', '1')
+    with pytest.raises(RuntimeError, match='nvmlInit_v2.*Uninitialized'):
+        NVML(library)
+
+
+def test_missing_library(tmp_path) -> None:
+    with pytest.raises(RuntimeError, match='Failed to load NVML'):
+        NVML(str(tmp_path / 'libnvidia-ml.so'))
+
+
+def test_environment(library) -> None:
+    """The library is selected with MONITOR_NVML_LIBRARY."""
+    output = subprocess.check_output([sys.executable, '-c',
+                                      'from monitor.contrib.nvml import NvmlTemperature; '
+                                      'print(NvmlTemperature.collect().data)'],
+                                     env={**os.environ, 'MONITOR_NVML_LIBRARY': library})
+    assert output.decode().strip() == str({'temp': EXPECTED['temp']})
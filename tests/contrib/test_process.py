@@ -0,0 +1,113 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for incremental process table (against fake processes)."""
+
+
+# standard libs
+import contextlib
+from collections import namedtuple
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.contrib import process
+from monitor.contrib.process import ProcessTable
+
+
+MemoryInfo = namedtuple('MemoryInfo', ['rss'])
+
+
+class FakeProcess:
+    """Stands in for psutil.Process (values from the `running` table)."""
+
+    running = {}  # NOTE: pid -> (create_time, cpu_percent, rss)
+
+    def __init__(self, pid: int) -> None:
+        if pid not in self.running:
+            raise process.psutil.NoSuchProcess(pid)
+        self.pid = pid
+        self._create_time = self.running[pid][0]
+
+    def create_time(self) -> float:
+        return self._create_time
+
+    def is_running(self) -> bool:
+        return self.running.get(self.pid, (None, ))[0] == self._create_time
+
+    def _values(self) -> tuple:
+        created, percent, rss = self.running.get(self.pid, (None, None, None))
+        if created != self._create_time:
+            raise AssertionError(f'Stale handle used for {self.pid}')
+        return percent, rss
+
+    def cpu_percent(self) -> float:
+        return self._values()[0]
+
+    def memory_info(self) -> MemoryInfo:
+        return MemoryInfo(self._values()[1])
+
+    def oneshot(self):
+        return contextlib.nullcontext()
+
+
+@pytest.fixture
+def running(monkeypatch) -> dict:
+    """Table of fake processes (modified by each test)."""
+    table = {}
+    monkeypatch.setattr(FakeProcess, 'running', table)
+    monkeypatch.setattr(process.psutil, 'Process', FakeProcess)
+    monkeypatch.setattr(process.psutil, 'pids', lambda: list(table))
+    return table
+
+
+def test_values(running) -> None:
+    """The first visit primes the counters, the next has values."""
+    running.update({1: (100.0, 5.0, 1024), 2: (100.0, 50.0, 2048)})
+    table = ProcessTable()
+    table.update()
+    assert table.values == {}
+    table.update()
+    assert table.values == {1: (5.0, 1024), 2: (50.0, 2048)}
+    assert table.top(1) == [(2, 50.0, 2048)]
+
+
+def test_queue_without_duplicates(running) -> None:
+    """A process ID reused before its turn in the queue is only queued once."""
+    running.update({pid: (100.0, 1.0, 1) for pid in range(1, 9)})
+    table = ProcessTable(max_scan=2)
+    for _ in range(5):
+        table.update()
+    for created in (200.0, 300.0, 400.0):
+        del running[3]
+        table.update()
+        running[3] = (created, 1.0, 1)
+        table.update()
+    assert sorted(table._queue) == list(range(1, 9))
+    assert table._queued == set(range(1, 9))
+
+
+def test_reused_pid(running) -> None:
+    """A handle is replaced (and values reset) if the process ID now belongs to another process."""
+    running[7] = (100.0, 10.0, 1)
+    table = ProcessTable()
+    table.update()
+    table.update()
+    assert table.values == {7: (10.0, 1)}
+    handle = table._handles[7]
+    table.update()
+    assert table._handles[7] is handle  # NOTE: same process, same handle
+    running[7] = (200.0, 90.0, 2)  # NOTE: exited and reused between two updates
+    table.update()
+    assert table.values == {}
+    assert table._handles[7] is not handle
+    table.update()
+    assert table.values == {7: (90.0, 2)}
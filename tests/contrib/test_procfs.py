@@ -0,0 +1,66 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for CPU counters from /proc/stat (against synthetic files)."""
+
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.contrib.procfs import CPUStat
+
+
+def write_stat(path, rows) -> None:
+    """Write /proc/stat with a total row and a row for each core (lists of 10 counters)."""
+    total = [sum(column) for column in zip(*rows)]
+    lines = [f'cpu {" ".join(map(str, total))}']
+    lines += [f'cpu{i} {" ".join(map(str, row))}' for i, row in enumerate(rows)]
+    path.write_text('\n'.join(lines + ['intr 0', 'ctxt 0']) + '\n')
+
+
+@pytest.fixture
+def stat(tmp_path):
+    path = tmp_path / 'stat'
+    write_stat(path, [[100, 0, 100, 800, 0, 0, 0, 0, 0, 0], [500, 0, 100, 400, 0, 0, 0, 0, 0, 0]])
+    return path
+
+
+def test_percent(stat) -> None:
+    cpu = CPUStat(str(stat))
+    assert cpu.cores == 2
+    write_stat(stat, [[150, 0, 100, 850, 0, 0, 0, 0, 0, 0], [500, 0, 100, 400, 100, 0, 0, 0, 100, 0]])
+    # NOTE: iowait is idle time, guest time is already counted in user time
+    assert cpu.percent() == [25.0, 50.0, 0.0]
+
+
+def test_times_percent(stat) -> None:
+    cpu = CPUStat(str(stat))
+    write_stat(stat, [[130, 10, 110, 850, 0, 0, 0, 0, 0, 0], [500, 0, 100, 400, 0, 0, 0, 0, 0, 0]])
+    assert cpu.times_percent() == [
+        [30.0, 10.0, 10.0, 50.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+        [30.0, 10.0, 10.0, 50.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0],
+        [0.0] * 10,  # NOTE: no time elapsed
+    ]
+
+
+def test_counters_backwards(stat) -> None:
+    """A counter that goes backwards (e.g., on hotplug) is treated as no change."""
+    cpu = CPUStat(str(stat))
+    write_stat(stat, [[50, 0, 100, 850, 0, 0, 0, 0, 0, 0], [500, 0, 100, 400, 0, 0, 0, 0, 0, 0]])
+    assert min(cpu.update()) == 0
+    assert cpu.percent(cpu.delta) == [0.0, 0.0, 0.0]
+
+
+def test_cores_changed(stat) -> None:
+    cpu = CPUStat(str(stat))
+    write_stat(stat, [[100, 0, 100, 800, 0, 0, 0, 0, 0, 0]])
+    with pytest.raises(RuntimeError, match='Number of cores changed'):
+        cpu.update()
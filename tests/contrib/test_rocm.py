@@ -0,0 +1,48 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for rocm-smi process parser."""
+
+
+# standard libs
+import math
+
+# internal libs
+from monitor.contrib.rocm import RocmProcs
+
+
+# NOTE: output of `rocm-smi --showpids --showpidgpus` (fields are separated by tabs)
+PROCS = """\
+========================= ROCm System Management Interface =========================
+================================== KFD Processes ===================================
+KFD process information:
+PID\tPROCESS NAME\tGPU(s)\tVRAM USED\tSDMA USED\tCU OCCUPANCY
+4321\tpython\t2\t2048\t0\t35%
+4400\ttrain\t1\t1024\t0\tUNKNOWN
+====================================================================================
+=============================== GPUs Indexed by PID ================================
+PID 4321 is using 2 DRM device(s):
+0 1
+PID 4400 is using 1 DRM device(s):
+1
+====================================================================================
+"""
+
+
+def test_procs() -> None:
+    """Memory of a process is split evenly over its devices, occupancy is repeated for each."""
+    data = RocmProcs.parse_text(PROCS)
+    assert data['memory'] == {(0, 4321): 1024.0, (1, 4321): 1024.0, (1, 4400): 1024.0}
+    assert data['percent'][0, 4321] == data['percent'][1, 4321] == 35.0
+    assert math.isnan(data['percent'][1, 4400])  # NOTE: not available
+
+
+def test_no_procs() -> None:
+    assert RocmProcs.parse_text('No KFD PIDs currently running\n') == {'memory': {}, 'percent': {}}
@@ -0,0 +1,62 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for windowed aggregation."""
+
+
+# standard libs
+import io
+
+# internal libs
+from monitor.core.aggregate import AggregateWriter, RingBuffer, summarize
+from monitor.core.output import CSVWriter
+
+
+def aggregate(columns, window: int):
+    stream = io.BytesIO()
+    writer = CSVWriter('gpu.temp', AggregateWriter.expand_columns(columns), stream=stream, flush_interval=0)
+    return AggregateWriter('gpu.temp', columns, writer, window), stream
+
+
+def rows(stream: io.BytesIO):
+    """Values of each row (without timestamp, hostname, and resource)."""
+    return [line.split(',')[3:] for line in stream.getvalue().decode().splitlines()]
+
+
+def test_summarize() -> None:
+    buffer = RingBuffer(4)
+    for value in [5, 1, 3, 2, 4]:  # NOTE: the first value is overwritten
+        buffer.append(value)
+    assert summarize(buffer) == (2.5, 1, 4, 4, 4)
+
+
+def test_window() -> None:
+    """A row for each identifier every `window` samples."""
+    writer, stream = aggregate(['gpu_id', 'gpu_temp'], window=2)
+    for temp in [40, 50, 60, 80]:
+        writer.write(0, temp)
+        writer.write(1, temp + 1)
+        writer.commit()
+    writer.close()
+    assert rows(stream) == [
+        ['0', '45.0', '40.0', '50.0', '50.0', '50.0'], ['1', '46.0', '41.0', '51.0', '51.0', '51.0'],
+        ['0', '70.0', '60.0', '80.0', '80.0', '80.0'], ['1', '71.0', '61.0', '81.0', '81.0', '81.0'],
+    ]
+
+
+def test_partial_window_on_close() -> None:
+    """Samples of an incomplete window are summarized when closed."""
+    writer, stream = aggregate(['cpu_percent', 'memory_percent'], window=10)
+    for percent in [10, 20, 60]:
+        writer.write(percent, '')
+        writer.commit()
+    assert rows(stream) == []
+    writer.close()
+    assert rows(stream) == [['30.0', '10.0', '60.0', '60.0', '60.0', 'nan', 'nan', 'nan', 'nan', 'nan']]
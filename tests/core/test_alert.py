@@ -0,0 +1,158 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for alert rules and transitions."""
+
+
+# type annotations
+from typing import List, Tuple, Any
+
+# standard libs
+from datetime import datetime
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core.alert import AlertWriter, parse_rule, load_rules, get_alert_log
+from monitor.core.exceptions import AlertTriggered
+from monitor.core.output import RecordWriter
+
+
+class Recorder(RecordWriter):
+    """Keeps every row written (without the timestamp)."""
+
+    rows: List[Tuple[Any, ...]]
+
+    def __init__(self, resource: str, columns: List[str]) -> None:
+        super().__init__(resource, columns)
+        self.rows = []
+
+    def write(self, *values: Any) -> None:
+        self.rows.append(values)
+
+    def write_at(self, timestamp: datetime, *values: Any) -> None:
+        self.rows.append(values)
+
+
+def alert_writer(columns: List[str], *rules: str) -> AlertWriter:
+    return AlertWriter(Recorder('gpu.temp', columns), [parse_rule(rule) for rule in rules],
+                       Recorder('gpu.temp', ['rule', 'series_id', 'state', 'value']))
+
+
+def events(writer: AlertWriter) -> List[Tuple[Any, ...]]:
+    return writer.events.rows
+
+
+def test_for_count() -> None:
+    """Firing after N samples in a row, resolved at the first sample after that which does not compare."""
+    writer = alert_writer(['gpu_temp'], 'hot gpu_temp > 80 for 3')
+    for timestamp, value in enumerate([90, 90, 70, 90, 90]):
+        writer.evaluate(timestamp, (value, ))
+    assert events(writer) == []  # NOTE: the count starts over at 70
+    writer.evaluate(5, (95, ))
+    assert events(writer) == [('hot', 'gpu_temp', 'firing', 95)]
+    writer.evaluate(6, (99, ))
+    assert len(events(writer)) == 1  # NOTE: only changes of state
+    writer.evaluate(7, (60, ))
+    writer.evaluate(8, (50, ))
+    assert events(writer) == [('hot', 'gpu_temp', 'firing', 95), ('hot', 'gpu_temp', 'resolved', 60)]
+
+
+def test_series_by_identifier() -> None:
+    """Every identifier in the first column is a separate series."""
+    writer = alert_writer(['gpu_id', 'gpu_temp'], 'hot gpu_temp > 80 for 2')
+    for timestamp in range(2):
+        writer.evaluate(timestamp, (0, 90))
+        writer.evaluate(timestamp, (1, 50))
+    writer.evaluate(2, (1, 85))
+    assert events(writer) == [('hot', 'gpu_temp.0', 'firing', 90)]
+    writer.evaluate(3, (0, 10))
+    writer.evaluate(3, (1, 85))
+    assert events(writer)[1:] == [('hot', 'gpu_temp.0', 'resolved', 10), ('hot', 'gpu_temp.1', 'firing', 85)]
+
+
+def test_missing_values() -> None:
+    """Missing values (or NaN) do not change the count."""
+    writer = alert_writer(['gpu_temp'], 'hot gpu_temp > 80 for 2')
+    for timestamp, value in enumerate([90, '', float('nan'), 90]):
+        writer.evaluate(timestamp, (value, ))
+    assert events(writer) == [('hot', 'gpu_temp', 'firing', 90)]
+
+
+def test_rate() -> None:
+    """Rate of change is per second (from the second sample)."""
+    writer = alert_writer(['gpu_temp'], 'rising gpu_temp rate > 5')
+    writer.evaluate(0, (100, ))
+    writer.evaluate(2, (108, ))
+    assert events(writer) == []
+    writer.evaluate(3, (120, ))
+    writer.evaluate(4, (121, ))
+    assert events(writer) == [('rising', 'gpu_temp', 'firing', 120), ('rising', 'gpu_temp', 'resolved', 121)]
+
+
+def test_ewma() -> None:
+    """Deviation from the moving average only after the warmup (1 / alpha samples)."""
+    writer = alert_writer(['gpu_temp'], 'spike gpu_temp ewma 0.25 > 3')
+    for timestamp, value in enumerate([50, 51, 50, 51, 50, 51]):
+        writer.evaluate(timestamp, (value, ))
+    assert events(writer) == []
+    writer.evaluate(6, (90, ))
+    assert events(writer) == [('spike', 'gpu_temp', 'firing', 90)]
+
+
+def test_exit_on_commit() -> None:
+    """A firing rule with the exit action raises when the sample is committed."""
+    writer = alert_writer(['gpu_temp'], 'hot gpu_temp > 80 for 2 exit')
+    writer.write_at(datetime(2026, 10, 18), 90)
+    writer.commit()
+    writer.write_at(datetime(2026, 10, 18, 0, 0, 1), 90)
+    assert writer.writer.rows == [(90, ), (90, )]
+    with pytest.raises(AlertTriggered, match='hot firing for gpu_temp'):
+        writer.commit()
+
+
+@pytest.mark.parametrize('line, message', [
+    ('hot gpu_temp', 'Expected NAME SERIES CONDITION'),
+    ('hot gpu_temp >> 80', 'Expected one of'),
+    ('hot gpu_temp > 80 for 0', 'at least 1 sample'),
+    ('hot gpu_temp > 80 for', 'Incomplete condition'),
+    ('hot gpu_temp ewma 2 > 3', 'weight between 0 and 1'),
+    ('hot gpu_temp > 80 exit now', 'Unexpected "now"'),
+])
+def test_invalid_rule(line, message) -> None:
+    with pytest.raises(ValueError, match=message):
+        parse_rule(line)
+
+
+def test_load_rules(tmp_path) -> None:
+    """Comments and empty lines are skipped, errors are reported with the line number."""
+    path = tmp_path / 'alerts.txt'
+    path.write_text('# rules\n\nhot gpu_temp > 80 for 3  # sustained\nbad gpu_temp ?\n')
+    with pytest.raises(RuntimeError, match='line 4'):
+        load_rules(str(path))
+    path.write_text('# rules\n\nhot gpu_temp > 80 for 3  # sustained\n')
+    rule, = load_rules(str(path))
+    assert (rule.name, rule.pattern, rule.op, rule.threshold, rule.count) == ('hot', 'gpu_temp', '>', 80, 3)
+
+
+def test_alert_log(tmp_path) -> None:
+    """Events are appended to the file (header only if new), which is closed with the writer."""
+    path = tmp_path / 'alerts.csv'
+    for value in (90, 95):
+        writer = AlertWriter(Recorder('gpu.temp', ['gpu_temp']), [parse_rule('hot gpu_temp > 80')],
+                             get_alert_log('gpu.temp', str(path)))
+        writer.evaluate(0, (value, ))
+        writer.close()
+        assert writer.events.stream.closed
+    header, *lines = path.read_text().splitlines()
+    assert header == 'timestamp,hostname,resource,rule,series_id,state,value'
+    assert [line.split(',')[3:] for line in lines] == [['hot', 'gpu_temp', 'firing', '90'],
+                                                       ['hot', 'gpu_temp', 'firing', '95']]
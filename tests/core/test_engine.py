@@ -0,0 +1,125 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for asynchronous collection engine."""
+
+
+# type annotations
+from typing import Dict, List, Tuple, Any
+
+# standard libs
+import time
+import asyncio
+import itertools
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core.engine import Engine
+from monitor.core.schedule import Scheduler
+
+
+class Stop(Exception):
+    """Raised by a callback to end `Engine.run`."""
+
+
+def engine(**providers) -> Engine:
+    """An engine with a short timeout and drops kept in a list (rather than logged)."""
+    drops = []
+    instance = Engine(providers, timeout=0.05, on_drop=lambda _, *args: drops.append(args))
+    instance.drops = drops
+    return instance
+
+
+async def fast() -> Dict[str, Any]:
+    return {'fast': 1}
+
+
+async def slow() -> Dict[str, Any]:
+    await asyncio.sleep(0.2)
+    return {'slow': 1}
+
+
+def test_timeout() -> None:
+    """A provider that does not finish in time is dropped (others are not)."""
+    instance = engine(fast=fast, slow=slow)
+    assert asyncio.run(instance.collect()) == {'fast': 1}
+    assert instance.dropped == {'fast': 0, 'slow': 1}
+    assert instance.drops == [('slow', 'timed out')]
+
+
+def test_still_running() -> None:
+    """A provider still running from a previous tick is not started again until it finishes."""
+    starts = []
+
+    async def counted() -> Dict[str, Any]:
+        starts.append(time.monotonic())
+        return await slow()
+
+    async def main() -> Tuple[Engine, List[Dict[str, Any]]]:
+        instance = engine(counted=counted)
+        records = [await instance.collect(), await instance.collect()]
+        await asyncio.sleep(0.2)
+        records.append(await instance.collect())
+        return instance, records
+
+    instance, records = asyncio.run(main())
+    assert records == [{}, {}, {}]
+    assert len(starts) == 2
+    assert instance.drops == [('counted', 'timed out'), ('counted', 'still running'), ('counted', 'timed out')]
+
+
+def test_sleeping_thread() -> None:
+    """A blocked worker thread is not given more work while it sleeps (so threads do not pile up)."""
+    calls = []
+
+    def blocking() -> Dict[str, Any]:
+        calls.append(time.monotonic())
+        time.sleep(0.3)
+        return {'blocking': 1}
+
+    async def provider() -> Dict[str, Any]:
+        return await asyncio.get_running_loop().run_in_executor(None, blocking)
+
+    async def main() -> Engine:
+        instance = engine(blocking=provider)
+        for _ in range(5):
+            await instance.collect()
+        return instance
+
+    instance = asyncio.run(main())
+    assert len(calls) == 1
+    assert instance.dropped['blocking'] == 5
+
+
+def test_run_in_order() -> None:
+    """Records are passed on in the order of ticks even if a later one finishes first."""
+    records = []
+    ticks = itertools.count()
+
+    async def first() -> Dict[str, Any]:
+        await asyncio.sleep(0.04)  # NOTE: longer than a few intervals
+        return {'first': 1}
+
+    async def tick() -> Dict[str, Any]:
+        return {'tick': next(ticks)}
+
+    def callback(timestamp, record) -> None:
+        records.append((timestamp, record))
+        if len(records) == 4:
+            raise Stop()
+
+    instance = Engine({'first': first, 'tick': tick}, timeout=0.1, on_drop=None)
+    with pytest.raises(Stop):
+        asyncio.run(instance.run(Scheduler(0.01, on_overrun=None), callback))
+    assert records[0][1] == {'first': 1, 'tick': 0}
+    assert [record['tick'] for _, record in records] == [0, 1, 2, 3]
+    assert [timestamp for timestamp, _ in records] == sorted(timestamp for timestamp, _ in records)
@@ -0,0 +1,129 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for fleet ingest and rollup."""
+
+
+# standard libs
+import json
+import socket
+import struct
+import asyncio
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core import fleet as fleet_module
+from monitor.core.fleet import Fleet, Grouping, listen
+from monitor.core.network import encode_frame, FRAME_HEADER, FRAME_RECORDS
+
+
+GPU_RECORD = struct.Struct('<qHff')
+WIDE_RECORD = struct.Struct('<qfff')
+
+
+def gpu_header(hostname: str) -> bytes:
+    return json.dumps({'hostname': hostname, 'resource': 'gpu.temp',
+                       'columns': ['gpu_id', 'gpu_temp', 'gpu_power'], 'format': GPU_RECORD.format}).encode()
+
+
+def gpu_records(*values) -> bytes:
+    """Records for (gpu_id, gpu_temp, gpu_power) in `values`."""
+    return b''.join(GPU_RECORD.pack(1_800_000_000_000, *row) for row in values)
+
+
+def test_ingest_and_rollup() -> None:
+    """Every device of every host is summarized by group (and for all hosts)."""
+    fleet = Fleet(grouping=Grouping(rules=[('a*', 'rack-a'), ('b*', 'rack-b')]), thresholds={'gpu_temp': 80})
+    fleet.ingest(fleet.source(gpu_header('a1')), gpu_records((0, 50, 100), (1, 90, 300)))
+    fleet.ingest(fleet.source(gpu_header('a2')), gpu_records((0, 70, 200)))
+    fleet.ingest(fleet.source(gpu_header('b1')), gpu_records((0, 30, 100)))
+    assert fleet.received == 4
+    assert fleet.rollup() == [
+        ('all', 'gpu_power', 3, 4, 175.0, 300.0, 0),
+        ('all', 'gpu_temp', 3, 4, 60.0, 90.0, 1),
+        ('rack-a', 'gpu_power', 2, 3, 200.0, 300.0, 0),
+        ('rack-a', 'gpu_temp', 2, 3, 70.0, 90.0, 1),
+        ('rack-b', 'gpu_power', 1, 1, 100.0, 100.0, 0),
+        ('rack-b', 'gpu_temp', 1, 1, 30.0, 30.0, 0),
+    ]
+
+
+def test_window() -> None:
+    """Only the last `window` samples of each device are included."""
+    fleet = Fleet(window=2)
+    source = fleet.source(gpu_header('a1'))
+    for temp in (10, 20, 30, 40):
+        fleet.ingest(source, gpu_records((0, temp, 100)))
+    assert fleet.rollup()[1] == ('all', 'gpu_temp', 1, 1, 35.0, 40.0, 0)
+
+
+def test_wide_columns() -> None:
+    """Columns from "monitor all" are split into a row for each device."""
+    fleet = Fleet()
+    header = json.dumps({'hostname': 'a1', 'resource': 'all',
+                         'columns': ['gpu_0_temp', 'gpu_1_temp', 'cpu_percent'],
+                         'format': WIDE_RECORD.format}).encode()
+    fleet.ingest(fleet.source(header), WIDE_RECORD.pack(1_800_000_000_000, 40, 60, 25))
+    assert fleet.rollup() == [
+        ('all', 'cpu_percent', 1, 1, 25.0, 25.0, 0),
+        ('all', 'gpu_temp', 1, 2, 50.0, 60.0, 0),
+    ]
+
+
+def test_expire(monkeypatch) -> None:
+    """Devices not updated within `expire` seconds are released and their rows reused."""
+    now = [1000.0]
+    monkeypatch.setattr(fleet_module.time, 'monotonic', lambda: now[0])
+    fleet = Fleet(expire=60)
+    fleet.ingest(fleet.source(gpu_header('a1')), gpu_records((0, 50, 100)))
+    now[0] += 30
+    fleet.ingest(fleet.source(gpu_header('a2')), gpu_records((0, 70, 200)))
+    now[0] += 45
+    assert fleet.rollup()[1] == ('all', 'gpu_temp', 1, 1, 70.0, 70.0, 0)
+    fleet.ingest(fleet.source(gpu_header('a1')), gpu_records((0, 10, 100)))
+    assert fleet.rollup()[1] == ('all', 'gpu_temp', 2, 2, 40.0, 70.0, 0)
+    table, = fleet._tables.values()
+    assert table.devices == 2 and len(table._free) == table.rows - 2
+
+
+def test_listen_unix(tmp_path) -> None:
+    """Frames sent over a Unix socket are ingested (a socket left behind is replaced)."""
+    path = str(tmp_path / 'fleet.sock')
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(path)
+    stale.close()
+
+    async def main() -> Fleet:
+        fleet = Fleet()
+        server = await listen(fleet, f'unix://{path}')
+        _, writer = await asyncio.open_unix_connection(path)
+        writer.write(encode_frame(FRAME_HEADER, gpu_header('a1')) +
+                     encode_frame(FRAME_RECORDS, gpu_records((0, 50, 100), (1, 70, 200))))
+        await writer.drain()
+        writer.close()
+        for _ in range(100):
+            if fleet.received == 2:
+                break
+            await asyncio.sleep(0.01)
+        server.close()
+        return fleet
+
+    assert asyncio.run(main()).rollup()[1] == ('all', 'gpu_temp', 1, 2, 60.0, 70.0, 0)
+
+
+def test_listen_refuses_file(tmp_path) -> None:
+    """A file at the path of a Unix socket is never removed."""
+    path = tmp_path / 'fleet.sock'
+    path.write_text('keep me\n')
+    with pytest.raises(RuntimeError, match='Not a socket'):
+        asyncio.run(listen(Fleet(), f'unix://{path}'))
+    assert path.read_text() == 'keep me\n'
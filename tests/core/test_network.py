@@ -0,0 +1,91 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for network framing and addresses."""
+
+
+# standard libs
+import os
+import socket
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core.network import (NetworkWriter, FrameDecoder, RecordDecoder, parse_address, encode_frame,
+                                  remove_socket, FRAME_HEADER, FRAME_RECORDS, MAX_DATAGRAM)
+
+
+def test_parse_address() -> None:
+    assert parse_address('tcp://example.org:9000') == ('tcp', ('example.org', 9000))
+    assert parse_address('udp://:9000') == ('udp', ('localhost', 9000))
+    assert parse_address('tcp://[::1]:9000') == ('tcp', ('::1', 9000))
+    assert parse_address('unix:///tmp/monitor.sock') == ('unix', '/tmp/monitor.sock')
+    with pytest.raises(RuntimeError):
+        parse_address('tcp://example.org')
+    with pytest.raises(RuntimeError):
+        parse_address('example.org:9000')
+
+
+def test_frames_split_across_reads() -> None:
+    data = encode_frame(FRAME_HEADER, b'{}') + encode_frame(FRAME_RECORDS, b'abc')
+    decoder = FrameDecoder()
+    frames = [frame for start in range(len(data)) for frame in decoder.feed(data[start:start + 1])]
+    assert frames == [(FRAME_HEADER, b'{}'), (FRAME_RECORDS, b'abc')]
+
+
+def test_remove_socket(tmp_path) -> None:
+    """A socket left behind is removed (nothing to do if missing)."""
+    path = str(tmp_path / 'monitor.sock')
+    remove_socket(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    sock.close()
+    remove_socket(path)
+    assert not os.path.exists(path)
+
+
+def test_remove_socket_refuses_file(tmp_path) -> None:
+    """Anything other than a socket is never removed."""
+    path = tmp_path / 'data.csv'
+    path.write_text('keep me\n')
+    with pytest.raises(RuntimeError, match='Not a socket'):
+        remove_socket(str(path))
+    assert path.read_text() == 'keep me\n'
+
+
+def test_udp_datagrams() -> None:
+    """Records are split into datagrams (each with the header) at whole records."""
+    # NOTE: few enough records to fit in the receive buffer (nothing is read until closed)
+    receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    receiver.bind(('127.0.0.1', 0))
+    receiver.settimeout(5)
+    columns = [f'value_{i}' for i in range(1000)]
+    address = f'udp://127.0.0.1:{receiver.getsockname()[1]}'
+    writer = NetworkWriter('test', columns, ['f'] * len(columns), address)
+    for i in range(16):
+        writer.write(*([float(i)] * len(columns)))
+    writer.close()
+    rows, datagrams = [], 0
+    while len(rows) < 16:
+        (_, header), (kind, payload) = FrameDecoder().feed(receiver.recv(MAX_DATAGRAM))
+        assert kind == FRAME_RECORDS and len(header) + len(payload) + 10 <= MAX_DATAGRAM
+        rows.extend(RecordDecoder(header).decode(payload))
+        datagrams += 1
+    receiver.close()
+    assert datagrams > 1
+    assert [row[1] for row in rows] == [float(i) for i in range(16)]
+
+
+def test_udp_too_many_columns() -> None:
+    """A single record must fit in a datagram."""
+    columns = [f'value_{i}' for i in range(20_000)]
+    with pytest.raises(RuntimeError, match='Too many columns for udp'):
+        NetworkWriter('test', columns, ['f'] * len(columns), 'udp://127.0.0.1:9')
@@ -0,0 +1,64 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for record writers."""
+
+
+# standard libs
+import io
+from datetime import datetime, timedelta
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core.output import CSVWriter, BinaryWriter, BinaryReader
+
+
+def csv_writer() -> CSVWriter:
+    return CSVWriter('cpu.percent', ['cpu_percent'], stream=io.BytesIO(), hostname='host')
+
+
+@pytest.mark.parametrize('timestamp', [
+    datetime(2026, 10, 18, 6, 0, 0),
+    datetime(2026, 10, 18, 6, 0, 0, 999_999),  # NOTE: truncated (not rounded) to milliseconds
+    datetime(2026, 12, 31, 23, 59, 59, 1_000),
+])
+def test_csv_write_at(timestamp) -> None:
+    """Same timestamp format as strftime."""
+    writer = csv_writer()
+    writer.write_at(timestamp, 7.5)
+    writer.flush()
+    expected = timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+    assert writer.stream.getvalue().decode() == f'{expected},host,cpu.percent,7.5\n'
+
+
+def test_csv_write_at_each_second() -> None:
+    """The cached prefix changes with the second (and only the milliseconds otherwise)."""
+    writer = csv_writer()
+    start = datetime(2026, 10, 18, 6, 0, 59)
+    times = [start + timedelta(milliseconds=250 * i) for i in range(8)]
+    for timestamp in times:
+        writer.write_at(timestamp, 0)
+    writer.flush()
+    assert [line.split(',')[0] for line in writer.stream.getvalue().decode().splitlines()] == [
+        timestamp.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3] for timestamp in times]
+
+
+def test_binary_round_trip() -> None:
+    stream = io.BytesIO()
+    writer = BinaryWriter('gpu.temp', ['gpu_id', 'gpu_temp'], ['H', 'f'], stream=stream)
+    writer.write_header()
+    writer.write_at(datetime.fromtimestamp(1_800_000_000.25), 1, 42.5)
+    writer.close()
+    stream.seek(0)
+    reader = BinaryReader(stream)
+    assert reader.columns == ['gpu_id', 'gpu_temp']
+    assert list(reader) == [(1_800_000_000_250, 1, 42.5)]
@@ -0,0 +1,74 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for Parquet output (requires pyarrow)."""
+
+
+# standard libs
+import math
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core.logging import Logger
+from monitor.core.output import get_writer
+from monitor.core.parquet import ParquetWriter
+
+pyarrow = pytest.importorskip('pyarrow')
+pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+
+
+def read(tmp_path) -> pyarrow.Table:
+    path, = tmp_path.glob('*.parquet')
+    return pyarrow_parquet.read_table(str(path))
+
+
+def test_columns(tmp_path) -> None:
+    writer = ParquetWriter('gpu.procs', ['gpu_id', 'pid', 'memory'], ['H', 'I', 'Q'],
+                           str(tmp_path / 'data.parquet'))
+    writer.write(0, 123, 1 << 40)
+    writer.write(1, 456, 0)
+    writer.close()
+    table = read(tmp_path)
+    assert [str(field.type) for field in table.schema][3:] == ['uint16', 'uint32', 'uint64']
+    assert table.column('memory').to_pylist() == [1 << 40, 0]
+    assert table.column('resource').to_pylist() == ['gpu.procs', 'gpu.procs']
+
+
+def test_missing_integer(tmp_path) -> None:
+    """A missing value (NaN or '') in an integer column is stored as null."""
+    writer = ParquetWriter('gpu.procs', ['gpu_id', 'pid', 'memory', 'percent'], ['H', 'I', 'Q', 'f'],
+                           str(tmp_path / 'data.parquet'))
+    writer.write(0, 123, writer.missing, 1.5)
+    writer.write(1, '', 1024, writer.missing)
+    writer.write(2, 789, 2048, 3.0)
+    writer.close()
+    table = read(tmp_path)
+    assert table.column('pid').to_pylist() == [123, None, 789]
+    assert table.column('memory').to_pylist() == [None, 1024, 2048]
+    assert table.column('memory').null_count == 1
+    assert math.isnan(table.column('percent').to_pylist()[1])
+
+
+def test_window_dtypes(tmp_path) -> None:
+    """Statistics of integer columns are float64 (identifiers keep their type)."""
+    writer = get_writer('cpu.memory', ['gpu_id', 'memory', 'percent'], Logger.with_name('test'), fmt='parquet',
+                        dtypes=['H', 'Q', 'f'], path=str(tmp_path / 'data.parquet'), window=2)
+    for memory in [(1 << 40) + 1, (1 << 40) + 3]:
+        writer.write(0, memory, 50.0)
+        writer.commit()
+    writer.close()
+    table = read(tmp_path)
+    types = {field.name: str(field.type) for field in table.schema}
+    assert types['gpu_id'] == 'uint16'
+    assert types['memory_mean'] == types['memory_max'] == 'double'
+    assert types['percent_mean'] == 'float'
+    assert table.column('memory_mean').to_pylist() == [(1 << 40) + 2]
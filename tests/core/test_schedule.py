@@ -0,0 +1,107 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for sampling schedule (on a fake clock)."""
+
+
+# type annotations
+from typing import List, Tuple
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core import schedule
+from monitor.core.schedule import Scheduler
+
+
+class FakeClock:
+    """Stands in for the `time` module, only advanced by sleeping (or by hand)."""
+
+    now: float
+    wall: float
+    sleeps: List[float]
+
+    def __init__(self, wall: float = 1_000_000.25) -> None:
+        self.now = 100.0
+        self.wall = wall
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.wall + self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def perf_counter_ns(self) -> int:
+        return int(self.now * 1_000_000_000)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(schedule, 'time', clock)
+    return clock
+
+
+def scheduler(interval: float, align: bool = False) -> Tuple[Scheduler, list]:
+    """A scheduler with overruns kept in a list (rather than logged)."""
+    overruns = []
+    return Scheduler(interval, align=align, on_overrun=lambda _, *args: overruns.append(args)), overruns
+
+
+def test_no_drift(clock) -> None:
+    """Time taken by each sample is taken off the next sleep."""
+    ticks, overruns = scheduler(1)
+    times = []
+    for tick in ticks:
+        times.append(clock.now)
+        clock.now += 0.3  # NOTE: time to collect
+        if tick == 5:
+            break
+    assert times == pytest.approx([101, 102, 103, 104, 105])
+    assert clock.sleeps[1:] == pytest.approx([0.7] * 4)
+    assert overruns == []
+
+
+def test_overruns(clock) -> None:
+    """Late ticks are counted, and ticks missed by more than a full interval are skipped."""
+    ticks, overruns = scheduler(1)
+    times = []
+    for tick in ticks:
+        times.append(clock.now)
+        if tick == 1:
+            clock.now += 1.5  # NOTE: late for the next deadline (no skip)
+        if tick == 2:
+            clock.now += 3.2  # NOTE: misses two more deadlines
+        if tick == 4:
+            break
+    assert times == pytest.approx([101, 102.5, 105.7, 106])
+    assert (ticks.ticks, ticks.overruns, ticks.skipped) == (4, 2, 2)
+    assert [skipped for _, skipped in overruns] == [0, 2]
+    assert [delay for delay, _ in overruns] == pytest.approx([0.5, 2.7])
+
+
+def test_align(clock) -> None:
+    """First deadline is on the next wall-clock multiple of the interval."""
+    ticks, _ = scheduler(2, align=True)
+    for _ in ticks:
+        break
+    assert clock.time() % 2 == pytest.approx(0)
+    assert clock.sleeps == pytest.approx([1.75])
+
+
+def test_invalid_interval() -> None:
+    with pytest.raises(RuntimeError, match='positive'):
+        Scheduler(0)
@@ -0,0 +1,104 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for overhead statistics of the monitor itself."""
+
+
+# type annotations
+from typing import List
+
+# standard libs
+import math
+from types import SimpleNamespace
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core import selfstats
+from monitor.core.selfstats import Histogram, SelfStats, TimedWriter, get_self_stats
+from monitor.core.output import RecordWriter
+
+
+def test_buckets() -> None:
+    """A duration is counted in the bucket for its bit length."""
+    histogram = Histogram()
+    for ns in (0, 1, 2, 3, 1000, -5):
+        histogram.record(ns)
+    assert histogram.counts[0] == 2  # NOTE: negative durations (clock adjustments) are zero
+    assert histogram.counts[1] == 1
+    assert histogram.counts[2] == 2
+    assert histogram.counts[10] == 1
+    assert (histogram.count, histogram.total, histogram.max) == (6, 1006, 1000)
+
+
+def test_quantile() -> None:
+    """Upper bound of the bucket (but never more than the maximum)."""
+    histogram = Histogram()
+    for _ in range(99):
+        histogram.record(100)
+    histogram.record(1_000_000)
+    assert histogram.mean == pytest.approx((99 * 100 + 1_000_000) / 100)
+    assert histogram.quantile(0.5) == histogram.quantile(0.99) == 127
+    assert histogram.quantile(1) == 1_000_000
+    histogram.reset()
+    assert histogram.count == 0 and not any(histogram.counts)
+    assert math.isnan(histogram.mean) and math.isnan(histogram.quantile(0.99))
+
+
+class Discard(RecordWriter):
+    """Keeps nothing (but takes 2 ms on the fake `clock` to write each row)."""
+
+    clock: List[float]
+
+    def __init__(self, clock: List[float]) -> None:
+        super().__init__('cpu.percent', ['cpu_percent'])
+        self.clock = clock
+
+    def write(self, *values) -> None:
+        self.clock[0] += 0.002
+
+    def write_at(self, timestamp, *values) -> None:
+        pass
+
+
+def rows(path) -> List[List[str]]:
+    """Rows of statistics (without timestamp, hostname, and resource)."""
+    header, *lines = path.read_text().splitlines()
+    assert header.split(',')[3:] == SelfStats.columns(['collect', 'write'])
+    return [line.split(',')[3:] for line in lines]
+
+
+def test_report_interval(tmp_path, monkeypatch) -> None:
+    """A row is written once the interval has passed (counts and statistics since the previous row)."""
+    now = [1000.0]
+    monkeypatch.setattr(selfstats, 'time', SimpleNamespace(monotonic=lambda: now[0],
+                                                           perf_counter_ns=lambda: int(now[0] * 1e9)))
+    path = tmp_path / 'self.csv'
+    stats = get_self_stats(str(path), interval=10)
+    writer = TimedWriter(Discard(now), stats)
+    scheduler = SimpleNamespace(ticks=0, overruns=0, skipped=1)
+    for tick in range(1, 4):
+        scheduler.ticks = tick
+        writer.write(1.0)  # NOTE: 2 ms of the 5 ms tick
+        writer.commit()
+        now[0] += 3.0
+        stats.end_tick(scheduler, ns=5_000_000)
+    assert path.read_text() == ''  # NOTE: header is flushed with the first row
+    now[0] += 1.0
+    scheduler.ticks = 4
+    stats.end_tick(scheduler, ns=1_000_000)
+    row, = rows(path)
+    assert row[:3] == ['4', '0', '1']
+    assert row[3:9] == ['2500.0', '3000.0', '3000.0', '2000.0', '2000.0', '2000.0']
+    assert stats.stages['collect'].count == 0  # NOTE: reset after each row
+    writer.close()
+    assert len(rows(path)) == 2
+    assert rows(path)[1][:3] == ['0', '0', '0']
@@ -0,0 +1,134 @@
+# This program is free software: you can redistribute it and/or modify it under the
+# terms of the Apache License (v2.0) as published by the Apache Software Foundation.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT ANY
+# WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+# PARTICULAR PURPOSE. See the Apache License for more details.
+#
+# You should have received a copy of the Apache License along with this program.
+# If not, see <https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""Unit tests for local time-series store."""
+
+
+# standard libs
+import glob
+
+# external libs
+import pytest
+
+# internal libs
+from monitor.core.store import Store, query, list_series, parse_size, SEGMENT_SIZE
+
+
+# NOTE: start of a minute (and hour) in milliseconds since epoch
+EPOCH = 1_800_000_000_000 - 1_800_000_000_000 % 3_600_000
+
+
+def store(root, flush_interval: float = 0, size: int = 64 * SEGMENT_SIZE) -> Store:
+    return Store(str(root), 'gpu.temp', ['gpu_id', 'gpu_temp'], size=size, flush_interval=flush_interval)
+
+
+def test_parse_size() -> None:
+    assert parse_size('512') == 512
+    assert parse_size('64M') == 64 * 1024 ** 2
+    assert parse_size('2GiB') == 2 * 1024 ** 3
+    with pytest.raises(RuntimeError):
+        parse_size('lots')
+
+
+def test_bucket_rollup(tmp_path) -> None:
+    """Samples are summarized in buckets for each tier."""
+    instance = store(tmp_path)
+    for second, value in enumerate([10, 20, 30, 40]):
+        instance.add(EPOCH + second * 500, (0, value))  # NOTE: two samples per second
+    instance.add(EPOCH + 61_000, (0, 100))
+    instance.close()
+    assert list(query(str(tmp_path), 'gpu.temp', tier='1s')) == [
+        (EPOCH, 'gpu_temp.0', 15.0, 10.0, 20.0),
+        (EPOCH + 1000, 'gpu_temp.0', 35.0, 30.0, 40.0),
+        (EPOCH + 61_000, 'gpu_temp.0', 100.0, 100.0, 100.0),
+    ]
+    assert list(query(str(tmp_path), 'gpu.temp', tier='1m')) == [
+        (EPOCH, 'gpu_temp.0', 25.0, 10.0, 40.0),
+        (EPOCH + 60_000, 'gpu_temp.0', 100.0, 100.0, 100.0),
+    ]
+    assert list(query(str(tmp_path), 'gpu.temp', tier='1h')) == [
+        (EPOCH, 'gpu_temp.0', 40.0, 10.0, 100.0),
+    ]
+
+
+def test_skips_missing(tmp_path) -> None:
+    """Missing, NaN, and non-numeric values are not stored."""
+    instance = store(tmp_path)
+    instance.add(EPOCH, (0, ''))
+    instance.add(EPOCH, (1, float('nan')))
+    instance.add(EPOCH, (2, '8.2G'))
+    instance.add(EPOCH, (3, 42))
+    instance.close()
+    assert list_series(str(tmp_path), 'gpu.temp') == ['gpu_temp.3']
+
+
+def test_query_range_and_series(tmp_path) -> None:
+    """Only records within the range and matching series are returned (in time order)."""
+    instance = store(tmp_path)
+    for second in range(10):
+        instance.add(EPOCH + second * 1000, (0, second))
+        instance.add(EPOCH + second * 1000, (1, -second))
+    instance.close()
+    found = list(query(str(tmp_path), 'gpu.temp', EPOCH + 3000, EPOCH + 5000, tier='1s'))
+    assert [(time, name) for time, name, *_ in found] == [
+        (EPOCH + 3000, 'gpu_temp.0'), (EPOCH + 3000, 'gpu_temp.1'),
+        (EPOCH + 4000, 'gpu_temp.0'), (EPOCH + 4000, 'gpu_temp.1'),
+    ]
+    found = list(query(str(tmp_path), 'gpu.temp', EPOCH + 3000, EPOCH + 5000, tier='1s', series=['*.1']))
+    assert [value for _, _, value, _, _ in found] == [-3.0, -4.0]
+
+
+def test_restart_within_bucket(tmp_path) -> None:
+    """A restart within the same bucket continues that bucket instead of storing it twice."""
+    first = store(tmp_path)
+    first.add(EPOCH + 1000, (0, 10))
+    first.add(EPOCH + 2000, (0, 20))
+    first.close()
+    second = store(tmp_path)
+    second.add(EPOCH + 2500, (0, 30))
+    second.add(EPOCH + 30_000, (0, 60))
+    second.close()
+    assert list(query(str(tmp_path), 'gpu.temp', tier='1m')) == [
+        (EPOCH, 'gpu_temp.0', 30.0, 10.0, 60.0),
+    ]
+    assert list(query(str(tmp_path), 'gpu.temp', tier='1s')) == [
+        (EPOCH + 1000, 'gpu_temp.0', 10.0, 10.0, 10.0),
+        (EPOCH + 2000, 'gpu_temp.0', 25.0, 20.0, 30.0),
+        (EPOCH + 30_000, 'gpu_temp.0', 60.0, 60.0, 60.0),
+    ]
+
+
+def test_restart_in_later_bucket(tmp_path) -> None:
+    """A restart after the bucket has ended starts a new record."""
+    first = store(tmp_path)
+    first.add(EPOCH, (0, 10))
+    first.close()
+    second = store(tmp_path)
+    second.add(EPOCH + 120_000, (0, 20))
+    second.close()
+    assert list(query(str(tmp_path), 'gpu.temp', tier='1m')) == [
+        (EPOCH, 'gpu_temp.0', 10.0, 10.0, 10.0),
+        (EPOCH + 120_000, 'gpu_temp.0', 20.0, 20.0, 20.0),
+    ]
+
+
+def test_retention(tmp_path) -> None:
+    """The oldest segments are removed to stay within the size limit."""
+    instance = store(tmp_path, size=8 * SEGMENT_SIZE)
+    for second in range(20_000):
+        instance.add(EPOCH + second * 1000, (0, second))
+        if second % 1000 == 0:
+            instance.flush()
+    instance.close()
+    segments = glob.glob(str(tmp_path / 'gpu.temp' / 'gpu_temp.0' / '1s-*.seg'))
+    assert len(segments) == 6  # NOTE: 80% of 8 segments
+    found = list(query(str(tmp_path), 'gpu.temp', tier='1s'))
+    assert found[-1][0] == EPOCH + 19_999_000
+    assert found[0][0] > EPOCH